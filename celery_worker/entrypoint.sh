@@ -22,6 +22,11 @@ sleep 10
 if [ "$1" = "beat" ]; then
     echo "Starting Celery Beat..."
     exec celery -A worker_app beat --loglevel=info
+elif [ "$1" = "ai-worker" ]; then
+    # AI calls only wait on ai-agents-service: one process runs them on
+    # threads sharing a single event loop (AI_ASYNC_ENGINE)
+    echo "Starting Celery AI Worker..."
+    exec celery -A worker_app worker --loglevel=info --pool=threads --concurrency=${AI_WORKER_CONCURRENCY:-64} --queues=ai_queue
 elif [ "$1" = "flower" ]; then
     echo "Starting Flower..."
     exec celery -A worker_app flower --port=5555
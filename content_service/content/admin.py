@@ -7,6 +7,8 @@ from .models import (
     Exercise,
     UserLearningPath,
     UserProgress,
+    UserProgressSummary,
+    CourseBuild,
 )
 
 
@@ -38,3 +40,13 @@ class UserProgressAdmin(admin.ModelAdmin):
 @admin.register(UserLearningPath)
 class UserLearningPathAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(UserProgressSummary)
+class UserProgressSummaryAdmin(admin.ModelAdmin):
+    pass
+
+
+@admin.register(CourseBuild)
+class CourseBuildAdmin(admin.ModelAdmin):
+    pass
@@ -0,0 +1,90 @@
+import json
+import time
+import hashlib
+import logging
+from django_redis import get_redis_connection
+from content_service_config.django import base
+
+
+logger = logging.getLogger(__name__)
+
+# Request fields that vary between otherwise identical generation requests
+VOLATILE_FIELDS = ("timestamp", "uid")
+
+PREFIX = "ai-result"
+# Sorted set of cached keys scored by last use, for size-based eviction
+INDEX_KEY = f"{PREFIX}:index"
+STATS_KEY = f"{PREFIX}:stats"
+
+
+def _stable(fields):
+    return {key: value for key, value in fields.items() if key not in VOLATILE_FIELDS}
+
+
+def request_key(endpoint, payload):
+    """Cache key for an AI request: a hash of its canonical, non-volatile form"""
+    canonical = _stable(payload)
+    if isinstance(canonical.get("parameters"), dict):
+        canonical["parameters"] = _stable(canonical["parameters"])
+    body = json.dumps(
+        {"endpoint": endpoint, "payload": canonical},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return f"{PREFIX}:{hashlib.sha256(body.encode()).hexdigest()}"
+
+
+def enabled():
+    return base.AI_RESULT_CACHE_TTL > 0
+
+
+def get(key, task):
+    """
+    The cached result for key or None, counting a hit or miss for task. A
+    hit keeps the result for another AI_RESULT_CACHE_TTL seconds, so the
+    key expires together with its index entry.
+    """
+    try:
+        redis = get_redis_connection("default")
+        raw = redis.get(key)
+        with redis.pipeline(transaction=False) as pipeline:
+            if raw is not None:
+                pipeline.expire(key, base.AI_RESULT_CACHE_TTL)
+                pipeline.zadd(INDEX_KEY, {key: time.time()})
+            pipeline.hincrby(STATS_KEY, f"{task}:{'hits' if raw else 'misses'}", 1)
+            pipeline.execute()
+    except Exception as e:
+        logger.warning(f"AI result cache read failed for {task}: {e}")
+        return None
+    return None if raw is None else json.loads(raw)
+
+
+def put(key, result):
+    """Cache result under key, evicting expired and least recently used entries"""
+    ttl = base.AI_RESULT_CACHE_TTL
+    now = time.time()
+    try:
+        redis = get_redis_connection("default")
+        with redis.pipeline(transaction=False) as pipeline:
+            pipeline.set(key, json.dumps(result), ex=ttl)
+            pipeline.zadd(INDEX_KEY, {key: now})
+            pipeline.zremrangebyscore(INDEX_KEY, "-inf", now - ttl)
+            pipeline.zcard(INDEX_KEY)
+            size = pipeline.execute()[-1]
+
+        excess = size - base.AI_RESULT_CACHE_MAX_ENTRIES
+        if excess > 0:
+            evicted = [member for member, _ in redis.zpopmin(INDEX_KEY, excess)]
+            redis.delete(*evicted)
+    except Exception as e:
+        logger.warning(f"AI result cache write failed: {e}")
+
+
+def stats():
+    """{task: {"hits": n, "misses": n}} across every worker"""
+    counters = {}
+    for field, count in get_redis_connection("default").hgetall(STATS_KEY).items():
+        task, _, outcome = field.decode().rpartition(":")
+        counters.setdefault(task, {"hits": 0, "misses": 0})[outcome] = int(count)
+    return counters
@@ -0,0 +1,71 @@
+import os
+import logging
+import threading
+from celery.signals import worker_process_init, worker_process_shutdown
+from urllib3.util.retry import Retry
+from content_service_config.django import base
+from .service_client import ServiceClient
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_ai_client():
+    return ServiceClient(
+        base.AI_SERVICE_URL,
+        headers={"Content-Type": "application/json"},
+        pool_size=base.AI_SERVICE_POOL_SIZE,
+        connect_timeout=base.AI_SERVICE_CONNECT_TIMEOUT,
+        read_timeout=base.AI_SERVICE_READ_TIMEOUT,
+        # Connection failures are retried with jittered backoff; error
+        # statuses go back to the caller, where content.ai_limiter reacts
+        # to overload and the tasks retry
+        max_retries=Retry(total=3, backoff_factor=1, backoff_jitter=1.0),
+    )
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+@worker_process_init.connect
+def init_ai_client(**kwargs):
+    """Open the pool in each worker child, after the fork"""
+    global _client, _client_pid
+    with _client_lock:
+        _client = create_ai_client()
+        _client_pid = os.getpid()
+
+
+@worker_process_shutdown.connect
+def close_ai_client(**kwargs):
+    if _client is None or _client_pid != os.getpid():
+        return
+    log_metrics(_client)
+    _client.close()
+
+
+def get_ai_client():
+    """
+    The process's ai-agents-service client; created lazily outside prefork
+    children (solo/thread pools, the web process) and rebuilt after a fork
+    """
+    global _client, _client_pid
+    if _client_pid != os.getpid():
+        with _client_lock:
+            if _client_pid != os.getpid():
+                _client = create_ai_client()
+                _client_pid = os.getpid()
+    return _client
+
+
+def log_metrics(client=None):
+    client = client or get_ai_client()
+    for endpoint, stats in client.metrics.snapshot().items():
+        average = stats["seconds"] / stats["requests"] if stats["requests"] else 0.0
+        logger.info(
+            f"AI {endpoint}: {stats['requests']} requests, {stats['errors']} errors, "
+            f"{stats['rejected']} rejected, avg {average:.2f}s, "
+            f"max {stats['max_seconds']:.2f}s"
+        )
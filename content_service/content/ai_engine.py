@@ -0,0 +1,96 @@
+import os
+import asyncio
+import threading
+from celery.signals import worker_process_shutdown, worker_shutdown
+from content_service_config.django import base
+from .ai_client import log_metrics
+from .service_client import AsyncServiceClient
+
+
+class AIEngine:
+    """
+    Runs AI calls on one background event loop per worker process, over a
+    single AsyncServiceClient, with at most `concurrency` requests in flight.
+
+    post() blocks only its calling thread, so a thread-pool worker
+    (celery worker --pool=threads) drives as many outstanding generations
+    as it has threads from one process and one connection pool.
+    """
+
+    def __init__(self, base_url, concurrency, **client_options):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="ai-engine", daemon=True
+        )
+        self._thread.start()
+        self._call(self._open(client_options))
+
+    async def _open(self, client_options):
+        # The client and semaphore belong to the engine's loop
+        self.client = AsyncServiceClient(
+            self.base_url, pool_size=self.concurrency, **client_options
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def apost(self, endpoint, payload):
+        async with self.semaphore:
+            response = await self.client.request("POST", endpoint, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def post(self, endpoint, payload):
+        """apost() from a synchronous caller, e.g. a task on a pool thread"""
+        return self._call(self.apost(endpoint, payload))
+
+    @property
+    def metrics(self):
+        return self.client.metrics
+
+    def close(self):
+        self._call(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def create_ai_engine():
+    return AIEngine(
+        base.AI_SERVICE_URL,
+        base.AI_ASYNC_CONCURRENCY,
+        headers={"Content-Type": "application/json"},
+        connect_timeout=base.AI_SERVICE_CONNECT_TIMEOUT,
+        read_timeout=base.AI_SERVICE_READ_TIMEOUT,
+    )
+
+
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+
+def get_ai_engine():
+    """The process's AIEngine, started on first use and restarted after a fork"""
+    global _engine, _engine_pid
+    if _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine_pid != os.getpid():
+                _engine = create_ai_engine()
+                _engine_pid = os.getpid()
+    return _engine
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_ai_engine(**kwargs):
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            return
+        log_metrics(_engine)
+        _engine.close()
+        _engine, _engine_pid = None, None
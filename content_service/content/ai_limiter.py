@@ -0,0 +1,229 @@
+import time
+import random
+import logging
+import uuid
+from email.utils import parsedate_to_datetime
+import httpx
+import requests
+from django.utils import timezone
+from django_redis import get_redis_connection
+from content_service_config.django import base
+
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "ai-limit"
+# Token bucket, AIMD concurrency limit and Retry-After block, in one hash
+STATE_KEY = f"{PREFIX}:state"
+# Sorted set of in-flight call tokens scored by lease expiry, so the slots
+# of workers that die mid-call free themselves
+IN_FLIGHT_KEY = f"{PREFIX}:in-flight"
+STATS_KEY = f"{PREFIX}:stats"
+
+OK = "ok"
+OVERLOAD = "overload"
+ERROR = "error"
+
+# Statuses that mean the service is saturated rather than the request wrong
+OVERLOAD_STATUSES = {429, 502, 503, 504}
+# However many calls see the same overload, the limit is halved at most
+# once per interval
+DECREASE_INTERVAL = 2.0
+# Wait before re-checking when every concurrency slot is taken
+SLOT_POLL = 0.1
+
+ACQUIRE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'refilled_at', 'limit', 'blocked_until')
+local rate, burst = tonumber(ARGV[2]), tonumber(ARGV[3])
+local limit = tonumber(state[3]) or tonumber(ARGV[4])
+
+local blocked_until = tonumber(state[4]) or 0
+if blocked_until > now then
+    return {0, tostring(blocked_until - now)}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+if redis.call('ZCARD', KEYS[2]) >= math.floor(limit) then
+    return {0, ARGV[6]}
+end
+
+local tokens = burst
+if rate > 0 then
+    local refilled_at = tonumber(state[2]) or now
+    tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - refilled_at) * rate)
+    if tokens < 1 then
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'refilled_at', now)
+        return {0, tostring((1 - tokens) / rate)}
+    end
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'refilled_at', now, 'limit', limit)
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[5]), ARGV[1])
+return {1, '0'}
+"""
+
+RELEASE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call('ZREM', KEYS[2], ARGV[1])
+local state = redis.call('HMGET', KEYS[1], 'limit', 'decreased_at', 'blocked_until')
+local limit = tonumber(state[1]) or tonumber(ARGV[4])
+local lowest, highest = tonumber(ARGV[5]), tonumber(ARGV[6])
+
+if ARGV[2] == 'ok' then
+    limit = math.min(highest, limit + 1 / limit)
+elseif ARGV[2] == 'overload' then
+    redis.call('HINCRBY', KEYS[3], 'overloaded', 1)
+    if now - (tonumber(state[2]) or 0) >= tonumber(ARGV[7]) then
+        limit = math.max(lowest, limit / 2)
+        redis.call('HSET', KEYS[1], 'decreased_at', now)
+    end
+    local retry_after = tonumber(ARGV[3])
+    if retry_after > 0 then
+        local blocked_until = math.max(tonumber(state[3]) or 0, now + retry_after)
+        redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+    end
+end
+redis.call('HSET', KEYS[1], 'limit', limit)
+return tostring(limit)
+"""
+
+
+class AIServiceOverloaded(requests.RequestException):
+    """
+    ai-agents-service is saturated, or the fleet-wide limits kept this call
+    waiting too long; retry no sooner than retry_after seconds
+    """
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def enabled():
+    return base.AI_LIMITER_ENABLED
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay or HTTP date)"""
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - timezone.now()).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def classify(exc):
+    """(outcome, retry_after) of a failed call, for release()"""
+    if isinstance(exc, (requests.Timeout, httpx.TimeoutException)):
+        return OVERLOAD, 0.0
+    response = getattr(exc, "response", None)
+    if response is not None and response.status_code in OVERLOAD_STATUSES:
+        return OVERLOAD, parse_retry_after(response.headers.get("Retry-After"))
+    return ERROR, 0.0
+
+
+def acquire():
+    """
+    Wait for a token from the shared bucket and a slot under the shared
+    concurrency limit; returns the slot's token, or None when the limiter is
+    off or Redis is unavailable. Raises AIServiceOverloaded after
+    AI_LIMITER_ACQUIRE_TIMEOUT seconds.
+    """
+    if not enabled():
+        return None
+    token = uuid.uuid4().hex
+    lease = base.AI_SERVICE_CONNECT_TIMEOUT + base.AI_SERVICE_READ_TIMEOUT + 30
+    deadline = time.monotonic() + base.AI_LIMITER_ACQUIRE_TIMEOUT
+    waited = False
+    try:
+        redis = get_redis_connection("default")
+        while True:
+            acquired, wait = redis.eval(
+                ACQUIRE,
+                2,
+                STATE_KEY,
+                IN_FLIGHT_KEY,
+                token,
+                base.AI_RATE_LIMIT,
+                base.AI_RATE_BURST,
+                base.AI_CONCURRENCY_INITIAL,
+                lease,
+                SLOT_POLL,
+            )
+            if acquired:
+                if waited:
+                    redis.hincrby(STATS_KEY, "throttled", 1)
+                return token
+            waited = True
+            # Jittered so waiting workers do not all retry at the same moment
+            wait = float(wait) * random.uniform(1.0, 1.5)
+            if time.monotonic() + wait > deadline:
+                raise AIServiceOverloaded(
+                    "Timed out waiting for the AI rate limiter", retry_after=wait
+                )
+            time.sleep(wait)
+    except AIServiceOverloaded:
+        raise
+    except Exception as e:
+        logger.warning(f"AI rate limiter unavailable, calling unthrottled: {e}")
+        return None
+
+
+def release(token, outcome, retry_after=0.0):
+    """
+    Free the slot and adapt the shared concurrency limit: additive increase
+    on success, halved on overload, with Retry-After pausing every caller
+    """
+    if token is None:
+        return
+    try:
+        get_redis_connection("default").eval(
+            RELEASE,
+            3,
+            STATE_KEY,
+            IN_FLIGHT_KEY,
+            STATS_KEY,
+            token,
+            outcome,
+            retry_after,
+            base.AI_CONCURRENCY_INITIAL,
+            base.AI_CONCURRENCY_MIN,
+            base.AI_CONCURRENCY_MAX,
+            DECREASE_INTERVAL,
+        )
+    except Exception as e:
+        logger.warning(f"Could not release AI rate limiter slot: {e}")
+
+
+def snapshot():
+    """The fleet's current limits and throttling counters"""
+    redis = get_redis_connection("default")
+    now = time.time()
+    with redis.pipeline(transaction=False) as pipeline:
+        pipeline.hgetall(STATE_KEY)
+        pipeline.zcount(IN_FLIGHT_KEY, now, "+inf")
+        pipeline.hgetall(STATS_KEY)
+        state, in_flight, stats = pipeline.execute()
+    state = {key.decode(): float(value) for key, value in state.items()}
+
+    tokens = base.AI_RATE_BURST
+    if "tokens" in state:
+        elapsed = now - state.get("refilled_at", now)
+        tokens = min(base.AI_RATE_BURST, state["tokens"] + elapsed * base.AI_RATE_LIMIT)
+    return {
+        "concurrency_limit": state.get("limit", base.AI_CONCURRENCY_INITIAL),
+        "in_flight": in_flight,
+        "rate": base.AI_RATE_LIMIT,
+        "tokens": tokens,
+        "blocked_for": max(state.get("blocked_until", 0.0) - now, 0.0),
+        "throttled": int(stats.get(b"throttled", 0)),
+        "overloaded": int(stats.get(b"overloaded", 0)),
+    }
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ContentApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "content"
+
+    def ready(self):
+        import content.signals  # noqa: F401
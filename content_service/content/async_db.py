@@ -0,0 +1,98 @@
+import asyncio
+import weakref
+from django.core.exceptions import EmptyResultSet
+from django.db import DEFAULT_DB_ALIAS, connections
+from pymongo import AsyncMongoClient
+from content_service_config.django import base
+
+
+# AsyncMongoClient is bound to the event loop it was first used on, so each
+# loop (one per ASGI worker process) gets its own pool
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_database(alias=DEFAULT_DB_ALIAS):
+    """The database behind connections[alias], over the async driver"""
+    connection = connections[alias]
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    if alias not in clients:
+        clients[alias] = AsyncMongoClient(
+            **connection.get_connection_params(),
+            maxPoolSize=base.ASYNC_MONGO_POOL_SIZE,
+        )
+    return clients[alias][connection.settings_dict["NAME"]]
+
+
+def compile_values(queryset):
+    """
+    (alias, collection name, pipeline, to_rows) for a .values() queryset,
+    built by the backend's own compiler exactly as evaluating the queryset
+    would; to_rows(documents) turns the documents the pipeline returns into
+    the queryset's row tuples, with the backend's converters applied.
+
+    This is the only code relying on django-mongodb-backend's compiler
+    internals; AsyncDBTests fail if an upgrade changes them.
+    """
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    compiler.pre_sql_setup()
+    query = compiler.build_query(
+        compiler.columns
+        if queryset.query.annotations
+        or not queryset.query.default_cols
+        or queryset.query.distinct
+        else None
+    )
+
+    def to_rows(documents):
+        results = [compiler._make_result(document, compiler.columns) for document in documents]
+        return list(compiler.results_iter([results]))
+
+    return compiler.using, compiler.collection_name, query.get_pipeline(), to_rows
+
+
+async def _aggregate(alias, collection, pipeline):
+    cursor = await get_async_database(alias)[collection].aggregate(pipeline)
+    return await cursor.to_list()
+
+
+async def fetch_values(queryset):
+    """The rows of a .values() queryset, read without blocking the event loop"""
+    try:
+        alias, collection, pipeline, to_rows = compile_values(queryset)
+    except EmptyResultSet:
+        return []
+
+    rows = to_rows(await _aggregate(alias, collection, pipeline))
+    names = [
+        *queryset.query.extra_select,
+        *queryset.query.values_select,
+        *queryset.query.annotation_select,
+    ]
+    return [dict(zip(names, row)) for row in rows]
+
+
+async def fetch_collection_validators(queryset):
+    """conditional.collection_validators, read over the async driver"""
+    try:
+        alias, collection, pipeline, to_rows = compile_values(
+            queryset.order_by().values("updated_at")
+        )
+    except EmptyResultSet:
+        return None, 0
+
+    pipeline = [
+        *pipeline,
+        {
+            "$group": {
+                "_id": None,
+                "updated_at": {"$max": "$updated_at"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    totals = await _aggregate(alias, collection, pipeline)
+    if not totals:
+        return None, 0
+    # The backend's converters make the stored datetime timezone-aware
+    [(latest,)] = to_rows(totals)
+    return latest, totals[0]["count"]
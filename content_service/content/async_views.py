@@ -0,0 +1,259 @@
+from abc import ABC, abstractmethod
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import URLPattern
+from django.utils.cache import parse_etags, patch_vary_headers
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .async_db import fetch_collection_validators, fetch_values
+from .authentication import JWTAuthentication
+from .conditional import make_etag
+from .fast_serializers import compile_serializer
+from .models import Language, Syllabus, Lesson, Exercise
+from .pagination import KeysetPagination
+from .progress import aget_dashboard
+from .renderers import FastJSONRenderer
+from .serializers import (
+    LanguageSerializer,
+    SyllabusSerializer,
+    LessonSerializer,
+    ExerciseSerializer,
+)
+from content_service_config.django import base
+from .views import requested_fieldset
+
+
+def render(request, data, status=status.HTTP_200_OK):
+    response = HttpResponse(
+        request.accepted_renderer.render(data, request.accepted_media_type),
+        status=status,
+        content_type=request.accepted_renderer.media_type,
+    )
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+class AsyncRead(ABC):
+    """
+    Async list/retrieve for one catalogue viewset, reading through the async
+    Mongo driver and rendering with the compiled serializers. Responses,
+    ETags and pagination match the viewset's; anything these handlers do not
+    reproduce returns None and is served by the viewset instead.
+    """
+
+    serializer_class = None
+    keyset_ordering = KeysetPagination.ordering
+    cache_control = "private, no-cache"
+    # Relations the viewset's projection select_related()s when rendered
+    related = ()
+    conditional_list = False
+
+    @abstractmethod
+    def get_queryset(self, user):
+        """What user may read, as the viewset's get_queryset() filters it"""
+
+    async def conditional(self, request, validators, build):
+        etag = make_etag(request, *validators)
+        matches = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in matches or matches == ["*"]:
+            response = render(request, None, status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = await build()
+        response["ETag"] = etag
+        response["Cache-Control"] = self.cache_control
+        return response
+
+    async def list(self, request):
+        compiled = compile_serializer(
+            self.serializer_class, many=True, **requested_fieldset(request)
+        )
+        if compiled is None:
+            return None
+
+        queryset = self.get_queryset(request.user)
+        if not self.conditional_list:
+            return await self.page(request, compiled, queryset)
+        return await self.conditional(
+            request,
+            await fetch_collection_validators(queryset),
+            lambda: self.page(request, compiled, queryset),
+        )
+
+    async def page(self, request, compiled, queryset):
+        paginator = KeysetPagination()
+        queryset = paginator.page_queryset(
+            compiled.rows(queryset, *self.keyset_ordering), request, self
+        )
+        if request.query_params.get(paginator.count_query_param) == "approximate":
+            paginator.approximate_count = await sync_to_async(
+                paginator.get_approximate_count, thread_sensitive=False
+            )(paginator.unseeked)
+        rows = paginator.paginate_rows(await fetch_values(queryset[:paginator.size + 1]))
+        return render(request, paginator.get_paginated_data(compiled.serialize(rows)))
+
+    async def retrieve(self, request, pk):
+        compiled = compile_serializer(self.serializer_class, **requested_fieldset(request))
+        if compiled is None:
+            return None
+
+        # conditional.instance_validators over the relations the viewset loads
+        model = self.serializer_class.Meta.model
+        rendered = {field.lookup.split("__")[0] for field in compiled.fields}
+        loaded = [
+            field.name
+            for field in model._meta.concrete_fields
+            if field.name in self.related and field.name in rendered
+        ]
+        try:
+            queryset = self.get_queryset(request.user).filter(pk=pk)
+        except (ValidationError, ValueError, TypeError):
+            rows = []
+        else:
+            queryset = compiled.rows(
+                queryset, "id", "updated_at", *[f"{name}__updated_at" for name in loaded]
+            )
+            rows = await fetch_values(queryset[:1])
+        if not rows:
+            return render(
+                request,
+                {"detail": f"No {model._meta.object_name} matches the given query."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        row = rows[0]
+        validators = [row["id"], row["updated_at"]]
+        for name in loaded:
+            if row[f"{name}__updated_at"] is not None:
+                validators.append(row[f"{name}__updated_at"])
+
+        async def build():
+            return render(request, compiled.to_representation(row))
+
+        return await self.conditional(request, validators, build)
+
+
+class LanguageRead(AsyncRead):
+    serializer_class = LanguageSerializer
+    cache_control = f"public, max-age={base.LANGUAGE_CACHE_MAX_AGE}"
+    conditional_list = True
+
+    def get_queryset(self, user):
+        return Language.objects.filter(is_active=True)
+
+
+class SyllabusRead(AsyncRead):
+    serializer_class = SyllabusSerializer
+    related = ("language",)
+
+    def get_queryset(self, user):
+        if getattr(user, "is_staff", False):
+            return Syllabus.objects.all()
+        return Syllabus.objects.filter(uid=user.id)
+
+
+class LessonRead(AsyncRead):
+    serializer_class = LessonSerializer
+    keyset_ordering = ("order", "id")
+    related = ("syllabus",)
+
+    def get_queryset(self, user):
+        return Lesson.objects.filter(uid=user.id)
+
+
+class ExerciseRead(AsyncRead):
+    serializer_class = ExerciseSerializer
+    keyset_ordering = ("order", "id")
+    related = ("lesson",)
+
+    def get_queryset(self, user):
+        return Exercise.objects.filter(uid=user.id)
+
+
+async def dashboard(request):
+    dashboard = await aget_dashboard(request.user.id)
+    return render(request, {**dashboard, "uid": request.user.id})
+
+
+ROUTES = {}
+for basename, handler in [
+    ("language", LanguageRead()),
+    ("syllabus", SyllabusRead()),
+    ("lesson", LessonRead()),
+    ("exercise", ExerciseRead()),
+]:
+    ROUTES[f"{basename}-list"] = handler.list
+    ROUTES[f"{basename}-detail"] = handler.retrieve
+ROUTES["progress-dashboard"] = dashboard
+
+
+_negotiation = DefaultContentNegotiation()
+
+
+def prepare(request):
+    """
+    request as an authenticated DRF Request negotiated to FastJSONRenderer,
+    or None when the viewset has to handle it (other renderers, missing or
+    rejected credentials)
+    """
+    request = Request(request)
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        renderer, media_type = _negotiation.select_renderer(request, renderers)
+    except NotAcceptable:
+        return None
+    if not isinstance(renderer, FastJSONRenderer):
+        return None
+    request.accepted_renderer, request.accepted_media_type = renderer, media_type
+
+    try:
+        credentials = JWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    if credentials is None:
+        return None
+    request.user = credentials[0]
+    return request
+
+
+def async_route(handler, fallback):
+    """A view serving GETs with handler and everything else with fallback"""
+    fallback = sync_to_async(fallback)
+
+    async def view(request, *args, **kwargs):
+        response = None
+        if request.method == "GET" and "format" not in kwargs:
+            drf_request = prepare(request)
+            if drf_request is not None:
+                try:
+                    response = await handler(drf_request, *args, **kwargs)
+                except APIException as exc:
+                    response = render(
+                        drf_request, {"detail": exc.detail}, status=exc.status_code
+                    )
+        if response is None:
+            response = await fallback(request, *args, **kwargs)
+        return response
+
+    # The fallback DRF views are csrf-exempt; the wrapper has to say so too
+    view.csrf_exempt = True
+    return view
+
+
+def async_urlpatterns(patterns):
+    """Router patterns with the routes in ROUTES served by async views"""
+    wrapped = []
+    for pattern in patterns:
+        handler = ROUTES.get(pattern.name)
+        if handler is not None:
+            pattern = URLPattern(
+                pattern.pattern,
+                async_route(handler, pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        wrapped.append(pattern)
+    return wrapped
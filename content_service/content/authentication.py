@@ -1,32 +1,74 @@
 import jwt
-import os
-import requests
+import time
+import hashlib
 import logging
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from types import SimpleNamespace
 from content_service_config.django import base
+from .caching import LocalTTLCache
 
 
 logger = logging.getLogger(__name__)
 
 JWT_KEY = base.JWT_KEY
+JWT_ALGORITHMS = [base.JWT_ALGORITHM]
+# Resolved once at import instead of on every decode
+JWT_VERIFYING_KEY = jwt.get_algorithm_by_name(base.JWT_ALGORITHM).prepare_key(JWT_KEY)
+
+# Verified principals keyed by token hash, each kept until its token's exp
+token_cache = LocalTTLCache(
+    maxsize=base.JWT_CACHE_SIZE, ttl=base.JWT_CACHE_DEFAULT_TTL
+)
+
+
+class AuthenticatedUser:
+    """Immutable principal built from the claims of a verified access token"""
+
+    __slots__ = (
+        "uid",
+        "email",
+        "username",
+        "is_staff",
+        "is_superuser",
+        "is_active",
+        "iat",
+        "exp",
+    )
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, uid, **claims):
+        object.__setattr__(self, "uid", uid)
+        for name in self.__slots__[1:]:
+            object.__setattr__(self, name, claims.get(name))
+
+    @classmethod
+    def from_claims(cls, payload):
+        return cls(**{name: payload.get(name) for name in cls.__slots__})
 
-class AuthenticatedUser(SimpleNamespace):
     @property
-    def is_authenticated(self):
-        return True
+    def id(self):
+        return self.uid
 
     @property
-    def is_anonymous(self):
-        return False
+    def pk(self):
+        return self.uid
 
-    @property
-    def is_active(self):
-        return getattr(self, "is_active", True)
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, AuthenticatedUser) and other.uid == self.uid
+
+    def __hash__(self):
+        return hash(self.uid)
 
     def __str__(self):
-        return f"User({getattr(self, 'uid', 'unknown')})"
+        return f"User({self.uid})"
 
 
 class JWTAuthentication(BaseAuthentication):
@@ -35,37 +77,32 @@ class JWTAuthentication(BaseAuthentication):
         if not auth_header or not auth_header.startswith("Bearer "):
             return None
 
-        token = auth_header.split(" ")[1]
+        token = auth_header[len("Bearer "):]
+        cache_key = hashlib.sha256(token.encode()).digest()
 
+        user = token_cache.get(cache_key)
+        if user is None:
+            user = self.verify_token(token)
+            ttl = None
+            if user.exp is not None:
+                ttl = user.exp - time.time()
+            token_cache.set(cache_key, user, ttl=ttl)
+
+        return (user, None)
+
+    def verify_token(self, token):
         try:
             payload = jwt.decode(
-                token, JWT_KEY,
-                algorithms=[env("JWT_ALGORITHM")],
+                token, JWT_VERIFYING_KEY,
+                algorithms=JWT_ALGORITHMS,
             )
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed("Expired token")
         except jwt.InvalidTokenError:
             raise AuthenticationFailed("Invalid token")
 
-        # Create user object that works with DRF
-        user = AuthenticatedUser(**payload)
-        return (user, None)
-
-    def validate_admin_user(self, uid):
-        try:
-            response = requests.post(
-                f"{self.base_url}/auth/service/validate-admin/",
-                json={"uid": uid},
-                headers=self.headers,
-                timeout=20,
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("is_staff", False) and data.get("is_active", False)
-
-            return False
+        if payload.get("uid") is None:
+            raise AuthenticationFailed("Invalid token")
 
-        except requests.RequestException as e:
-            logger.error(f"Error validating admin status for user {uid}: {e}")
-            return False
+        # Create user object that works with DRF
+        return AuthenticatedUser.from_claims(payload)
@@ -0,0 +1,278 @@
+import math
+import time
+import uuid
+import random
+import logging
+import threading
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+logger = logging.getLogger(__name__)
+
+# Stored in the shared tier in place of None, which Django's cache API
+# cannot tell apart from a miss
+NEGATIVE = "__negative__"
+
+_MISSING = object()
+
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU whose entries expire individually"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    In-process LRU in front of a shared Django cache (Redis).
+
+    Loader results of None are cached as negative entries with their own,
+    usually shorter, TTL. Failures of the shared tier degrade to the local
+    tier instead of failing the lookup. A result whose key was invalidated
+    while it loaded is returned but not cached.
+    """
+
+    def __init__(
+        self, prefix, ttl, negative_ttl, local_ttl, maxsize, alias="default"
+    ):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local = LocalTTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.alias = alias
+        # {cache key: [generation, loads in flight]} for keys being loaded;
+        # invalidate() bumps the generation
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get_or_load(self, key, loader):
+        cache_key = self.make_key(key)
+
+        value = self.local.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            return None if value == NEGATIVE else value
+
+        try:
+            value = self.shared.get(cache_key, _MISSING)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {cache_key}: {e}")
+            value = _MISSING
+
+        if value is _MISSING:
+            generation = self._start_load(cache_key)
+            try:
+                value = loader(key)
+            finally:
+                invalidated = self._finish_load(cache_key, generation)
+            if not invalidated:
+                self.set(key, value)
+            return value
+
+        self.local.set(cache_key, value)
+        return None if value == NEGATIVE else value
+
+    def _start_load(self, cache_key):
+        with self._lock:
+            loading = self._loading.setdefault(cache_key, [0, 0])
+            loading[1] += 1
+            return loading[0]
+
+    def _finish_load(self, cache_key, generation):
+        """Whether cache_key was invalidated since its load started"""
+        with self._lock:
+            loading = self._loading[cache_key]
+            loading[1] -= 1
+            if not loading[1]:
+                del self._loading[cache_key]
+            return loading[0] != generation
+
+    def _entry(self, key, value):
+        if value is None:
+            return self.make_key(key), NEGATIVE, self.negative_ttl
+        return self.make_key(key), value, self.ttl
+
+    def set(self, key, value):
+        cache_key, value, ttl = self._entry(key, value)
+        self.local.set(cache_key, value, ttl=min(ttl, self.local.ttl))
+        try:
+            self.shared.set(cache_key, value, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for {cache_key}: {e}")
+
+    def invalidate(self, key, shared=True):
+        cache_key = self.make_key(key)
+        with self._lock:
+            if cache_key in self._loading:
+                self._loading[cache_key][0] += 1
+        self.local.delete(cache_key)
+        if not shared:
+            return
+        try:
+            self.shared.delete(cache_key)
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed for {cache_key}: {e}")
+
+
+class VersionedCache:
+    """
+    Shared-cache entries grouped under namespaces that each carry a version
+    number. Entry keys embed the current version, so bump() invalidates a
+    whole namespace with one INCR and no key scan; superseded entries just
+    age out.
+
+    Recomputes are single-flight: one caller builds a missing entry under a
+    short lock while the others wait for it. Entries are also refreshed
+    early with probability rising towards expiry (XFetch), so hot keys are
+    rebuilt by one caller before they expire instead of by all at once.
+    """
+
+    def __init__(
+        self, prefix, ttl, beta=1.0, lock_ttl=10, wait=2.0, alias="default"
+    ):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.beta = beta
+        self.lock_ttl = lock_ttl
+        self.wait = wait
+        self.alias = alias
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def version_key(self, namespace):
+        return f"{self.prefix}:version:{namespace}"
+
+    def version(self, namespace):
+        key = self.version_key(namespace)
+        version = self.shared.get(key)
+        if version is None:
+            # A fresh, never-used version in case the counter was evicted
+            self.shared.add(key, time.time_ns(), timeout=None)
+            version = self.shared.get(key)
+        return version
+
+    def bump(self, namespace):
+        key = self.version_key(namespace)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            if not self.shared.add(key, time.time_ns(), timeout=None):
+                self.shared.incr(key)
+
+    def get_or_build(self, namespace, key, build):
+        if not self.ttl:
+            return build()
+        try:
+            cache_key = f"{self.prefix}:{namespace}:{self.version(namespace)}:{key}"
+            entry = self.shared.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Versioned cache read failed for {namespace}: {e}")
+            return build()
+
+        if entry is not None and not self._refresh_early(entry):
+            return entry["value"]
+
+        lock_key = f"{cache_key}:lock"
+        token = uuid.uuid4().hex
+        owns_lock = self._add(lock_key, token)
+        if not owns_lock:
+            if entry is not None:
+                return entry["value"]  # another caller is already refreshing
+            entry = self._wait_for(cache_key)
+            if entry is not None:
+                return entry["value"]
+
+        try:
+            started = time.monotonic()
+            value = build()
+            entry = {
+                "value": value,
+                "delta": time.monotonic() - started,
+                "expires": time.time() + self.ttl,
+            }
+            try:
+                self.shared.set(cache_key, entry, timeout=self.ttl)
+            except Exception as e:
+                logger.warning(f"Versioned cache write failed for {namespace}: {e}")
+        finally:
+            # A caller that gave up waiting builds without the lock and must
+            # not release it from under its holder
+            if owns_lock:
+                self._release(lock_key, token)
+        return value
+
+    def _refresh_early(self, entry):
+        # XFetch: refresh when now - delta * beta * ln(rand) passes expiry
+        jitter = entry["delta"] * self.beta * math.log(1.0 - random.random())
+        return time.time() - jitter >= entry["expires"]
+
+    def _wait_for(self, cache_key):
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                entry = self.shared.get(cache_key)
+            except Exception:
+                return None
+            if entry is not None:
+                return entry
+        return None
+
+    def _add(self, key, token):
+        try:
+            return self.shared.add(key, token, timeout=self.lock_ttl)
+        except Exception:
+            return True  # no shared lock to take; build without one
+
+    def _release(self, key, token):
+        # Only while it is still ours: a build outlasting lock_ttl may have
+        # let another caller take the lock
+        try:
+            if self.shared.get(key) == token:
+                self.shared.delete(key)
+        except Exception:
+            pass
@@ -0,0 +1,73 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import parse_etags, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+from content_service_config.django import base
+
+
+def make_etag(request, *validators):
+    """
+    Strong ETag for the representation at request's path and query string
+    whose data is identified by validators
+    """
+    parts = [
+        base.CONTENT_CACHE_VERSION,
+        request.get_full_path(),
+        getattr(request, "accepted_media_type", ""),
+        *validators,
+    ]
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def collection_validators(queryset):
+    """(latest updated_at, row count) of queryset, in one aggregation"""
+    totals = queryset.order_by().aggregate(latest=Max("updated_at"), count=Count("id"))
+    return totals["latest"], totals["count"]
+
+
+def instance_validators(instance):
+    """pk and updated_at of instance and of any related rows already loaded with it"""
+    validators = [instance.pk, instance.updated_at]
+    for field in instance._meta.concrete_fields:
+        if field.is_relation and field.is_cached(instance):
+            related = field.get_cached_value(instance)
+            if related is not None:
+                validators.append(related.updated_at)
+    return validators
+
+
+class ConditionalGetMixin:
+    """
+    ETag / If-None-Match for catalogue reads. Validators are read before
+    serialization, so a matching request returns 304 without running the
+    serializer.
+    """
+
+    cache_control = "private, no-cache"
+
+    def conditional_response(self, request, validators, build):
+        etag = make_etag(request, *validators)
+        matches = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in matches or matches == ["*"]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = build()
+        response["ETag"] = etag
+        response["Cache-Control"] = self.cache_control
+        # The ETag and body depend on the negotiated renderer, so shared
+        # caches must key public responses on Accept too
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request,
+            instance_validators(instance),
+            lambda: Response(self.serialize_instance(instance)),
+        )
+
+    def serialize_instance(self, instance):
+        return self.get_serializer(instance).data
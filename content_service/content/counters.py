@@ -0,0 +1,97 @@
+from django.db import connection
+from django.db.models import Count, Sum
+from django.utils import timezone
+from pymongo import UpdateOne
+from .models import Lesson, Exercise
+
+
+LESSON_COUNTERS = ("exercise_count", "total_points")
+SYLLABUS_COUNTERS = ("total_lessons", "total_points", "total_duration_minutes")
+
+
+def increment(model, pk, **deltas):
+    """Apply a single $inc to one document, skipping zero deltas"""
+    deltas = {
+        model._meta.get_field(name).column: delta
+        for name, delta in deltas.items()
+        if delta
+    }
+    if pk is None or not deltas:
+        return
+    pk_field = model._meta.pk
+    collection = connection.get_collection(model._meta.db_table)
+    collection.update_one(
+        {pk_field.column: pk_field.get_db_prep_value(pk, connection)},
+        {"$inc": deltas, "$set": touched(model)},
+    )
+
+
+def touched(model):
+    """$set bumping updated_at, which catalogue ETags are derived from"""
+    field = model._meta.get_field("updated_at")
+    return {field.column: field.get_db_prep_save(timezone.now(), connection)}
+
+
+def expected_lesson_counters():
+    """exercise_count and total_points for every lesson, from the exercises"""
+    rows = Exercise.objects.values("lesson").annotate(
+        count=Count("id"), points=Sum("points")
+    )
+    return {
+        row["lesson"]: {"exercise_count": row["count"], "total_points": row["points"] or 0}
+        for row in rows
+    }
+
+
+def expected_syllabus_counters():
+    """total_lessons, total_points and total_duration_minutes for every syllabus"""
+    lesson_points = {
+        lesson: counters["total_points"]
+        for lesson, counters in expected_lesson_counters().items()
+    }
+    totals = {}
+    lessons = Lesson.objects.values("id", "syllabus", "duration_minutes")
+    for lesson in lessons.iterator():
+        counters = totals.setdefault(
+            lesson["syllabus"],
+            {"total_lessons": 0, "total_points": 0, "total_duration_minutes": 0},
+        )
+        counters["total_lessons"] += 1
+        counters["total_points"] += lesson_points.get(lesson["id"], 0)
+        counters["total_duration_minutes"] += lesson["duration_minutes"]
+    return totals
+
+
+def find_drift(model, counters, expected):
+    """(pk, corrected counters) for rows whose stored counters differ"""
+    drifted = []
+    for row in model.objects.values("id", *counters).iterator():
+        pk = row.pop("id")
+        wanted = expected.get(pk, dict.fromkeys(counters, 0))
+        if row != wanted:
+            drifted.append((pk, wanted))
+    return drifted
+
+
+def apply_counters(model, corrections, batch_size=1000):
+    """$set corrected counters with unordered bulk writes"""
+    pk_field = model._meta.pk
+    collection = connection.get_collection(model._meta.db_table)
+    for start in range(0, len(corrections), batch_size):
+        operations = [
+            UpdateOne(
+                {pk_field.column: pk_field.get_db_prep_value(pk, connection)},
+                {
+                    "$set": {
+                        **touched(model),
+                        **{
+                            model._meta.get_field(name).column: value
+                            for name, value in counters.items()
+                        },
+                    }
+                },
+            )
+            for pk, counters in corrections[start:start + batch_size]
+        ]
+        collection.bulk_write(operations, ordered=False)
+
@@ -0,0 +1,53 @@
+from .renderers import FastJSONRenderer
+from .models import Exercise
+from .serializers import SyllabusSerializer, LessonSerializer, ExerciseSerializer
+
+
+renderer = FastJSONRenderer()
+
+
+def _line(kind, data):
+    return renderer.render({"type": kind, "data": data}) + b"\n"
+
+
+def _exercises_by_lesson(lessons):
+    """The exercises of a chunk of lessons in one query, grouped per lesson"""
+    grouped = {lesson.pk: [] for lesson in lessons}
+    exercises = Exercise.objects.filter(lesson__in=list(grouped)).order_by(
+        "lesson", "order", "id"
+    )
+    for exercise in exercises.iterator():
+        grouped[exercise.lesson_id].append(exercise)
+    return grouped
+
+
+def iter_syllabus_ndjson(syllabus, chunk_size=50):
+    """
+    The syllabus, then each lesson followed by its exercises, as NDJSON
+    lines of {"type": ..., "data": ...}. Lessons are read from a cursor in
+    chunks of chunk_size and each chunk's exercises in one query, so memory
+    holds at most one chunk however large the course is.
+    """
+    yield _line("syllabus", SyllabusSerializer(syllabus).data)
+
+    lessons = syllabus.lessons.order_by("order", "id").iterator(chunk_size=chunk_size)
+    chunk = []
+    for lesson in lessons:
+        chunk.append(lesson)
+        if len(chunk) == chunk_size:
+            yield from _chunk_lines(syllabus, chunk)
+            chunk = []
+    if chunk:
+        yield from _chunk_lines(syllabus, chunk)
+
+
+def _chunk_lines(syllabus, lessons):
+    grouped = _exercises_by_lesson(lessons)
+    for lesson in lessons:
+        # Reuse the loaded parents for syllabus_title / lesson_title
+        lesson.syllabus = syllabus
+        yield _line("lesson", LessonSerializer(lesson).data)
+        for exercise in grouped[lesson.pk]:
+            exercise.lesson = lesson
+            yield _line("exercise", ExerciseSerializer(exercise).data)
+
@@ -0,0 +1,122 @@
+import json
+import time
+import uuid
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for a burst of concurrent connects from a benchmark
+    request_queue_size = 256
+
+
+class FakeAIService:
+    """
+    A local stand-in for ai-agents-service for tests and benchmarks. It
+    answers the generation endpoints with canned results after latency
+    seconds, plus item_latency per lesson of a batch, and records every
+    (path, payload) it receives. With batch=False it answers the batch
+    endpoint 404, like a service deployed without it.
+
+        with FakeAIService(latency=0.05) as service:
+            client = ServiceClient(service.url)
+    """
+
+    def __init__(self, latency=0.0, item_latency=0.0, batch=True):
+        self.latency = latency
+        self.item_latency = item_latency
+        self.batch = batch
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real service behind uvicorn
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, result = service.handle(self.path, json.loads(body or b"{}"))
+                content = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def paths(self):
+        with self._lock:
+            return [path for path, _ in self.requests]
+
+    def handle(self, path, payload):
+        with self._lock:
+            self.requests.append((path, payload))
+        parameters = payload.get("parameters", {})
+
+        if path == "/api/v1/generate/exercises/batch" and self.batch:
+            requests = parameters.get("requests", [])
+            time.sleep(self.latency + self.item_latency * len(requests))
+            return 200, {"results": [self.exercises(request) for request in requests]}
+
+        time.sleep(self.latency + self.item_latency)
+        if path == "/api/v1/generate/exercises":
+            return 200, self.exercises(parameters)
+        if path == "/api/v1/generate/syllabus":
+            return 200, {
+                "syllabus_id": f"syllabus_{uuid.uuid4().hex[:8]}",
+                "modules": [
+                    {
+                        "module_id": "m1",
+                        "title": "Basics",
+                        "lessons": ["Greetings", "Numbers"],
+                    },
+                ],
+            }
+        if path == "/api/v1/generate/lesson":
+            return 200, {
+                "lesson_id": f"lesson_{uuid.uuid4().hex[:8]}",
+                "introduction": f"An introduction to {parameters.get('topic')}",
+                "main_content": "",
+            }
+        if path.startswith("/api/v1/generate/exercise/"):
+            return 200, {"exercise_id": f"exercise_{uuid.uuid4().hex[:8]}"}
+        return 404, {"detail": f"Unknown endpoint {path}"}
+
+    def exercises(self, parameters):
+        count = parameters.get("count_per_type", 5)
+        return {
+            "lesson_id": parameters.get("lesson_id"),
+            "exercise_set_id": f"exercises_{uuid.uuid4().hex[:8]}",
+            "exercises": {
+                exercise_type: [{"type": exercise_type, "index": i} for i in range(count)]
+                for exercise_type in parameters.get("exercise_types", [])
+            },
+            "estimated_completion_time": 20,
+        }
@@ -0,0 +1,134 @@
+import threading
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import PKOnlyObject, RelatedField
+from .caching import LocalTTLCache
+from .models import Language, Lesson, Exercise
+
+
+# Model properties that serializers read through dotted sources, as the
+# concrete field they are computed from plus the computation
+DERIVED_SOURCES = {
+    (Language, "display_name"): ("name", dict(Language.LANGUAGE_CHOICES).get),
+    (Lesson, "title"): ("topic", None),
+    (Exercise, "title"): ("topic", None),
+}
+
+
+class NotCompilable(Exception):
+    """The serializer has a field the fast path cannot reproduce"""
+
+
+class CompiledField:
+    __slots__ = ("name", "lookup", "relation", "represent", "derive")
+
+    def __init__(self, name, lookup, relation, represent, derive=None):
+        self.name = name
+        self.lookup = lookup
+        # values() key of the relation a dotted source goes through; DRF
+        # omits the field when that relation is null
+        self.relation = relation
+        self.represent = represent
+        self.derive = derive
+
+
+def _compile_field(model, field):
+    if field.source == "*":
+        raise NotCompilable(field.field_name)
+
+    if isinstance(field, RelatedField):
+        if field.source_attrs != [field.source] or not field.use_pk_only_optimization():
+            raise NotCompilable(field.field_name)
+        return CompiledField(
+            field.field_name,
+            field.source,
+            None,
+            lambda value, field=field: field.to_representation(PKOnlyObject(value)),
+        )
+
+    path = []
+    current = model
+    for attr in field.source_attrs[:-1]:
+        try:
+            relation = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise NotCompilable(field.field_name)
+        if not relation.many_to_one:
+            raise NotCompilable(field.field_name)
+        path.append(attr)
+        current = relation.related_model
+
+    name, derive = field.source_attrs[-1], None
+    if (current, name) in DERIVED_SOURCES:
+        name, derive = DERIVED_SOURCES[(current, name)]
+    try:
+        current._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise NotCompilable(field.field_name)
+
+    return CompiledField(
+        field.field_name,
+        "__".join([*path, name]),
+        "__".join(path[:1]) or None,
+        field.to_representation,
+        derive,
+    )
+
+
+class CompiledSerializer:
+    """
+    Read-only equivalent of a serializer's to_representation that works on
+    .values() rows: every field's source is resolved to a values() lookup
+    once, up front, instead of per instance and per request.
+    """
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        self.fields = [_compile_field(model, field) for field in serializer._readable_fields]
+        lookups = dict.fromkeys(field.lookup for field in self.fields)
+        lookups.update(dict.fromkeys(f.relation for f in self.fields if f.relation))
+        self.lookups = list(lookups)
+
+    def rows(self, queryset, *extra):
+        """queryset as values() rows carrying every lookup plus extra keys"""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def to_representation(self, row):
+        data = {}
+        for field in self.fields:
+            if field.relation and row[field.relation] is None:
+                continue  # DRF skips dotted sources through a null relation
+            value = row[field.lookup]
+            if value is not None and field.derive is not None:
+                value = field.derive(value, value)
+            data[field.name] = None if value is None else field.represent(value)
+        return data
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+_compiled = LocalTTLCache(maxsize=256, ttl=60 * 60)
+_compile_lock = threading.Lock()
+
+
+def compile_serializer(serializer_class, many=False, **fieldset):
+    """
+    CompiledSerializer for serializer_class with the given fields/omit, or
+    None when a field needs the full DRF path. Compilations are cached.
+    """
+    key = (
+        serializer_class,
+        many,
+        *(tuple(fieldset.get(name) or ()) for name in ("fields", "omit")),
+        *(name in fieldset for name in ("fields", "omit")),
+    )
+    compiled = _compiled.get(key)
+    if compiled is None:
+        with _compile_lock:
+            serializer = serializer_class(many=many, **fieldset)
+            try:
+                compiled = CompiledSerializer(serializer.child if many else serializer)
+            except NotCompilable:
+                compiled = False
+            _compiled.set(key, compiled)
+    return compiled or None
@@ -0,0 +1,190 @@
+import uuid
+import logging
+from datetime import timezone as dt_timezone
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from .models import Syllabus, Lesson, Exercise, UserProgress
+from .progress import schedule_summary_rebuild
+
+
+logger = logging.getLogger(__name__)
+
+# Key of a progress row; an upsert matches on all four
+KEY_FIELDS = ("uid", "syllabus", "lesson", "exercise")
+VALUE_FIELDS = ("completed", "score", "time_spent_seconds", "completion_date")
+
+
+def _uuid(value, required):
+    if value is None and not required:
+        return None
+    return uuid.UUID(str(value))
+
+
+def validate_event(raw):
+    """
+    (values, errors) for one bulk progress event. Plain checks in place of
+    UserProgressSerializer, which costs a serializer and a uniqueness query
+    per row.
+    """
+    if not isinstance(raw, dict):
+        return None, {"non_field_errors": ["Expected an object"]}
+
+    values, errors = {}, {}
+    for name in ("syllabus", "lesson", "exercise"):
+        try:
+            values[name] = _uuid(raw.get(name), required=name == "syllabus")
+        except (TypeError, ValueError):
+            errors[name] = ["Must be a valid UUID"]
+
+    completed = raw.get("completed", False)
+    if isinstance(completed, bool):
+        values["completed"] = completed
+    else:
+        errors["completed"] = ["Must be a boolean"]
+
+    for name, upper in (("score", 100), ("time_spent_seconds", None)):
+        value = raw.get(name, 0)
+        if not isinstance(value, int) or isinstance(value, bool):
+            errors[name] = ["Must be an integer"]
+        elif value < 0 or (upper is not None and value > upper):
+            errors[name] = [
+                f"Must be between 0 and {upper}" if upper else "Must not be negative"
+            ]
+        else:
+            values[name] = value
+
+    completion_date = raw.get("completion_date")
+    if completion_date is None:
+        values["completion_date"] = None
+    else:
+        try:
+            parsed = parse_datetime(completion_date)
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None:
+            errors["completion_date"] = ["Must be an ISO 8601 datetime"]
+        else:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed, dt_timezone.utc)
+            values["completion_date"] = parsed
+
+    if values.get("exercise") and not values.get("lesson") and "lesson" not in errors:
+        errors["lesson"] = ["Required when exercise is set"]
+    return (None, errors) if errors else (values, None)
+
+
+def check_references(events):
+    """
+    Error per event index whose syllabus, lesson or exercise does not exist
+    or does not belong to its parent, in three queries for the whole batch.
+    """
+    lessons = dict(
+        Lesson.objects.filter(
+            pk__in={values["lesson"] for _, values in events if values["lesson"]}
+        ).values_list("id", "syllabus_id")
+    )
+    exercises = dict(
+        Exercise.objects.filter(
+            pk__in={values["exercise"] for _, values in events if values["exercise"]}
+        ).values_list("id", "lesson_id")
+    )
+    syllabi = set(
+        Syllabus.objects.filter(
+            pk__in={values["syllabus"] for _, values in events}
+        ).values_list("id", flat=True)
+    )
+
+    errors = {}
+    for index, values in events:
+        if values["syllabus"] not in syllabi:
+            errors[index] = {"syllabus": ["Does not exist"]}
+        elif values["lesson"] and lessons.get(values["lesson"]) != values["syllabus"]:
+            errors[index] = {"lesson": ["Does not exist in this syllabus"]}
+        elif values["exercise"] and exercises.get(values["exercise"]) != values["lesson"]:
+            errors[index] = {"exercise": ["Does not exist in this lesson"]}
+    return errors
+
+
+def ingest_progress(uid, raw_events):
+    """
+    Upsert raw_events for uid with one unordered bulk_write keyed on
+    (uid, syllabus, lesson, exercise). Returns one result per event, in
+    order, with a status of created, updated, superseded (a later event
+    in the batch has the same key), invalid or failed, and whether the
+    summaries are still being updated.
+    """
+    results = [{"index": index} for index in range(len(raw_events))]
+    valid = []
+    for index, raw in enumerate(raw_events):
+        values, errors = validate_event(raw)
+        if errors:
+            results[index].update(status="invalid", errors=errors)
+        else:
+            valid.append((index, values))
+
+    for index, errors in check_references(valid).items() if valid else ():
+        results[index].update(status="invalid", errors=errors)
+    valid = [(index, values) for index, values in valid if "status" not in results[index]]
+
+    # Offline sessions replay in order, so the last event for a key wins
+    latest = {}
+    for index, values in valid:
+        key = (values["syllabus"], values["lesson"], values["exercise"])
+        if key in latest:
+            results[latest[key][0]]["status"] = "superseded"
+        latest[key] = (index, values)
+    if not latest:
+        return results, False
+
+    field = UserProgress._meta.get_field
+    column = lambda name: field(name).column  # noqa: E731
+    value = lambda name, v: field(name).get_db_prep_save(v, connection)  # noqa: E731
+    now = timezone.now()
+    indexes, operations = [], []
+    for index, values in latest.values():
+        key = {**values, "uid": uid}
+        indexes.append(index)
+        operations.append(
+            UpdateOne(
+                {column(name): value(name, key[name]) for name in KEY_FIELDS},
+                {
+                    "$set": {
+                        **{
+                            column(name): value(name, values[name])
+                            for name in VALUE_FIELDS
+                        },
+                        column("updated_at"): value("updated_at", now),
+                    },
+                    "$setOnInsert": {
+                        column("id"): value("id", uuid.uuid4()),
+                        column("created_at"): value("created_at", now),
+                    },
+                },
+                upsert=True,
+            )
+        )
+
+    collection = connection.get_collection(UserProgress._meta.db_table)
+    try:
+        outcome = collection.bulk_write(operations, ordered=False).bulk_api_result
+    except BulkWriteError as e:
+        outcome = e.details
+        logger.warning(
+            f"Bulk progress write for user {uid}: {len(outcome['writeErrors'])} errors"
+        )
+
+    for error in outcome.get("writeErrors", []):
+        results[indexes[error["index"]]].update(status="failed", error=error["errmsg"])
+    for upserted in outcome.get("upserted", []):
+        results[indexes[upserted["index"]]].update(
+            status="created", id=str(UserProgress._meta.pk.to_python(upserted["_id"]))
+        )
+    for index in indexes:
+        results[index].setdefault("status", "updated")
+
+    # The bulk write bypasses the signals that maintain the summaries
+    pending = schedule_summary_rebuild(uid, {syllabus for syllabus, _, _ in latest})
+    return results, pending
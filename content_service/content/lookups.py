@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from django_redis import get_redis_connection
+from content_service_config.django import base
+from .caching import TwoTierCache
+from .service_client import get_user_service_client
+
+
+logger = logging.getLogger(__name__)
+
+admin_cache = TwoTierCache(
+    "user-service:admin",
+    ttl=base.USER_LOOKUP_CACHE_TTL,
+    negative_ttl=base.USER_LOOKUP_NEGATIVE_TTL,
+    local_ttl=base.USER_LOOKUP_LOCAL_TTL,
+    maxsize=base.USER_LOOKUP_LOCAL_SIZE,
+)
+
+
+def _fetch_admin_status(uid):
+    response = get_user_service_client().validate_admin(uid)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    data = response.json()
+    return bool(data.get("is_admin", False) and data.get("is_active", False))
+
+
+def validate_admin_user(uid):
+    """Whether uid is an active admin, as last reported by user_service"""
+    _ensure_listener()
+    try:
+        return bool(admin_cache.get_or_load(uid, _fetch_admin_status))
+    except requests.RequestException as e:
+        logger.error(f"Error validating admin status for user {uid}: {e}")
+        return False
+
+
+def invalidate_user(uid, shared=True):
+    admin_cache.invalidate(uid, shared=shared)
+
+
+# Invalidation events published by user_service
+_listener_lock = threading.Lock()
+_listener_pid = None
+
+
+def _ensure_listener():
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        thread = threading.Thread(
+            target=_listen_for_invalidations, name="user-invalidation", daemon=True
+        )
+        thread.start()
+        _listener_pid = os.getpid()
+
+
+def _listen_for_invalidations():
+    channel = base.USER_INVALIDATION_CHANNEL
+    delay = 1
+    while True:
+        try:
+            pubsub = get_redis_connection("default").pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(channel)
+            delay = 1
+            for message in pubsub.listen():
+                _handle_invalidation(message)
+        except Exception as e:
+            logger.warning(f"User invalidation listener error, resubscribing: {e}")
+        # Entries may have changed while disconnected
+        admin_cache.local.clear()
+        time.sleep(delay)
+        delay = min(delay * 2, 60)
+
+
+def _handle_invalidation(message):
+    try:
+        uid = json.loads(message["data"])["uid"]
+    except (KeyError, TypeError, ValueError):
+        logger.warning(f"Ignoring malformed user invalidation: {message!r}")
+        return
+    # Every subscribed process deletes the shared entry; the delete is idempotent
+    invalidate_user(uid)
@@ -0,0 +1,150 @@
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from content.ai_engine import AIEngine
+from content.fake_ai_service import FakeAIService
+from content.service_client import ServiceClient
+
+
+ENDPOINT = "/api/v1/generate/exercises"
+PAYLOAD = {
+    "task": "generate_exercises",
+    "parameters": {
+        "lesson_id": "benchmark",
+        "exercise_types": ["multiple_choice", "flashcard"],
+        "level": "beginner",
+        "count_per_type": 5,
+    },
+}
+
+
+def _serve(latency, urls, stop):
+    with FakeAIService(latency=latency) as service:
+        urls.put(service.url)
+        stop.wait()
+
+
+def _report(results, work):
+    """Run work() in a child and put (peak RSS, None), or (None, error) if it failed"""
+    try:
+        work()
+    except Exception as e:
+        results.put((None, repr(e)))
+    else:
+        results.put((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, None))
+
+
+def _blocking_worker(url, requests, results):
+    """One prefork child: a blocking client, one request at a time"""
+
+    def work():
+        client = ServiceClient(url, connect_timeout=10.0, read_timeout=300.0)
+        for _ in range(requests):
+            client.request("POST", ENDPOINT, json=PAYLOAD).raise_for_status()
+        client.close()
+
+    _report(results, work)
+
+
+def _engine_worker(url, requests, concurrency, results):
+    """One thread-pool child: tasks on threads sharing an AIEngine"""
+
+    def work():
+        engine = AIEngine(url, concurrency, connect_timeout=10.0, read_timeout=300.0)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: engine.post(ENDPOINT, PAYLOAD), range(requests)))
+        engine.close()
+
+    _report(results, work)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare AI generation throughput per GB of worker RAM between prefork "
+        "workers blocking on each call and one thread-pool worker process on "
+        "the async AI engine, against a local stub ai-agents-service"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Per mode")
+        parser.add_argument(
+            "--processes", type=int, default=4, help="Prefork worker processes"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=64, help="Threads of the async worker"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.5, help="Stub response time, seconds"
+        )
+        parser.add_argument(
+            "--url", help="A running stub or ai-agents-service instead of the local stub"
+        )
+
+    def handle(self, *args, **options):
+        # Workers are forked from this process, as Celery's prefork pool does
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        stub = None
+        url = options["url"]
+        if url is None:
+            urls = context.Queue()
+            stub = context.Process(
+                target=_serve, args=(options["latency"], urls, stop), daemon=True
+            )
+            stub.start()
+            url = urls.get(timeout=10)
+
+        total = options["requests"]
+        processes = options["processes"]
+        try:
+            self.run(
+                context,
+                f"prefork x{processes}",
+                total,
+                [
+                    (_blocking_worker, (url, total // processes + (i < total % processes)))
+                    for i in range(processes)
+                ],
+            )
+            self.run(
+                context,
+                f"async x{options['concurrency']}",
+                total,
+                [(_engine_worker, (url, total, options["concurrency"]))],
+            )
+        finally:
+            stop.set()
+            if stub is not None:
+                stub.join(timeout=5)
+
+    def run(self, context, name, total, workers):
+        results = context.Queue()
+        children = [
+            context.Process(target=target, args=(*args, results))
+            for target, args in workers
+        ]
+        started = time.perf_counter()
+        for child in children:
+            child.start()
+        reports = [results.get() for _ in children]
+        elapsed = time.perf_counter() - started
+        for child in children:
+            child.join()
+        errors = [error for _, error in reports if error is not None]
+        for error in errors:
+            self.stderr.write(f"{name}: benchmark worker failed: {error}")
+        if errors:
+            raise CommandError(f"{name}: {len(errors)} worker(s) failed")
+        peaks = [peak for peak, _ in reports]
+
+        # ru_maxrss is in KiB on Linux
+        rss_gb = sum(peaks) / 1024**2
+
+        throughput = total / elapsed
+        self.stdout.write(
+            f"{name:>12}: {throughput:8.1f} req/s, {len(children):2} process(es), "
+            f"{rss_gb * 1024:7.1f} MB peak RSS, {throughput / rss_gb:9.1f} req/s per GB"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from content import ai_cache
+
+
+class Command(BaseCommand):
+    help = "Report AI result cache hits and misses per generation task"
+
+    def handle(self, *args, **options):
+        counters = ai_cache.stats()
+        if not counters:
+            self.stdout.write("No AI result cache lookups recorded")
+        for task, counts in sorted(counters.items()):
+            lookups = counts["hits"] + counts["misses"]
+            self.stdout.write(
+                f"{task}: {counts['hits']} hits, {counts['misses']} misses "
+                f"({counts['hits'] / lookups:.0%} hit rate)"
+            )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from content import ai_limiter
+
+
+class Command(BaseCommand):
+    help = "Report the fleet-wide ai-agents-service rate and concurrency limits"
+
+    def handle(self, *args, **options):
+        limits = ai_limiter.snapshot()
+        self.stdout.write(
+            f"concurrency: {limits['in_flight']} in flight, "
+            f"limit {limits['concurrency_limit']:.1f}"
+        )
+        self.stdout.write(
+            f"rate: {limits['rate']:g}/s, {limits['tokens']:.1f} tokens available"
+        )
+        if limits["blocked_for"]:
+            self.stdout.write(
+                f"paused by Retry-After for {limits['blocked_for']:.1f}s more"
+            )
+        self.stdout.write(
+            f"{limits['throttled']} calls throttled, "
+            f"{limits['overloaded']} overload responses"
+        )
@@ -0,0 +1,68 @@
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import get_runner
+from pymongo import monitoring
+from content.query_audit import QueryShapeRecorder, explain_shapes
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the test suite, record every query shape it sends to MongoDB and "
+        "report the shapes whose winning plan is a collection scan"
+    )
+    # The test runner runs the system checks once the test database exists
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "test_labels", nargs="*", help="Test labels to run (default: all tests)"
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="List every recorded shape, not only the collection scans",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with status 1 when any collection scan is found",
+        )
+
+    def handle(self, *args, **options):
+        # Registered before the first MongoClient is created so every
+        # client the suite opens reports its commands
+        recorder = QueryShapeRecorder()
+        monitoring.register(recorder)
+
+        report = []
+
+        class AuditRunner(get_runner(settings)):
+            def teardown_databases(self, old_config, **kwargs):
+                # Explain against the test database, which carries the
+                # indexes declared on the models
+                report.extend(explain_shapes(connection.database, recorder.shapes))
+                super().teardown_databases(old_config, **kwargs)
+
+        runner = AuditRunner(verbosity=0, interactive=False)
+        failures = runner.run_tests(options["test_labels"])
+        if failures:
+            self.stderr.write(f"{failures} test(s) failed; the report may be incomplete")
+
+        scans = 0
+        for collection, name, shape, calls, stages in report:
+            unindexed = "COLLSCAN" in stages
+            failed = any(stage.startswith("ERROR") for stage in stages)
+            scans += unindexed
+            if unindexed or failed or options["all"]:
+                line = f"{collection}.{name} x{calls} [{' > '.join(stages)}] {shape}"
+                self.stdout.write(self.style.WARNING(line) if unindexed or failed else line)
+
+        summary = f"{len(report)} query shapes, {scans} without an index"
+        if scans:
+            self.stdout.write(self.style.ERROR(summary))
+            if options["fail"]:
+                sys.exit(1)
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,117 @@
+import io
+import time
+import uuid
+import random
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from content.renderers import FastJSONRenderer, FastJSONParser, orjson
+
+
+def lesson_document(index, exercises=8, vocabulary=40):
+    """A serialized lesson shaped like the AI-generated ones, with its exercises"""
+    now = timezone.now()
+    words = [
+        {
+            "word": f"word-{index}-{i}",
+            "translation": f"translation {i}",
+            "pronunciation": f"/prəˌnʌn.siˈeɪ.ʃən {i}/",
+            "examples": [f"Example sentence {j} using word {i}." for j in range(3)],
+            "audio_url": f"https://cdn.example.com/audio/{uuid.uuid4()}.mp3",
+        }
+        for i in range(vocabulary)
+    ]
+    return {
+        "id": str(uuid.uuid4()),
+        "syllabus": str(uuid.uuid4()),
+        "syllabus_title": "Yorùbá for beginners",
+        "topic": f"Lesson {index}: greetings and introductions",
+        "description": "Ẹ kú àárọ̀ — greeting people at different times of day. " * 4,
+        "order": index,
+        "duration_minutes": 30,
+        "exercises_count": exercises,
+        "total_points": exercises * 10,
+        "created_at": now.isoformat(),
+        "updated_at": (now + timedelta(minutes=index)).isoformat(),
+        "content": {
+            "objectives": [f"Objective {i}" for i in range(5)],
+            "sections": [
+                {
+                    "heading": f"Section {s}",
+                    "body": "Lorem ipsum dolor sit amet, consectetur adipiscing. " * 20,
+                    "vocabulary": words[s * 10:(s + 1) * 10],
+                }
+                for s in range(4)
+            ],
+            "cultural_notes": ["Elders are greeted first, often while kneeling."] * 3,
+        },
+        "exercises": [
+            {
+                "id": str(uuid.uuid4()),
+                "exercise_type": "multiple_choice",
+                "points": 10,
+                "score": random.random() * 100,
+                "content": {
+                    "question": f"What does word-{index}-{i} mean?",
+                    "options": [f"option {o}" for o in range(4)],
+                    "answer": 0,
+                    "explanation": "Because it is the greeting used in the morning. " * 3,
+                },
+            }
+            for i in range(exercises)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's stdlib JSON renderer/parser with the orjson-backed ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=20, help="Lessons per payload")
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                self.style.WARNING("orjson is not installed; both use stdlib json")
+            )
+
+        payload = [lesson_document(i) for i in range(options["lessons"])]
+        iterations = options["iterations"]
+        body = JSONRenderer().render(payload)
+        if FastJSONRenderer().render(payload) != body:
+            self.stdout.write(self.style.ERROR("Renderer outputs differ"))
+        self.stdout.write(
+            f"Payload: {len(payload)} lessons, {len(body) / 1024:.0f} KiB, "
+            f"{iterations} iterations"
+        )
+
+        cases = [
+            ("render", JSONRenderer(), FastJSONRenderer(), lambda r: r.render(payload)),
+            (
+                "parse",
+                JSONParser(),
+                FastJSONParser(),
+                lambda p: p.parse(io.BytesIO(body), parser_context={"encoding": "utf-8"}),
+            ),
+        ]
+        for name, stdlib, fast, run in cases:
+            baseline = self.measure(lambda: run(stdlib), iterations)
+            accelerated = self.measure(lambda: run(fast), iterations)
+            self.stdout.write(
+                f"{name:>6}: stdlib {self.throughput(body, baseline)}, "
+                f"fast {self.throughput(body, accelerated)}, "
+                f"{baseline / accelerated:.1f}x"
+            )
+
+    def measure(self, call, iterations):
+        call()  # warm up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        return (time.perf_counter() - started) / iterations
+
+    def throughput(self, body, seconds):
+        return f"{1 / seconds:8.0f} ops/s {len(body) / seconds / 2**20:7.1f} MiB/s"
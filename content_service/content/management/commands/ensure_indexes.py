@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Index, UniqueConstraint
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the indexes and unique constraints declared on the content "
+        "models that are missing from MongoDB; safe to run on every start"
+    )
+
+    def handle(self, *args, **options):
+        # The content app has no migrations (its collections predate them and
+        # create_collection fails on existing ones), so migrate never builds
+        # its indexes; this does, skipping any whose keys already exist
+        created = 0
+        with connection.schema_editor() as editor:
+            for model in apps.get_app_config("content").get_models():
+                existing = self.existing(model)
+                for names, unique, build in self.declared(model):
+                    columns = tuple(model._meta.get_field(name).column for name in names)
+                    if columns in existing and (existing[columns] or not unique):
+                        continue
+                    build(editor)
+                    existing[columns] = unique
+                    created += 1
+                    self.stdout.write(
+                        f"{model._meta.db_table}: {'unique ' if unique else ''}"
+                        f"index on {', '.join(columns)}"
+                    )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} missing indexes"))
+
+    def declared(self, model):
+        """(field names, unique, build(editor)) for every index model declares"""
+        table = model._meta.db_table
+        for field in model._meta.local_fields:
+            if field.primary_key:
+                continue
+            if field.unique:
+                constraint = UniqueConstraint(
+                    fields=[field.name], name=f"{table}_{field.column}_uniq"
+                )
+                yield [field.name], True, (
+                    lambda editor, c=constraint: editor.add_constraint(model, c)
+                )
+            elif field.db_index:
+                index = Index(fields=[field.name], name=f"{table}_{field.column}_idx")
+                yield [field.name], False, (
+                    lambda editor, i=index: editor.add_index(model, i)
+                )
+        for fields in model._meta.unique_together:
+            yield list(fields), True, (
+                lambda editor, f=tuple(fields): editor.alter_unique_together(
+                    model, [], [f]
+                )
+            )
+        for index in model._meta.indexes:
+            yield [name for name, _ in index.fields_orders], False, (
+                lambda editor, i=index: editor.add_index(model, i)
+            )
+
+    def existing(self, model):
+        """{key columns: unique} for the indexes model's collection has"""
+        collection = connection.get_collection(model._meta.db_table)
+        existing = {}
+        for spec in collection.index_information().values():
+            columns = tuple(column for column, _ in spec["key"])
+            existing[columns] = existing.get(columns, False) or bool(spec.get("unique"))
+        return existing
@@ -0,0 +1,105 @@
+import time
+import asyncio
+import statistics
+import httpx
+import jwt
+from django.core.management.base import BaseCommand, CommandError
+from content_service_config.django import base
+
+
+DEFAULT_PATHS = [
+    "/api/languages/",
+    "/api/syllabi/",
+    "/api/lessons/",
+    "/api/exercises/",
+    "/api/progress/dashboard/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test running content_service deployments, e.g. the WSGI and the "
+        "ASGI (CONTENT_ASYNC_READS) mode side by side, over the read endpoints"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="+",
+            help="Deployments as name=base_url, e.g. wsgi=http://localhost:8000",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, repeatable (default: the catalogue and dashboard)",
+        )
+        parser.add_argument("--uid", type=int, default=1, help="User to sign a token for")
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=5000, help="Per target")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["targets"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url:
+                raise CommandError(f"Expected name=base_url, got {target!r}")
+            targets.append((name, url.rstrip("/")))
+
+        token = jwt.encode(
+            {"uid": options["uid"], "exp": int(time.time()) + 3600},
+            base.JWT_KEY,
+            algorithm=base.JWT_ALGORITHM,
+        )
+        paths = options["paths"] or DEFAULT_PATHS
+        for name, url in targets:
+            latencies, errors, elapsed = asyncio.run(
+                self.run(url, paths, token, options)
+            )
+            self.report(name, latencies, errors, elapsed)
+
+    async def run(self, url, paths, token, options):
+        limits = httpx.Limits(
+            max_connections=options["concurrency"],
+            max_keepalive_connections=options["concurrency"],
+        )
+        latencies, errors = [], 0
+        remaining = iter(range(options["requests"]))
+
+        async with httpx.AsyncClient(
+            base_url=url,
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+            limits=limits,
+            timeout=options["timeout"],
+        ) as client:
+
+            async def worker():
+                nonlocal errors
+                for i in remaining:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(paths[i % len(paths)])
+                        ok = response.status_code < 400
+                    except httpx.HTTPError:
+                        ok = False
+                    latencies.append(time.perf_counter() - started)
+                    errors += not ok
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(options["concurrency"])])
+            return latencies, errors, time.perf_counter() - started
+
+    def report(self, name, latencies, errors, elapsed):
+        if len(latencies) < 2:
+            self.stdout.write(f"{name}: too few requests completed")
+            return
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{name:>8}: {len(latencies) / elapsed:8.0f} req/s, "
+            f"p50 {percentiles[49] * 1000:7.1f} ms, "
+            f"p95 {percentiles[94] * 1000:7.1f} ms, "
+            f"p99 {percentiles[98] * 1000:7.1f} ms, "
+            f"{errors} errors of {len(latencies)}"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from content.progress import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute UserProgressSummary documents from user_progress"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--uid", type=int, help="Only rebuild this user's summaries")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_summaries(options["uid"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} progress summaries"))
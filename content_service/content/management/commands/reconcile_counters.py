@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from content.counters import (
+    LESSON_COUNTERS,
+    SYLLABUS_COUNTERS,
+    apply_counters,
+    expected_lesson_counters,
+    expected_syllabus_counters,
+    find_drift,
+)
+from content.models import Syllabus, Lesson
+from content.representations import bump_syllabus_version
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized lesson/syllabus counters and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted rows without writing corrections",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # Lessons first: syllabus points are derived from exercise points
+        targets = [
+            (Lesson, LESSON_COUNTERS, expected_lesson_counters()),
+            (Syllabus, SYLLABUS_COUNTERS, expected_syllabus_counters()),
+        ]
+        for model, counters, expected in targets:
+            drifted = find_drift(model, counters, expected)
+            name = model._meta.verbose_name_plural
+            if options["dry_run"]:
+                for pk, wanted in drifted:
+                    self.stdout.write(f"{name} {pk}: expected {wanted}")
+                self.stdout.write(f"{len(drifted)} {name} drifted")
+                continue
+            apply_counters(model, drifted, batch_size=options["batch_size"])
+            # Corrections bypass the signals that retire cached representations
+            pks = [pk for pk, _ in drifted]
+            if model is Lesson:
+                lessons = Lesson.objects.filter(pk__in=pks)
+                pks = set(lessons.values_list("syllabus_id", flat=True))
+            for syllabus_id in pks:
+                bump_syllabus_version(syllabus_id)
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {len(drifted)} {name}"))
@@ -9,9 +9,28 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     uid = models.IntegerField()  # Reference to user in user_service
 
+    # Denormalized counters kept current with $inc by content.signals; an
+    # in-memory copy is stale by definition, so save() never writes them back
+    counter_fields = ()
+
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        if (
+            self.counter_fields
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            skipped = set(self.counter_fields) | self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
 
 class Language(BaseModel):
     LANGUAGE_CHOICES = [
@@ -28,6 +47,15 @@ class Language(BaseModel):
 
     class Meta:
         db_table = "languages"
+        indexes = [
+            models.Index(
+                fields=["is_active", "created_at", "id"], name="languages_active_idx"
+            ),
+        ]
+
+    @property
+    def display_name(self):
+        return self.get_name_display()
 
     def __str__(self):
         return self.display_name
@@ -49,11 +77,20 @@ class Syllabus(BaseModel):
         ],
     )
     total_lessons = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    total_duration_minutes = models.IntegerField(default=0)
     duration_weeks = models.IntegerField(default=1)
 
+    counter_fields = ("total_lessons", "total_points", "total_duration_minutes")
+
     class Meta:
         db_table = "syllabi"
         verbose_name_plural = "syllabi"
+        indexes = [
+            models.Index(
+                fields=["uid", "created_at", "id"], name="syllabi_uid_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.language.display_name} - {self.title}"
@@ -69,11 +106,28 @@ class Lesson(BaseModel):
     content = models.JSONField(default=dict)  # AI-generated lesson content
     order = models.IntegerField(default=0)
     duration_minutes = models.IntegerField(default=30)
+    exercise_count = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    counter_fields = ("exercise_count", "total_points")
+
     class Meta:
         db_table = "lessons"
         ordering = ["order"]
+        indexes = [
+            models.Index(
+                fields=["uid", "syllabus", "order"], name="lessons_uid_syllabus_order_idx"
+            ),
+            models.Index(
+                fields=["syllabus", "order"], name="lessons_syllabus_order_idx"
+            ),
+            models.Index(fields=["uid", "order", "id"], name="lessons_uid_order_idx"),
+        ]
+
+    @property
+    def title(self):
+        return self.topic
 
     def __str__(self):
         return f"{self.syllabus.title} - {self.title}"
@@ -104,6 +158,17 @@ class Exercise(BaseModel):
     class Meta:
         db_table = "exercises"
         ordering = ["order"]
+        indexes = [
+            models.Index(
+                fields=["uid", "lesson", "order"], name="exercises_uid_lesson_order_idx"
+            ),
+            models.Index(fields=["lesson", "order"], name="exercises_lesson_order_idx"),
+            models.Index(fields=["uid", "order", "id"], name="exercises_uid_order_idx"),
+        ]
+
+    @property
+    def title(self):
+        return self.topic
 
     def __str__(self):
         return f"{self.lesson.topic} - {self.topic}"
@@ -125,11 +190,53 @@ class UserProgress(BaseModel):
     class Meta:
         db_table = "user_progress"
         unique_together = [["uid", "syllabus", "lesson", "exercise"]]
+        indexes = [
+            models.Index(
+                fields=["uid", "completed"], name="progress_uid_completed_idx"
+            ),
+            models.Index(
+                fields=["uid", "created_at", "id"], name="progress_uid_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"User {self.uid} - {self.syllabus.title}"
 
 
+class UserProgressSummary(BaseModel):
+    """
+    Per-user totals for one syllabus, maintained from UserProgress writes by
+    content.progress so dashboards never rescan user_progress.
+    """
+
+    syllabus = models.ForeignKey(
+        Syllabus, on_delete=models.CASCADE, related_name="progress_summaries"
+    )
+    completed_lessons = models.IntegerField(default=0)
+    completed_exercises = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    time_spent_seconds = models.IntegerField(default=0)
+    streak_days = models.IntegerField(default=0)
+    last_activity_date = models.DateField(null=True, blank=True)
+
+    counter_fields = (
+        "completed_lessons",
+        "completed_exercises",
+        "total_points",
+        "time_spent_seconds",
+        "streak_days",
+        "last_activity_date",
+    )
+
+    class Meta:
+        db_table = "user_progress_summaries"
+        unique_together = [["uid", "syllabus"]]
+        verbose_name_plural = "user progress summaries"
+
+    def __str__(self):
+        return f"User {self.uid} - {self.syllabus.title} summary"
+
+
 class UserLearningPath(BaseModel):
     language = models.ForeignKey(Language, on_delete=models.CASCADE)
     current_syllabus = models.ForeignKey(
@@ -148,9 +255,66 @@ class UserLearningPath(BaseModel):
     last_activity_date = models.DateField(auto_now=True)
     total_points = models.IntegerField(default=0)
 
+    counter_fields = ("total_points",)
+
     class Meta:
         db_table = "user_learning_paths"
         unique_together = [["uid", "language"]]
+        indexes = [
+            models.Index(
+                fields=["uid", "created_at", "id"], name="paths_uid_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"User {self.uid} - {self.language.language_id}"
+
+
+class CourseBuild(BaseModel):
+    """
+    A complete course generated by the content.tasks workflow, with the
+    progress its tasks report as they finish, for the client to poll
+    """
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+    STAGE_CHOICES = [
+        ("syllabus", "Syllabus"),
+        ("lessons", "Lessons"),
+        ("exercises", "Exercises"),
+        ("done", "Done"),
+    ]
+
+    language = models.CharField(max_length=50, choices=Language.LANGUAGE_CHOICES)
+    level = models.CharField(
+        max_length=20,
+        choices=[
+            ("beginner", "Beginner"),
+            ("intermediate", "Intermediate"),
+            ("advanced", "Advanced"),
+        ],
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default="syllabus")
+    total_lessons = models.IntegerField(default=0)
+    completed_lessons = models.IntegerField(default=0)
+    completed_exercise_sets = models.IntegerField(default=0)
+    task_id = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    counter_fields = ("completed_lessons", "completed_exercise_sets")
+
+    class Meta:
+        db_table = "course_builds"
+        indexes = [
+            models.Index(
+                fields=["uid", "created_at", "id"], name="builds_uid_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"User {self.uid} - {self.language} {self.level} course build"
@@ -0,0 +1,192 @@
+import json
+import base64
+import binascii
+from types import SimpleNamespace
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination over a unique ordering, (created_at, id) unless the view
+    sets keyset_ordering. Each page is one indexed range query: no count()
+    and no skip, so page 1000 costs the same as page 1.
+
+    Cursors are opaque base64 tokens holding the boundary row's ordering
+    values. ?count=approximate adds an approximate_count to the response.
+    """
+
+    ordering = ("created_at", "id")
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    # Filtered querysets are counted up to this many rows
+    approximate_count_limit = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if request.query_params.get(self.count_query_param) == "approximate":
+            self.approximate_count = self.get_approximate_count(self.unseeked)
+        return self.paginate_rows(list(queryset[:self.size + 1]))
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        queryset ordered and seeked to the requested page; the page is its
+        first size + 1 rows, which paginate_rows() turns into the results.
+        The ordered queryset before seeking, which every page counts the
+        same, is kept as unseeked.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        self.fields = [queryset.model._meta.get_field(name) for name in self.ordering]
+        self.size = self.get_page_size(request)
+        self.approximate_count = None
+
+        self.position, self.reverse = self.decode_cursor(request)
+        if self.reverse:
+            queryset = queryset.order_by(*[f"-{name}" for name in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        self.unseeked = queryset
+        if self.position is not None:
+            queryset = queryset.filter(self.seek(self.position, self.reverse))
+        return queryset
+
+    def paginate_rows(self, rows):
+        position, reverse = self.position, self.reverse
+        more = len(rows) > self.size
+        rows = rows[:self.size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows:
+            # A cursor means rows exist on the side we came from
+            if more or reverse:
+                self.next_position = self.position_of(rows[-1])
+            if (more and reverse) or (position is not None and not reverse):
+                self.previous_position = self.position_of(rows[0])
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def seek(self, position, reverse):
+        """Rows strictly after position in (reversed) ordering order"""
+        lookup = "lt" if reverse else "gt"
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, position):
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def position_of(self, row):
+        if isinstance(row, dict):  # .values() rows
+            row = SimpleNamespace(**{f.attname: row[f.name] for f in self.fields})
+        return [field.value_to_string(row) for field in self.fields]
+
+    def encode_cursor(self, position, reverse):
+        token = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(token["p"]) != len(self.fields):
+                raise ValueError(cursor)
+            position = [
+                field.to_python(value) for field, value in zip(self.fields, token["p"])
+            ]
+            return position, bool(token["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_approximate_count(self, queryset):
+        """
+        Collection-wide estimate from collection metadata when the queryset
+        is unfiltered, otherwise an exact count capped at
+        approximate_count_limit.
+        """
+        if not queryset.query.where:
+            collection = connection.get_collection(queryset.model._meta.db_table)
+            return collection.estimated_document_count()
+        return queryset.order_by()[: self.approximate_count_limit].count()
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        response = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.approximate_count is not None:
+            response["approximate_count"] = self.approximate_count
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "approximate_count": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'approximate' to include approximate_count.",
+                "schema": {"type": "string", "enum": ["approximate"]},
+            },
+        ]
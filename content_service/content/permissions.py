@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .authentication import JWTAuthentication
+from .roles import is_admin
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -11,7 +11,7 @@ class IsAdminUser(permissions.BasePermission):
         if getattr(request.user, "uid", None) == 0:
             return True
 
-        return JWTAuthentication.validate_admin_user(request.user.uid)
+        return is_admin(request.user)
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -22,10 +22,11 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # Check for ownership
         is_owner = hasattr(obj, "uid") and obj.uid == request.user.uid
 
-        # Check for admin
-        is_admin = JWTAuthentication.validate_admin_user(request.user.uid)
-
         # Service-user bypass
         is_service_user = getattr(request.user, "uid", None) == 0
 
-        return is_owner or is_admin or is_service_user
+        if is_owner or is_service_user:
+            return True
+
+        # Check for admin
+        return is_admin(request.user)
@@ -0,0 +1,601 @@
+import json
+import uuid
+import logging
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django_redis import get_redis_connection
+from pymongo import UpdateOne
+from content_service_config.django import base
+from .models import Syllabus, UserProgress, UserProgressSummary, UserLearningPath
+from .async_db import fetch_values
+
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_TOTALS = (
+    "completed_lessons",
+    "completed_exercises",
+    "total_points",
+    "time_spent_seconds",
+)
+
+# UserProgress fields a summary depends on
+TRACKED_FIELDS = (
+    "syllabus_id",
+    "lesson_id",
+    "exercise_id",
+    "completed",
+    "score",
+    "time_spent_seconds",
+)
+
+SUMMARY_QUEUE = "progress-summary:queue"
+# The batch being applied; it is only deleted once the apply succeeded. A
+# later drain finding one left by a failed or killed apply cannot tell which
+# of its $inc deltas landed, so it rebuilds the summaries it touched instead
+SUMMARY_PROCESSING = "progress-summary:processing"
+FLUSH_SCHEDULED = "progress-summary:flush-scheduled"
+# Held while the queue is drained, so batches are applied one at a time
+DRAIN_LOCK = "progress-summary:drain-lock"
+DRAIN_LOCK_TIMEOUT = 300
+
+# Moves up to ARGV[1] events from the head of the queue to the processing list
+CLAIM_BATCH = """
+local events = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #events > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(events))
+    redis.call('LTRIM', KEYS[1], #events, -1)
+end
+return events
+"""
+
+
+def _column(model, name):
+    return model._meta.get_field(name).column
+
+
+def _db_value(model, name, value):
+    return model._meta.get_field(name).get_db_prep_save(value, connection)
+
+
+# Write side: UserProgress changes become summary deltas
+def contribution(state):
+    """What one UserProgress row adds to its (uid, syllabus) summary"""
+    completed = bool(state.get("completed"))
+    return {
+        "completed_lessons": int(completed and state.get("lesson_id") is not None),
+        "completed_exercises": int(completed and state.get("exercise_id") is not None),
+        "total_points": (state.get("score") or 0) if completed else 0,
+        "time_spent_seconds": state.get("time_spent_seconds") or 0,
+    }
+
+
+def summary_events(uid, previous, current, activity=None):
+    """
+    Deltas turning previous into current, one per affected syllabus.
+    previous/current are TRACKED_FIELDS dicts, or None for create/delete.
+    """
+    events = []
+    if previous and (not current or previous["syllabus_id"] != current["syllabus_id"]):
+        removed = contribution(previous)
+        events.append(
+            {
+                "uid": uid,
+                "syllabus": str(previous["syllabus_id"]),
+                "deltas": {name: -value for name, value in removed.items()},
+            }
+        )
+        previous = None
+
+    if current:
+        added = contribution(current)
+        if previous:
+            before = contribution(previous)
+            added = {name: value - before[name] for name, value in added.items()}
+        event = {"uid": uid, "syllabus": str(current["syllabus_id"]), "deltas": added}
+        if activity is not None:
+            event["activity"] = activity.isoformat()
+        events.append(event)
+
+    return [
+        event for event in events
+        if any(event["deltas"].values()) or "activity" in event
+    ]
+
+
+def enqueue_summary_events(events):
+    """Queue events for the write-behind flush, applying them inline if Redis is down"""
+    if not events:
+        return
+    if not base.PROGRESS_SUMMARY_FLUSH_DELAY:
+        apply_summary_events(events)
+        return
+    try:
+        redis = get_redis_connection("default")
+        redis.rpush(SUMMARY_QUEUE, *[json.dumps(event) for event in events])
+    except Exception as e:
+        logger.warning(f"Progress summary queue unavailable, applying inline: {e}")
+        apply_summary_events(events)
+        return
+
+    # The events are queued now; a failure here only delays their flush
+    try:
+        if cache.add(FLUSH_SCHEDULED, 1, timeout=base.PROGRESS_SUMMARY_FLUSH_DELAY):
+            from .tasks import flush_progress_summaries
+
+            flush_progress_summaries.apply_async(
+                countdown=base.PROGRESS_SUMMARY_FLUSH_DELAY
+            )
+    except Exception as e:
+        logger.warning(f"Could not schedule a progress summary flush: {e}")
+        try:
+            # Let the next enqueue schedule it
+            cache.delete(FLUSH_SCHEDULED)
+        except Exception:
+            pass
+
+
+def schedule_summary_rebuild(uid, syllabi):
+    """
+    Rebuild uid's summaries for syllabi on a worker, or inline when
+    summaries are applied synchronously or the task cannot be queued;
+    returns whether the rebuild was deferred
+    """
+    if base.PROGRESS_SUMMARY_FLUSH_DELAY:
+        try:
+            from .tasks import rebuild_progress_summaries
+
+            rebuild_progress_summaries.delay(uid, [str(syllabus) for syllabus in syllabi])
+            return True
+        except Exception as e:
+            logger.warning(f"Could not queue a summary rebuild for user {uid}: {e}")
+    rebuild_summaries(uid, syllabi)
+    return False
+
+
+def _queue_lock(redis):
+    return redis.lock(
+        DRAIN_LOCK, timeout=DRAIN_LOCK_TIMEOUT, blocking_timeout=DRAIN_LOCK_TIMEOUT
+    )
+
+
+def drain_summary_queue(batch_size=1000):
+    """Apply queued events in batches until the queue is empty"""
+    cache.delete(FLUSH_SCHEDULED)
+    redis = get_redis_connection("default")
+    applied = 0
+    with _queue_lock(redis) as lock:
+        leftover = redis.lrange(SUMMARY_PROCESSING, 0, -1)
+        if leftover:
+            _rebuild_leftover(redis, [json.loads(item) for item in leftover], batch_size)
+            applied += len(leftover)
+            lock.reacquire()
+        while True:
+            raw = redis.eval(CLAIM_BATCH, 2, SUMMARY_QUEUE, SUMMARY_PROCESSING, batch_size)
+            if not raw:
+                return applied
+            apply_summary_events([json.loads(item) for item in raw])
+            redis.delete(SUMMARY_PROCESSING)
+            applied += len(raw)
+            lock.reacquire()
+
+
+def _rebuild_leftover(redis, events, batch_size):
+    """Recompute the summaries a batch that may be partly applied touched"""
+    scopes = {}
+    for event in events:
+        scopes.setdefault(event["uid"], set()).add(event["syllabus"])
+    logger.warning(f"Rebuilding summaries of {len(scopes)} users after an interrupted flush")
+    for uid, syllabi in scopes.items():
+        syllabi = {uuid.UUID(syllabus) for syllabus in syllabi}
+        # Their queued events are part of user_progress too
+        _discard_queued(redis, uid, syllabi)
+        _rebuild_summaries(uid, syllabi, batch_size)
+    redis.delete(SUMMARY_PROCESSING)
+
+
+def discard_summary_events(uid=None, syllabi=None):
+    """
+    Drop queued events that a rebuild of uid's (or every) summaries for
+    syllabi (or all of them) is about to recompute; returns the queue lock,
+    held so no flush applies events until the rebuild releases it
+    """
+    redis = get_redis_connection("default")
+    lock = _queue_lock(redis)
+    if not lock.acquire():
+        raise TimeoutError("Progress summary queue is locked")
+    try:
+        _discard_queued(redis, uid, syllabi)
+    except Exception:
+        lock.release()
+        raise
+    return lock
+
+
+def _discard_queued(redis, uid, syllabi):
+    scope = None if syllabi is None else {str(syllabus) for syllabus in syllabi}
+    for key in (SUMMARY_PROCESSING, SUMMARY_QUEUE):
+        with redis.pipeline() as pipeline:
+            pipeline.lrange(key, 0, -1)
+            pipeline.delete(key)
+            raw, _ = pipeline.execute()
+        kept = []
+        for item in raw:
+            event = json.loads(item)
+            if (uid is None or event["uid"] == uid) and (
+                scope is None or event["syllabus"] in scope
+            ):
+                continue
+            kept.append(item)
+        if kept:
+            # Back ahead of anything queued meanwhile
+            redis.lpush(key, *reversed(kept))
+
+
+def _next_streak(streak, last_activity, activity):
+    if last_activity is None or activity > last_activity + timedelta(days=1):
+        return 1
+    if activity == last_activity + timedelta(days=1):
+        return streak + 1
+    return streak
+
+
+def apply_summary_events(events):
+    """Fold events per (uid, syllabus) and upsert them with one bulk write"""
+    merged = {}
+    for event in events:
+        key = (event["uid"], uuid.UUID(event["syllabus"]))
+        entry = merged.setdefault(
+            key, {"deltas": dict.fromkeys(DASHBOARD_TOTALS, 0), "activity": []}
+        )
+        for name, value in event["deltas"].items():
+            entry["deltas"][name] += value
+        if "activity" in event:
+            entry["activity"].append(date.fromisoformat(event["activity"]))
+    # Progress deleted by a syllabus cascade has nothing left to update
+    languages = dict(
+        Syllabus.objects.filter(pk__in={syllabus for _, syllabus in merged}).values_list(
+            "id", "language_id"
+        )
+    )
+    merged = {key: entry for key, entry in merged.items() if key[1] in languages}
+    if not merged:
+        return
+
+    existing = {
+        (row["uid"], row["syllabus"]): row
+        for row in UserProgressSummary.objects.filter(
+            uid__in={uid for uid, _ in merged},
+            syllabus__in={syllabus for _, syllabus in merged},
+        ).values("uid", "syllabus", "streak_days", "last_activity_date")
+    }
+
+    column = lambda name: _column(UserProgressSummary, name)  # noqa: E731
+    value = lambda name, v: _db_value(UserProgressSummary, name, v)  # noqa: E731
+    now = timezone.now()
+    operations = []
+    for (uid, syllabus), entry in merged.items():
+        row = existing.get((uid, syllabus), {})
+        streak = row.get("streak_days", 0)
+        last_activity = row.get("last_activity_date")
+        for activity in sorted(entry["activity"]):
+            streak = _next_streak(streak, last_activity, activity)
+            last_activity = max(activity, last_activity or activity)
+
+        update = {
+            "$inc": {column(name): delta for name, delta in entry["deltas"].items()},
+            "$set": {column("updated_at"): value("updated_at", now)},
+            "$setOnInsert": {
+                column("id"): value("id", uuid.uuid4()),
+                column("created_at"): value("created_at", now),
+            },
+        }
+        if entry["activity"]:
+            update["$set"][column("streak_days")] = streak
+            update["$set"][column("last_activity_date")] = value(
+                "last_activity_date", last_activity
+            )
+        else:
+            update["$setOnInsert"][column("streak_days")] = 0
+            update["$setOnInsert"][column("last_activity_date")] = None
+
+        operations.append(
+            UpdateOne(
+                {column("uid"): uid, column("syllabus"): value("syllabus", syllabus)},
+                update,
+                upsert=True,
+            )
+        )
+
+    connection.get_collection(UserProgressSummary._meta.db_table).bulk_write(
+        operations, ordered=False
+    )
+    _apply_learning_path_points(merged, languages)
+    for uid in {uid for uid, _ in merged}:
+        invalidate_dashboard(uid)
+
+
+def _apply_learning_path_points(merged, languages):
+    points = {}
+    for (uid, syllabus), entry in merged.items():
+        if entry["deltas"]["total_points"]:
+            key = (uid, languages[syllabus])
+            points[key] = points.get(key, 0) + entry["deltas"]["total_points"]
+    if not points:
+        return
+
+    operations = [
+        UpdateOne(
+            {
+                _column(UserLearningPath, "uid"): uid,
+                _column(UserLearningPath, "language"): _db_value(
+                    UserLearningPath, "language", language
+                ),
+            },
+            {"$inc": {_column(UserLearningPath, "total_points"): delta}},
+        )
+        for (uid, language), delta in points.items()
+        if delta
+    ]
+    if operations:
+        connection.get_collection(UserLearningPath._meta.db_table).bulk_write(
+            operations, ordered=False
+        )
+
+
+# Rebuild: recompute summaries from the raw progress rows
+def _completed_with(column):
+    # Missing and null references both fail $gt null
+    completed = f"${_column(UserProgress, 'completed')}"
+    return {"$cond": [{"$and": [completed, {"$gt": [f"${column}", None]}]}, 1, 0]}
+
+
+def progress_totals(uid=None, syllabi=None):
+    """
+    Summary values for every (uid, syllabus) with progress, optionally only
+    uid's and only for the given syllabi, from a single $group over
+    user_progress.
+    """
+    column = lambda name: _column(UserProgress, name)  # noqa: E731
+    completed = f"${column('completed')}"
+    activity = {"$ifNull": [f"${column('completion_date')}", f"${column('updated_at')}"]}
+    pipeline = [
+        {
+            "$group": {
+                "_id": {"uid": f"${column('uid')}", "syllabus": f"${column('syllabus')}"},
+                "completed_lessons": {"$sum": _completed_with(column("lesson"))},
+                "completed_exercises": {"$sum": _completed_with(column("exercise"))},
+                "total_points": {"$sum": {"$cond": [completed, f"${column('score')}", 0]}},
+                "time_spent_seconds": {"$sum": f"${column('time_spent_seconds')}"},
+                "activity_dates": {
+                    "$addToSet": {"$dateToString": {"format": "%Y-%m-%d", "date": activity}}
+                },
+            }
+        },
+    ]
+    match = {}
+    if uid is not None:
+        match[column("uid")] = uid
+    if syllabi is not None:
+        match[column("syllabus")] = {
+            "$in": [_db_value(UserProgress, "syllabus", syllabus) for syllabus in syllabi]
+        }
+    if match:
+        pipeline.insert(0, {"$match": match})
+
+    collection = connection.get_collection(UserProgress._meta.db_table)
+    for row in collection.aggregate(pipeline, allowDiskUse=True):
+        key = row.pop("_id")
+        dates = sorted(date.fromisoformat(value) for value in row.pop("activity_dates"))
+        streak, last_activity = 0, None
+        for activity_date in dates:
+            streak = _next_streak(streak, last_activity, activity_date)
+            last_activity = activity_date
+        yield {
+            "uid": key["uid"],
+            "syllabus": Syllabus._meta.pk.to_python(key["syllabus"]),
+            "streak_days": streak,
+            "last_activity_date": last_activity,
+            **row,
+        }
+
+
+def rebuild_summaries(uid=None, syllabi=None, batch_size=1000):
+    """
+    Overwrite summaries (all, or uid's, optionally only for syllabi) with
+    values recomputed from user_progress, drop summaries with no progress
+    left and resync the affected learning path points. Returns the number
+    of summaries written.
+    """
+    # Queued deltas are already part of user_progress; applied on top of
+    # the recomputed values they would be counted twice
+    lock = None
+    try:
+        lock = discard_summary_events(uid, syllabi)
+    except Exception as e:
+        logger.warning(f"Could not discard queued summary events before rebuild: {e}")
+    try:
+        return _rebuild_summaries(uid, syllabi, batch_size)
+    finally:
+        if lock is not None:
+            try:
+                lock.release()
+            except Exception as e:
+                # Expired during a long rebuild; flushes already resumed
+                logger.warning(f"Summary queue lock lost during rebuild: {e}")
+
+
+def _rebuild_summaries(uid, syllabi, batch_size):
+    column = lambda name: _column(UserProgressSummary, name)  # noqa: E731
+    value = lambda name, v: _db_value(UserProgressSummary, name, v)  # noqa: E731
+    fields = (*DASHBOARD_TOTALS, "streak_days", "last_activity_date")
+    collection = connection.get_collection(UserProgressSummary._meta.db_table)
+
+    now = timezone.now()
+    kept = {}
+    operations = []
+    written = 0
+    for row in progress_totals(uid, syllabi):
+        kept.setdefault(row["uid"], set()).add(row["syllabus"])
+        operations.append(
+            UpdateOne(
+                {
+                    column("uid"): row["uid"],
+                    column("syllabus"): value("syllabus", row["syllabus"]),
+                },
+                {
+                    "$set": {
+                        **{column(name): value(name, row[name]) for name in fields},
+                        column("updated_at"): value("updated_at", now),
+                    },
+                    "$setOnInsert": {
+                        column("id"): value("id", uuid.uuid4()),
+                        column("created_at"): value("created_at", now),
+                    },
+                },
+                upsert=True,
+            )
+        )
+        if len(operations) >= batch_size:
+            collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+        written += len(operations)
+
+    stale = UserProgressSummary.objects.all()
+    if uid is not None:
+        stale = stale.filter(uid=uid)
+    if syllabi is not None:
+        stale = stale.filter(syllabus__in=syllabi)
+    UserProgressSummary.objects.filter(
+        pk__in=[
+            pk
+            for pk, summary_uid, syllabus in stale.values_list("id", "uid", "syllabus")
+            if syllabus not in kept.get(summary_uid, ())
+        ]
+    ).delete()
+
+    rebuild_learning_path_points(uid)
+    for summary_uid in kept if uid is None else [uid]:
+        invalidate_dashboard(summary_uid)
+    return written
+
+
+def rebuild_learning_path_points(uid=None):
+    """Set UserLearningPath.total_points to the sum of its language's summaries"""
+    paths = UserLearningPath.objects.all()
+    summaries = UserProgressSummary.objects.all()
+    if uid is not None:
+        paths = paths.filter(uid=uid)
+        summaries = summaries.filter(uid=uid)
+
+    rows = list(summaries.values_list("uid", "syllabus", "total_points"))
+    languages = dict(
+        Syllabus.objects.filter(pk__in={row[1] for row in rows}).values_list(
+            "id", "language_id"
+        )
+    )
+    points = {}
+    for summary_uid, syllabus, total in rows:
+        key = (summary_uid, languages.get(syllabus))
+        points[key] = points.get(key, 0) + total
+
+    operations = [
+        UpdateOne(
+            {_column(UserLearningPath, "id"): _db_value(UserLearningPath, "id", pk)},
+            {"$set": {_column(UserLearningPath, "total_points"): expected}},
+        )
+        for pk, path_uid, language, current in paths.values_list(
+            "id", "uid", "language", "total_points"
+        )
+        if current != (expected := points.get((path_uid, language), 0))
+    ]
+    if operations:
+        connection.get_collection(UserLearningPath._meta.db_table).bulk_write(
+            operations, ordered=False
+        )
+
+
+# Read side
+def summary_rows(uid):
+    return UserProgressSummary.objects.filter(uid=uid).values(
+        "syllabus", *DASHBOARD_TOTALS, "streak_days", "last_activity_date"
+    )
+
+
+def _totals(rows):
+    totals = dict.fromkeys(DASHBOARD_TOTALS, 0)
+    syllabi = []
+    for row in rows:
+        for name in DASHBOARD_TOTALS:
+            totals[name] += row[name]
+        syllabi.append({**row, "syllabus": str(row["syllabus"])})
+
+    totals["syllabi"] = sorted(syllabi, key=lambda row: row["syllabus"])
+    return totals
+
+
+def summary_totals(uid):
+    """Dashboard totals for uid, overall and per syllabus, from its summaries"""
+    return _totals(summary_rows(uid))
+
+
+def dashboard_cache_key(uid):
+    return f"progress-dashboard:{uid}"
+
+
+def get_dashboard(uid):
+    """summary_totals for uid, cached for DASHBOARD_CACHE_TTL seconds"""
+    ttl = base.DASHBOARD_CACHE_TTL
+    if not ttl:
+        return summary_totals(uid)
+
+    key = dashboard_cache_key(uid)
+    try:
+        dashboard = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Dashboard cache read failed for user {uid}: {e}")
+        return summary_totals(uid)
+
+    if dashboard is None:
+        dashboard = summary_totals(uid)
+        try:
+            cache.set(key, dashboard, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Dashboard cache write failed for user {uid}: {e}")
+    return dashboard
+
+
+async def aget_dashboard(uid):
+    """get_dashboard for async views, reading summaries over the async driver"""
+    ttl = base.DASHBOARD_CACHE_TTL
+    if not ttl:
+        return _totals(await fetch_values(summary_rows(uid)))
+
+    key = dashboard_cache_key(uid)
+    try:
+        dashboard = await cache.aget(key)
+    except Exception as e:
+        logger.warning(f"Dashboard cache read failed for user {uid}: {e}")
+        return _totals(await fetch_values(summary_rows(uid)))
+
+    if dashboard is None:
+        dashboard = _totals(await fetch_values(summary_rows(uid)))
+        try:
+            await cache.aset(key, dashboard, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Dashboard cache write failed for user {uid}: {e}")
+    return dashboard
+
+
+def invalidate_dashboard(uid):
+    if not base.DASHBOARD_CACHE_TTL:
+        return
+    try:
+        cache.delete(dashboard_cache_key(uid))
+    except Exception as e:
+        logger.warning(f"Dashboard cache delete failed for user {uid}: {e}")
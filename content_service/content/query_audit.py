@@ -0,0 +1,148 @@
+import json
+import threading
+from pymongo import monitoring
+
+
+# Commands whose plans can be explained; inserts and getMores have none
+EXPLAINABLE = ("find", "aggregate", "count", "distinct", "update", "delete")
+
+# Driver bookkeeping that explain rejects or that does not affect the plan
+DRIVER_FIELDS = (
+    "$db",
+    "lsid",
+    "txnNumber",
+    "$clusterTime",
+    "$readPreference",
+    "readConcern",
+    "writeConcern",
+    "ordered",
+    "batchSize",
+    "singleBatch",
+    "limit",
+    "skip",
+    "let",
+    "comment",
+)
+
+
+def normalize(value):
+    """Replace literals with "?" so queries differing only in values share a shape"""
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $in lists and similar vary in length, not in shape
+        if value and all(not isinstance(item, (dict, list, tuple)) for item in value):
+            return "?"
+        return [normalize(item) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        return value  # field path in an aggregation expression
+    return "?"
+
+
+def explainable(name, command):
+    """The command as explain accepts it: no driver fields, one write statement"""
+    command = {key: item for key, item in command.items() if key not in DRIVER_FIELDS}
+    if name == "update":
+        command["updates"] = command["updates"][:1]
+    elif name == "delete":
+        command["deletes"] = command["deletes"][:1]
+    return command
+
+
+def shape_of(name, command):
+    """Literal-free summary of the parts of a command that choose its plan"""
+    if name == "find":
+        parts = {"filter": command.get("filter", {}), "sort": command.get("sort")}
+    elif name == "aggregate":
+        parts = {"pipeline": command.get("pipeline", [])}
+    elif name == "count":
+        parts = {"query": command.get("query", {})}
+    elif name == "distinct":
+        parts = {"key": command.get("key"), "query": command.get("query", {})}
+    elif name == "update":
+        parts = {"q": command["updates"][0].get("q", {})}
+    else:
+        parts = {"q": command["deletes"][0].get("q", {})}
+    return json.dumps(normalize(parts), sort_keys=True, default=str)
+
+
+class QueryShapeRecorder(monitoring.CommandListener):
+    """Collects one sample command per (collection, command, shape)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.shapes = {}
+
+    def started(self, event):
+        name = event.command_name
+        if name not in EXPLAINABLE:
+            return
+        command = dict(event.command)
+        collection = command.get(name)
+        if not isinstance(collection, str):
+            return  # collection-less aggregates such as $currentOp
+        if (name == "update" and not command.get("updates")) or (
+            name == "delete" and not command.get("deletes")
+        ):
+            return
+
+        key = (collection, name, shape_of(name, command))
+        with self.lock:
+            sample = self.shapes.get(key)
+            if sample is None:
+                self.shapes[key] = {"command": explainable(name, command), "calls": 1}
+            else:
+                sample["calls"] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def plan_stages(plan):
+    """Every stage name in a winning plan tree"""
+    plan = plan.get("queryPlan", plan)  # slot-based engine wraps the tree
+    stages = [plan.get("stage")]
+    children = plan.get("inputStages", [])
+    if "inputStage" in plan:
+        children = [plan["inputStage"], *children]
+    for child in children:
+        stages.extend(plan_stages(child))
+    return [stage for stage in stages if stage]
+
+
+def winning_plans(explained):
+    """Winning plans of an explain result, including pipeline $cursor stages"""
+    plans = []
+    if "queryPlanner" in explained:
+        plans.append(explained["queryPlanner"]["winningPlan"])
+    for stage in explained.get("stages", []):
+        cursor = stage.get("$cursor", {})
+        if "queryPlanner" in cursor:
+            plans.append(cursor["queryPlanner"]["winningPlan"])
+    return plans
+
+
+def explain_shapes(database, shapes):
+    """
+    (collection, command, shape, calls, stages) for each recorded shape,
+    explained against database with queryPlanner verbosity.
+    """
+    report = []
+    for (collection, name, shape), sample in sorted(shapes.items()):
+        try:
+            explained = database.command(
+                {"explain": sample["command"], "verbosity": "queryPlanner"}
+            )
+        except Exception as e:
+            stages = [f"ERROR: {e}"]
+        else:
+            stages = [
+                stage
+                for plan in winning_plans(explained)
+                for stage in plan_stages(plan)
+            ]
+        report.append((collection, name, shape, sample["calls"], stages))
+    return report
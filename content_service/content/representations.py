@@ -0,0 +1,50 @@
+import json
+import hashlib
+import logging
+from content_service_config.django import base
+from .caching import VersionedCache
+from .models import Lesson, Exercise
+
+
+logger = logging.getLogger(__name__)
+
+# Serialized course content, versioned per syllabus: any write under a
+# syllabus bumps its version and so retires every cached representation
+# in that tree at once
+content_cache = VersionedCache(
+    prefix=f"content-repr:{base.CONTENT_CACHE_VERSION}",
+    ttl=base.CONTENT_RESPONSE_CACHE_TTL,
+    beta=base.CONTENT_RESPONSE_CACHE_BETA,
+)
+
+
+def _namespace(syllabus_id):
+    return f"syllabus:{syllabus_id}"
+
+
+def syllabus_of_exercise(exercise):
+    lesson = Exercise._meta.get_field("lesson").get_cached_value(exercise, None)
+    if lesson is not None:
+        return lesson.syllabus_id
+    return Lesson.objects.filter(pk=exercise.lesson_id).values_list(
+        "syllabus_id", flat=True
+    ).first()
+
+
+def cached_representation(syllabus_id, kind, pk, fieldset, build):
+    """
+    build() cached under the current version of syllabus_id's tree, per
+    kind, object and sparse fieldset
+    """
+    variant = hashlib.sha256(json.dumps(fieldset, sort_keys=True).encode()).hexdigest()
+    key = f"{kind}:{pk}:{variant[:16]}"
+    return content_cache.get_or_build(_namespace(syllabus_id), key, build)
+
+
+def bump_syllabus_version(syllabus_id):
+    if syllabus_id is None or not content_cache.ttl:
+        return
+    try:
+        content_cache.bump(_namespace(syllabus_id))
+    except Exception as e:
+        logger.warning(f"Content cache bump failed for syllabus {syllabus_id}: {e}")
@@ -0,0 +1,36 @@
+import time
+import logging
+from content_service_config.django import base
+from .lookups import validate_admin_user
+
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CLAIMS = ("is_staff", "is_superuser", "is_active")
+
+
+def claims_admin_status(user):
+    """
+    Admin status from the claims minted by user_service, or None when the
+    claims are missing or older than ADMIN_CLAIMS_MAX_AGE.
+    """
+    claims = [getattr(user, claim, None) for claim in ADMIN_CLAIMS]
+    if any(value is None for value in claims):
+        return None
+
+    issued_at = getattr(user, "iat", None)
+    if issued_at is None or time.time() - issued_at > base.ADMIN_CLAIMS_MAX_AGE:
+        return None
+
+    is_staff, is_superuser, is_active = claims
+    return bool((is_staff or is_superuser) and is_active)
+
+
+def is_admin(user):
+    """Resolve admin status locally, asking user_service only as a fallback"""
+    status = claims_admin_status(user)
+    if status is not None:
+        return status
+
+    logger.debug(f"Admin claims missing or stale for user {user.uid}, asking user_service")
+    return validate_admin_user(user.uid)
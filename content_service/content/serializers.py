@@ -1,52 +1,90 @@
 from rest_framework import serializers
-from .models import Language, Syllabus, Lesson, Exercise, UserProgress, UserLearningPath
-
-
-class LanguageSerializer(serializers.ModelSerializer):
+from .models import (
+    Language,
+    Syllabus,
+    Lesson,
+    Exercise,
+    UserProgress,
+    UserLearningPath,
+    CourseBuild,
+)
+
+
+class SparseFieldsetMixin:
+    """
+    fields= keeps only the named fields and omit= drops them; id is always
+    kept. With many=True and neither given, Meta.list_omit is dropped so
+    list responses default to a summary shape.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields) - {"id"}:
+                self.fields.pop(name)
+        for name in omit or ():
+            if name != "id":
+                self.fields.pop(name, None)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        if kwargs.get("fields") is None and kwargs.get("omit") is None:
+            kwargs["omit"] = getattr(cls.Meta, "list_omit", ())
+        return super().many_init(*args, **kwargs)
+
+    def source_fields(self):
+        """Model attributes the serializer reads, or None if it needs the whole instance"""
+        roots = {field.source.split(".")[0] for field in self.fields.values()}
+        return None if "*" in roots else roots
+
+
+class LanguageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Language
         fields = "__all__"
         read_only_fields = ["id", "created_at", "uid"]
 
 
-class SyllabusSerializer(serializers.ModelSerializer):
+class SyllabusSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     language_name = serializers.CharField(
         source="language.display_name", read_only=True
     )
-    lessons_count = serializers.SerializerMethodField()
+    lessons_count = serializers.IntegerField(source="total_lessons", read_only=True)
 
     class Meta:
         model = Syllabus
         fields = "__all__"
-        read_only_fields = ["id", "language_id", "created_at", "uid"]
-
-    def get_lessons_count(self, obj):
-        return obj.lessons.count()
+        read_only_fields = [
+            "id",
+            "language_id",
+            "created_at",
+            "uid",
+            *Syllabus.counter_fields,
+        ]
 
 
-class LessonSerializer(serializers.ModelSerializer):
-    exercises_count = serializers.SerializerMethodField()
+class LessonSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    exercises_count = serializers.IntegerField(source="exercise_count", read_only=True)
     syllabus_title = serializers.CharField(source="syllabus.title", read_only=True)
 
     class Meta:
         model = Lesson
         fields = "__all__"
-        read_only_fields = ["id", "created_at", "uid"]
-
-    def get_exercises_count(self, obj):
-        return obj.exercises.count()
+        list_omit = ["content"]
+        read_only_fields = ["id", "created_at", "uid", *Lesson.counter_fields]
 
 
-class ExerciseSerializer(serializers.ModelSerializer):
+class ExerciseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     lesson_title = serializers.CharField(source="lesson.title", read_only=True)
 
     class Meta:
         model = Exercise
         fields = "__all__"
+        list_omit = ["content"]
         read_only_fields = ["id", "created_at", "uid"]
 
 
-class UserProgressSerializer(serializers.ModelSerializer):
+class UserProgressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     syllabus_title = serializers.CharField(source="syllabus.title", read_only=True)
     lesson_title = serializers.CharField(source="lesson.title", read_only=True)
     exercise_title = serializers.CharField(source="exercise.title", read_only=True)
@@ -57,7 +95,7 @@ class UserProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ["__all__"]
 
 
-class UserLearningPathSerializer(serializers.ModelSerializer):
+class UserLearningPathSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     language_name = serializers.CharField(
         source="language.display_name", read_only=True
     )
@@ -69,3 +107,15 @@ class UserLearningPathSerializer(serializers.ModelSerializer):
         model = UserLearningPath
         fields = "__all__"
         read_only_fields = ["id", "uid"]
+
+
+class CourseBuildSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = CourseBuild
+        fields = "__all__"
+        list_omit = ["result"]
+        read_only_fields = [
+            field.name
+            for field in CourseBuild._meta.fields
+            if field.name not in ("language", "level")
+        ]
@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from content_service_config.django import base
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a service that keeps failing"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and lets a single
+    probe through once reset_timeout has passed.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                return True
+            # A probe is already in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit opened after {self.failures} consecutive failures"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RequestMetrics:
+    """Per-endpoint request counters and latency totals"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, outcome):
+        with self._lock:
+            stats = self._stats.setdefault(
+                endpoint,
+                {"requests": 0, "errors": 0, "rejected": 0, "seconds": 0.0, "max_seconds": 0.0},
+            )
+            stats["requests"] += 1
+            if outcome == "error":
+                stats["errors"] += 1
+            elif outcome == "rejected":
+                stats["rejected"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+
+class ServiceClient:
+    """
+    Keep-alive HTTP client for one internal service.
+
+    Connections are pooled in a single requests.Session per process. Calls
+    fail fast with CircuitOpenError while the service is unhealthy.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        headers=None,
+        pool_size=10,
+        connect_timeout=1.0,
+        read_timeout=5.0,
+        breaker=None,
+        max_retries=0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        self.metrics = RequestMetrics()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # Retries are left to callers by default; a slow retry loop would
+        # hold the pool
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=max_retries
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        endpoint = endpoint or path
+        if not self.breaker.allow():
+            self.metrics.record(endpoint, 0.0, "rejected")
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except Exception:
+            # Any error, so a failed half-open probe reopens the circuit
+            # instead of leaving it half open with no probe in flight
+            self.breaker.record_failure()
+            self.metrics.record(endpoint, time.perf_counter() - started, "error")
+            raise
+
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            self.metrics.record(endpoint, elapsed, "error")
+        else:
+            self.breaker.record_success()
+            self.metrics.record(endpoint, elapsed, "ok")
+        logger.debug(f"{method} {endpoint} -> {response.status_code} in {elapsed:.3f}s")
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncServiceClient:
+    """
+    ServiceClient for async code, on a keep-alive httpx.AsyncClient. An
+    AsyncClient belongs to the event loop it is used on.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        headers=None,
+        pool_size=10,
+        connect_timeout=1.0,
+        read_timeout=5.0,
+        breaker=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        self.metrics = RequestMetrics()
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+
+    async def request(self, method, path, endpoint=None, **kwargs):
+        endpoint = endpoint or path
+        if not self.breaker.allow():
+            self.metrics.record(endpoint, 0.0, "rejected")
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except BaseException:
+            # Cancellation too, so a half-open probe is never left in flight
+            self.breaker.record_failure()
+            self.metrics.record(endpoint, time.perf_counter() - started, "error")
+            raise
+
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            self.metrics.record(endpoint, elapsed, "error")
+        else:
+            self.breaker.record_success()
+            self.metrics.record(endpoint, elapsed, "ok")
+        logger.debug(f"{method} {endpoint} -> {response.status_code} in {elapsed:.3f}s")
+        return response
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class UserServiceClient(ServiceClient):
+    def validate_admin(self, uid):
+        return self.request(
+            "POST",
+            "/auth/service/validate-admin/",
+            json={"uid": uid},
+        )
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_user_service_client():
+    """The process-wide user_service client, rebuilt after a fork"""
+    global _client, _client_pid
+    if _client_pid != os.getpid():
+        with _client_lock:
+            if _client_pid != os.getpid():
+                _client = UserServiceClient(
+                    base.USER_SERVICE_URL,
+                    headers={"X-Service-Key": base.JWT_KEY},
+                    pool_size=base.USER_SERVICE_POOL_SIZE,
+                    connect_timeout=base.USER_SERVICE_CONNECT_TIMEOUT,
+                    read_timeout=base.USER_SERVICE_READ_TIMEOUT,
+                    breaker=CircuitBreaker(
+                        failure_threshold=base.USER_SERVICE_BREAKER_THRESHOLD,
+                        reset_timeout=base.USER_SERVICE_BREAKER_RESET,
+                    ),
+                )
+                _client_pid = os.getpid()
+    return _client
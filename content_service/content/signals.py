@@ -0,0 +1,169 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .counters import increment
+from .models import Syllabus, Lesson, Exercise, UserProgress
+from .progress import TRACKED_FIELDS, enqueue_summary_events, summary_events
+from .representations import bump_syllabus_version
+
+
+def _tracked(instance, fields):
+    # Read from __dict__ so deferred fields are not fetched
+    return {field: instance.__dict__.get(field) for field in fields}
+
+
+def _syllabus_of(lesson_id):
+    if lesson_id is None:
+        return None
+    return Lesson.objects.filter(pk=lesson_id).values_list("syllabus_id", flat=True).first()
+
+
+# Cached content representations; registered before the counter handlers,
+# which replace _saved_counters with the saved state
+@receiver(post_save, sender=Syllabus)
+@receiver(post_delete, sender=Syllabus)
+def bump_saved_syllabus(sender, instance, **kwargs):
+    bump_syllabus_version(instance.pk)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def bump_saved_lesson(sender, instance, **kwargs):
+    bump_syllabus_version(instance.syllabus_id)
+    previous = instance._saved_counters["syllabus_id"]
+    if previous != instance.syllabus_id:
+        bump_syllabus_version(previous)
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def bump_saved_exercise(sender, instance, **kwargs):
+    bump_syllabus_version(_syllabus_of(instance.lesson_id))
+    previous = instance._saved_counters["lesson_id"]
+    if previous != instance.lesson_id:
+        bump_syllabus_version(_syllabus_of(previous))
+
+
+# Lesson counters on Syllabus
+LESSON_FIELDS = ("syllabus_id", "duration_minutes")
+
+
+@receiver(post_init, sender=Lesson)
+def remember_lesson(sender, instance, **kwargs):
+    instance._saved_counters = _tracked(instance, LESSON_FIELDS)
+
+
+@receiver(post_save, sender=Lesson)
+def count_saved_lesson(sender, instance, created, **kwargs):
+    current = _tracked(instance, LESSON_FIELDS)
+    previous = instance._saved_counters
+    instance._saved_counters = current
+
+    if created:
+        increment(
+            Syllabus,
+            current["syllabus_id"],
+            total_lessons=1,
+            total_duration_minutes=current["duration_minutes"],
+        )
+        return
+
+    if current["syllabus_id"] != previous["syllabus_id"]:
+        # total_points is only changed by $inc, so the stored value is current
+        points = Lesson.objects.filter(pk=instance.pk).values_list(
+            "total_points", flat=True
+        ).first() or 0
+        increment(
+            Syllabus,
+            previous["syllabus_id"],
+            total_lessons=-1,
+            total_duration_minutes=-(previous["duration_minutes"] or 0),
+            total_points=-points,
+        )
+        increment(
+            Syllabus,
+            current["syllabus_id"],
+            total_lessons=1,
+            total_duration_minutes=current["duration_minutes"] or 0,
+            total_points=points,
+        )
+    elif None not in (current["duration_minutes"], previous["duration_minutes"]):
+        increment(
+            Syllabus,
+            current["syllabus_id"],
+            total_duration_minutes=current["duration_minutes"] - previous["duration_minutes"],
+        )
+
+
+@receiver(post_delete, sender=Lesson)
+def count_deleted_lesson(sender, instance, **kwargs):
+    # Exercises are deleted first by the cascade and remove their own points
+    increment(
+        Syllabus,
+        instance.syllabus_id,
+        total_lessons=-1,
+        total_duration_minutes=-instance.duration_minutes,
+    )
+
+
+# Exercise counters on Lesson and Syllabus
+EXERCISE_FIELDS = ("lesson_id", "points")
+
+
+@receiver(post_init, sender=Exercise)
+def remember_exercise(sender, instance, **kwargs):
+    instance._saved_counters = _tracked(instance, EXERCISE_FIELDS)
+
+
+def _count_exercise(lesson_id, count, points):
+    if not count and not points:
+        return
+    increment(Lesson, lesson_id, exercise_count=count, total_points=points)
+    increment(Syllabus, _syllabus_of(lesson_id), total_points=points)
+
+
+@receiver(post_save, sender=Exercise)
+def count_saved_exercise(sender, instance, created, **kwargs):
+    current = _tracked(instance, EXERCISE_FIELDS)
+    previous = instance._saved_counters
+    instance._saved_counters = current
+
+    if created:
+        _count_exercise(current["lesson_id"], 1, current["points"])
+    elif current["lesson_id"] != previous["lesson_id"]:
+        points = current["points"] or 0
+        # A zero-point exercise took nothing from its old lesson; only an
+        # unknown (deferred) old value is assumed unchanged
+        moved = points if previous["points"] is None else previous["points"]
+        _count_exercise(previous["lesson_id"], -1, -moved)
+        _count_exercise(current["lesson_id"], 1, points)
+    elif None not in (current["points"], previous["points"]):
+        _count_exercise(current["lesson_id"], 0, current["points"] - previous["points"])
+
+
+@receiver(post_delete, sender=Exercise)
+def count_deleted_exercise(sender, instance, **kwargs):
+    _count_exercise(instance.lesson_id, -1, -instance.points)
+
+
+# UserProgressSummary deltas
+@receiver(post_init, sender=UserProgress)
+def remember_progress(sender, instance, **kwargs):
+    instance._saved_progress = _tracked(instance, TRACKED_FIELDS)
+
+
+@receiver(post_save, sender=UserProgress)
+def summarize_saved_progress(sender, instance, created, **kwargs):
+    current = _tracked(instance, TRACKED_FIELDS)
+    previous = None if created else instance._saved_progress
+    instance._saved_progress = current
+
+    activity = timezone.localdate(instance.completion_date or instance.updated_at)
+    enqueue_summary_events(summary_events(instance.uid, previous, current, activity))
+
+
+@receiver(post_delete, sender=UserProgress)
+def summarize_deleted_progress(sender, instance, **kwargs):
+    enqueue_summary_events(
+        summary_events(instance.uid, instance._saved_progress, None)
+    )
@@ -0,0 +1,141 @@
+import json
+import time
+import uuid
+import logging
+import threading
+from django_redis import get_redis_connection
+
+
+logger = logging.getLogger(__name__)
+
+# Compare-and-delete / compare-and-extend, so a lease that expired and was
+# taken over is never released or renewed by its previous holder
+RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+RENEW = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+DONE = b"done"
+FAILED = b"failed"
+_MISSING = object()
+
+
+class SingleFlight:
+    """
+    Cross-process single flight on Redis. The first caller for a key takes
+    a lease and runs the call; concurrent callers for the same key wait for
+    the result it publishes instead of running the call themselves.
+
+    Leases are short and renewed while the call runs, so the lease of a
+    worker that dies expires within lease_ttl seconds and a waiter (or the
+    redelivered task) takes over. Results must be JSON-serializable and are
+    kept for result_ttl seconds for late waiters. Without Redis, calls run
+    directly.
+    """
+
+    def __init__(self, prefix, lease_ttl=30, result_ttl=60, wait_timeout=600, alias="default"):
+        self.prefix = prefix
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.alias = alias
+
+    def keys(self, key):
+        return (
+            f"{self.prefix}:lease:{key}",
+            f"{self.prefix}:result:{key}",
+            f"{self.prefix}:done:{key}",
+        )
+
+    def run(self, key, call):
+        """call()'s result, from this process or from the lease holder's call"""
+        token = None
+        try:
+            redis = get_redis_connection(self.alias)
+            lease_key = self.keys(key)[0]
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                candidate = uuid.uuid4().hex
+                if redis.set(lease_key, candidate, nx=True, px=int(self.lease_ttl * 1000)):
+                    token = candidate
+                    break
+                result = self._wait(redis, key, deadline)
+                if result is not _MISSING:
+                    return result
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Gave up waiting on in-flight {key}, calling directly")
+                    break
+        except Exception as e:
+            logger.warning(f"Single flight unavailable for {key}, calling directly: {e}")
+        # Outside the try, so an error from call() itself is not mistaken
+        # for Redis failing and the call is not repeated
+        if token is None:
+            return call()
+        return self._lead(redis, key, token, call)
+
+    def _lead(self, redis, key, token, call):
+        lease_key, result_key, channel = self.keys(key)
+        stop = threading.Event()
+        renewer = threading.Thread(
+            target=self._renew, args=(redis, lease_key, token, stop), daemon=True
+        )
+        renewer.start()
+        outcome = FAILED
+        try:
+            result = call()
+            outcome = DONE
+            try:
+                redis.set(result_key, json.dumps(result), ex=self.result_ttl)
+            except Exception as e:
+                # Waiters make their own call; this one's result is kept
+                logger.warning(f"Could not publish result for {key}: {e}")
+                outcome = FAILED
+            return result
+        finally:
+            stop.set()
+            try:
+                redis.eval(RELEASE, 1, lease_key, token)
+                redis.publish(channel, outcome)
+            except Exception as e:
+                # Waiters fall back on the lease expiring
+                logger.warning(f"Could not release lease for {key}: {e}")
+
+    def _renew(self, redis, lease_key, token, stop):
+        while not stop.wait(self.lease_ttl / 3):
+            try:
+                if not redis.eval(RENEW, 1, lease_key, token, int(self.lease_ttl * 1000)):
+                    logger.warning(f"Lost lease {lease_key} while its call was running")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew lease {lease_key}: {e}")
+
+    def _wait(self, redis, key, deadline):
+        """The leader's result, or _MISSING once the lease is gone without one"""
+        lease_key, result_key, channel = self.keys(key)
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            # Subscribed before checking, so a result published in between
+            # is not missed
+            while time.monotonic() < deadline:
+                raw = redis.get(result_key)
+                if raw is not None:
+                    return json.loads(raw)
+                if not redis.exists(lease_key):
+                    # The leader may have published between the two reads
+                    raw = redis.get(result_key)
+                    return _MISSING if raw is None else json.loads(raw)
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None and message["data"] == FAILED:
+                    return _MISSING
+            return _MISSING
+        finally:
+            pubsub.close()
@@ -1,13 +1,19 @@
+import httpx
+import uuid
+import random
 import requests
 import redis
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import logging
-from celery import Celery, shared_task
+from celery import Celery, chain, chord, shared_task
 from datetime import datetime, timedelta
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry as RequestsRetry
 from django.utils import timezone
+from . import ai_cache, ai_limiter
+from .ai_client import get_ai_client
+from .ai_engine import get_ai_engine
+from .singleflight import SingleFlight
+from content_service_config.django import base
 
 
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +22,15 @@ logger = logging.getLogger(__name__)
 app = Celery("content_service_config")
 
 # AI Agent configuration
-AI_AGENT_BASE_URL = "http://ai-agents-service:8000"
-REQUEST_TIMEOUT = 300
 MAX_RETRIES = 3
 RETRY_BACKOFF = 60
 
+ai_flights = SingleFlight(
+    "ai-flight",
+    lease_ttl=base.AI_SINGLE_FLIGHT_LEASE_TTL,
+    wait_timeout=base.AI_SINGLE_FLIGHT_WAIT_TIMEOUT,
+)
+
 
 class LearningLevel(Enum):
     BEGINNER = "beginner"
@@ -37,34 +47,67 @@ class ExerciseType(Enum):
     TRANSLATION = "translation"
 
 
-# HTTP session with retry strategy
-def create_session():
-    session = requests.Session()
-    retry_strategy = RequestsRetry(
-        total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=1
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
-
+def retry_countdown(retries: int, exc: Optional[Exception] = None) -> float:
+    """
+    Exponential backoff with jitter, so failed tasks across the fleet spread
+    their retries out, and never sooner than the service's Retry-After
+    """
+    backoff = RETRY_BACKOFF * (2**retries)
+    countdown = backoff / 2 + random.uniform(0, backoff / 2)
+    return max(countdown, getattr(exc, "retry_after", 0.0))
 
-def make_ai_request(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    session = create_session()
-    url = f"{AI_AGENT_BASE_URL}{endpoint}"
 
+def post_ai_request(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    token = ai_limiter.acquire()
+    outcome, retry_after = ai_limiter.ERROR, 0.0
     try:
-        response = session.post(
-            url,
-            json=payload,
-            timeout=REQUEST_TIMEOUT,
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        if base.AI_ASYNC_ENGINE:
+            result = get_ai_engine().post(endpoint, payload)
+        else:
+            response = get_ai_client().request("POST", endpoint, json=payload)
+            response.raise_for_status()
+            result = response.json()
+        outcome = ai_limiter.OK
+        return result
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        outcome, retry_after = ai_limiter.classify(e)
         logger.error(f"AI request failed for {endpoint}: {str(e)}")
+        if outcome == ai_limiter.OVERLOAD:
+            raise ai_limiter.AIServiceOverloaded(str(e), retry_after) from e
         raise
+    finally:
+        ai_limiter.release(token, outcome, retry_after)
+
+
+def make_ai_request(
+    endpoint: str,
+    payload: Dict[str, Any],
+    use_cache: bool = False,
+    dedupe: bool = False,
+) -> Dict[str, Any]:
+    """
+    POST payload to ai-agents-service. Requests are identical when they
+    match ignoring timestamp and uid: with use_cache they are answered from
+    the AI result cache, with dedupe concurrent ones across workers share a
+    single in-flight call.
+    """
+    key = ai_cache.request_key(endpoint, payload) if use_cache or dedupe else None
+    use_cache = use_cache and ai_cache.enabled()
+    if use_cache:
+        cached = ai_cache.get(key, payload.get("task", endpoint))
+        if cached is not None:
+            return cached
+
+    if dedupe:
+        result = ai_flights.run(
+            key.rpartition(":")[2], lambda: post_ai_request(endpoint, payload)
+        )
+    else:
+        result = post_ai_request(endpoint, payload)
+
+    if use_cache:
+        ai_cache.put(key, result)
+    return result
 
 
 @app.task(bind=True, max_retries=MAX_RETRIES, default_retry_delay=RETRY_BACKOFF)
@@ -75,6 +118,7 @@ def generate_syllabus(
     total_lessons: int = 20,
     duration_weeks: int = 12,
     uid: Optional[str] = None,
+    use_cache: bool = True,
 ):
     try:
         payload = {
@@ -85,12 +129,14 @@ def generate_syllabus(
                 "total_lessons": total_lessons,
                 "duration_weeks": duration_weeks,
                 "uid": uid,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
         logger.info(f"Generating syllabus for {language} - {level} level")
-        result = make_ai_request("/api/v1/generate/syllabus", payload)
+        result = make_ai_request(
+            "/api/v1/generate/syllabus", payload, use_cache=use_cache, dedupe=True
+        )
 
         # Structure the response
         syllabus_data = {
@@ -103,7 +149,7 @@ def generate_syllabus(
             "prerequisites": result.get("prerequisites", []),
             "assessment_methods": result.get("assessment_methods", []),
             "resources": result.get("resources", []),
-            "created_at": datetime.now.isoformat(),
+            "created_at": timezone.now().isoformat(),
             "uid": uid,
         }
 
@@ -113,7 +159,7 @@ def generate_syllabus(
     except Exception as e:
         logger.error(f"Error generating syllabus: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -126,6 +172,7 @@ def generate_lesson(
     topic: str,
     level: str,
     uid: Optional[str] = None,
+    use_cache: bool = True,
 ):
     try:
         payload = {
@@ -136,12 +183,14 @@ def generate_lesson(
                 "topic": topic,
                 "level": level,
                 "uid": uid,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
         logger.info(f"Generating lesson for topic: {topic}")
-        result = make_ai_request("/api/v1/generate/lesson", payload)
+        result = make_ai_request(
+            "/api/v1/generate/lesson", payload, use_cache=use_cache, dedupe=True
+        )
 
         lesson_data = {
             "lesson_id": result.get("lesson_id"),
@@ -159,7 +208,7 @@ def generate_lesson(
             "estimated_duration": result.get("estimated_duration", 30),  # minutes
             "difficulty_score": result.get("difficulty_score", 1),
             "prerequisites": result.get("prerequisites", []),
-            "created_at": datetime.now,
+            "created_at": timezone.now().isoformat(),
             "uid": uid,
         }
 
@@ -169,11 +218,46 @@ def generate_lesson(
     except Exception as e:
         logger.error(f"Error generating lesson: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
 # Exercise generation task
+EXERCISES_ENDPOINT = "/api/v1/generate/exercises"
+EXERCISE_BATCH_ENDPOINT = "/api/v1/generate/exercises/batch"
+# Statuses meaning the deployed ai-agents-service has no batch endpoint
+BATCH_UNSUPPORTED_STATUSES = {404, 501}
+
+
+def _exercises_payload(lesson_id, exercise_types, level, count_per_type, uid):
+    return {
+        "task": "generate_exercises",
+        "parameters": {
+            "lesson_id": lesson_id,
+            "exercise_types": exercise_types,
+            "level": level,
+            "count_per_type": count_per_type,
+            "uid": uid,
+            "timestamp": timezone.now().isoformat(),
+        },
+    }
+
+
+def _exercise_set(result, lesson_id, level, uid):
+    return {
+        "exercise_set_id": result.get("exercise_set_id"),
+        "lesson_id": lesson_id,
+        "level": level,
+        "exercises": result.get("exercises", {}),
+        "total_exercises": sum(
+            len(exercises) for exercises in result.get("exercises", {}).values()
+        ),
+        "estimated_completion_time": result.get("estimated_completion_time", 20),
+        "created_at": timezone.now().isoformat(),
+        "uid": uid,
+    }
+
+
 @app.task(bind=True, max_retries=MAX_RETRIES, default_retry_delay=RETRY_BACKOFF)
 def generate_exercises(
     self,
@@ -182,36 +266,19 @@ def generate_exercises(
     level: str,
     count_per_type: int = 5,
     uid: Optional[str] = None,
+    use_cache: bool = True,
 ):
     try:
-        payload = {
-            "task": "generate_exercises",
-            "parameters": {
-                "lesson_id": lesson_id,
-                "exercise_types": exercise_types,
-                "level": level,
-                "count_per_type": count_per_type,
-                "uid": uid,
-                "timestamp": datetime.now,
-            },
-        }
+        payload = _exercises_payload(
+            lesson_id, exercise_types, level, count_per_type, uid
+        )
 
         logger.info(f"Generating exercises for lesson: {lesson_id}")
-        result = make_ai_request("/api/v1/generate/exercises", payload)
-
-        exercises_data = {
-            "exercise_set_id": result.get("exercise_set_id"),
-            "lesson_id": lesson_id,
-            "level": level,
-            "exercises": result.get("exercises", {}),
-            "total_exercises": sum(
-                len(exercises) for exercises in result.get("exercises", {}).values()
-            ),
-            "estimated_completion_time": result.get("estimated_completion_time", 20),
-            "created_at": datetime.now,
-            "uid": uid,
-        }
+        result = make_ai_request(
+            EXERCISES_ENDPOINT, payload, use_cache=use_cache, dedupe=True
+        )
 
+        exercises_data = _exercise_set(result, lesson_id, level, uid)
         logger.info(
             f"Successfully generated exercise set: {exercises_data['exercise_set_id']}"
         )
@@ -220,7 +287,97 @@ def generate_exercises(
     except Exception as e:
         logger.error(f"Error generating exercises: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
+        raise
+
+
+@app.task(bind=True, max_retries=MAX_RETRIES, default_retry_delay=RETRY_BACKOFF)
+def generate_exercise_batch(
+    self,
+    lesson_ids: List[str],
+    exercise_types: List[str],
+    level: str,
+    count_per_type: int = 5,
+    uid: Optional[str] = None,
+    use_cache: bool = True,
+):
+    """
+    generate_exercises for several lessons in one ai-agents-service request;
+    returns the exercise sets in lesson_ids order. Lessons whose exercises
+    are cached are not sent, and lessons the batch response leaves out or
+    fails, or all of them when the service has no batch endpoint, are
+    generated individually.
+    """
+    try:
+        payloads = {
+            lesson_id: _exercises_payload(
+                lesson_id, exercise_types, level, count_per_type, uid
+            )
+            for lesson_id in lesson_ids
+        }
+        keys = {
+            lesson_id: ai_cache.request_key(EXERCISES_ENDPOINT, payload)
+            for lesson_id, payload in payloads.items()
+        }
+        use_cache = use_cache and ai_cache.enabled()
+        results = {}
+        if use_cache:
+            for lesson_id, key in keys.items():
+                cached = ai_cache.get(key, "generate_exercises")
+                if cached is not None:
+                    results[lesson_id] = cached
+
+        missing = [lesson_id for lesson_id in lesson_ids if lesson_id not in results]
+        if missing:
+            logger.info(f"Generating exercises for {len(missing)} lessons in one batch")
+            try:
+                response = make_ai_request(
+                    EXERCISE_BATCH_ENDPOINT,
+                    {
+                        "task": "generate_exercises_batch",
+                        "parameters": {
+                            "requests": [
+                                payloads[lesson_id]["parameters"] for lesson_id in missing
+                            ]
+                        },
+                    },
+                )
+            except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
+                if (
+                    e.response is None
+                    or e.response.status_code not in BATCH_UNSUPPORTED_STATUSES
+                ):
+                    raise
+                logger.warning(
+                    "ai-agents-service has no batch endpoint, generating each lesson alone"
+                )
+                response = {}
+            for item in response.get("results", []):
+                lesson_id = item.get("lesson_id")
+                if lesson_id in payloads and "error" not in item:
+                    results[lesson_id] = item
+                    if use_cache:
+                        ai_cache.put(keys[lesson_id], item)
+
+        for lesson_id in missing:
+            if lesson_id not in results:
+                logger.warning(f"Batch left out lesson {lesson_id}, generating it alone")
+                results[lesson_id] = make_ai_request(
+                    EXERCISES_ENDPOINT,
+                    payloads[lesson_id],
+                    use_cache=use_cache,
+                    dedupe=True,
+                )
+
+        return [
+            _exercise_set(results[lesson_id], lesson_id, level, uid)
+            for lesson_id in lesson_ids
+        ]
+
+    except Exception as e:
+        logger.error(f"Error generating exercise batch: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -232,6 +389,7 @@ def generate_specific_exercise(
     content: str,
     level: str,
     uid: Optional[str] = None,
+    use_cache: bool = True,
 ):
     try:
         payload = {
@@ -242,12 +400,17 @@ def generate_specific_exercise(
                 "content": content,
                 "level": level,
                 "uid": uid,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
         logger.info(f"Generating {exercise_type} exercise for lesson: {lesson_id}")
-        result = make_ai_request(f"/api/v1/generate/exercise/{exercise_type}", payload)
+        result = make_ai_request(
+            f"/api/v1/generate/exercise/{exercise_type}",
+            payload,
+            use_cache=use_cache,
+            dedupe=True,
+        )
 
         exercise_data = {
             "exercise_id": result.get("exercise_id"),
@@ -257,7 +420,7 @@ def generate_specific_exercise(
             "metadata": result.get("metadata", {}),
             "difficulty_score": result.get("difficulty_score", 1),
             "estimated_time": result.get("estimated_time", 5),
-            "created_at": datetime.now,
+            "created_at": timezone.now().isoformat(),
             "uid": uid,
         }
 
@@ -269,7 +432,7 @@ def generate_specific_exercise(
     except Exception as e:
         logger.error(f"Error generating {exercise_type} exercise: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -285,7 +448,7 @@ def analyze_user_progress(
                 "uid": uid,
                 "course_id": course_id,
                 "activity_data": activity_data,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
@@ -304,7 +467,7 @@ def analyze_user_progress(
             "estimated_completion_time": result.get("estimated_completion_time"),
             "performance_metrics": result.get("performance_metrics", {}),
             "learning_patterns": result.get("learning_patterns", {}),
-            "created_at": datetime.now,
+            "created_at": timezone.now().isoformat(),
         }
 
         logger.info(f"Successfully analyzed progress: {progress_data['analysis_id']}")
@@ -313,7 +476,7 @@ def analyze_user_progress(
     except Exception as e:
         logger.error(f"Error analyzing user progress: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -333,7 +496,7 @@ def update_learning_progress(
                 "lesson_id": lesson_id,
                 "exercise_results": exercise_results,
                 "time_spent": time_spent,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
@@ -348,7 +511,7 @@ def update_learning_progress(
             "new_progress_level": result.get("new_progress_level", 0),
             "achievements_unlocked": result.get("achievements_unlocked", []),
             "skill_improvements": result.get("skill_improvements", {}),
-            "updated_at": datetime.now,
+            "updated_at": timezone.now().isoformat(),
         }
 
         logger.info(f"Successfully updated progress: {update_data['update_id']}")
@@ -357,7 +520,7 @@ def update_learning_progress(
     except Exception as e:
         logger.error(f"Error updating learning progress: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -389,6 +552,30 @@ def sync_user_progress(self, content_id):
     pass
 
 
+@app.task(bind=True, name="content.tasks.flush_progress_summaries")
+def flush_progress_summaries(self):
+    from .progress import drain_summary_queue
+
+    try:
+        applied = drain_summary_queue()
+        logger.info(f"Applied {applied} progress summary events")
+        return applied
+    except Exception as exc:
+        logger.error(f"Error flushing progress summaries: {exc}")
+        raise self.retry(exc=exc, countdown=30, max_retries=5)
+
+
+@app.task(bind=True, name="content.tasks.rebuild_progress_summaries")
+def rebuild_progress_summaries(self, uid, syllabi):
+    from .progress import rebuild_summaries
+
+    try:
+        return rebuild_summaries(uid, syllabi={uuid.UUID(syllabus) for syllabus in syllabi})
+    except Exception as exc:
+        logger.error(f"Error rebuilding progress summaries for user {uid}: {exc}")
+        raise self.retry(exc=exc, countdown=30, max_retries=5)
+
+
 @app.task(bind=True, name="content.tasks.generate_content_analytics")
 def generate_content_analytics(self, content_id):
     pass
@@ -444,7 +631,7 @@ def generate_learning_path(
     except Exception as e:
         logger.error(f"Error generating learning path: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
@@ -464,7 +651,7 @@ def adapt_learning_path(
                 "uid": uid,
                 "progress_data": progress_data,
                 "feedback": feedback,
-                "timestamp": datetime.now,
+                "timestamp": timezone.now().isoformat(),
             },
         }
 
@@ -480,7 +667,7 @@ def adapt_learning_path(
             "updated_milestones": result.get("updated_milestones", []),
             "new_recommendations": result.get("new_recommendations", []),
             "difficulty_adjustments": result.get("difficulty_adjustments", {}),
-            "updated_at": datetime.now,
+            "updated_at": timezone.now().isoformat(),
         }
 
         logger.info(
@@ -491,62 +678,129 @@ def adapt_learning_path(
     except Exception as e:
         logger.error(f"Error adapting learning path: {str(e)}")
         if self.request.retries < self.max_retries:
-            raise self.retry(countdown=RETRY_BACKOFF * (2**self.request.retries))
+            raise self.retry(countdown=retry_countdown(self.request.retries, e))
         raise
 
 
 # Workflow tasks
-@app.task
-def create_complete_course_workflow(language: str, level: str, uid: str):
-    try:
-        # Step 1: Generate syllabus
-        syllabus_result = generate_syllabus.delay(
-            language=language, level=level, uid=uid
-        ).get()
-
-        # Step 2: Generate lessons for each module
-        lesson_tasks = []
-        for module in syllabus_result.get("modules", []):
-            for topic in module.get("lessons", []):
-                lesson_task = generate_lesson.delay(
-                    syllabus_id=syllabus_result["syllabus_id"],
-                    module_id=module["module_id"],
-                    topic=topic,
-                    level=level,
-                    uid=uid,
-                )
-                lesson_tasks.append(lesson_task)
+#
+# A course is built as syllabus -> chord(lessons) -> chord(exercises) ->
+# assemble_course. Each stage replaces itself with the next, so no worker
+# waits on another task's result; lessons, then exercise sets, all run in
+# parallel. Progress is recorded on the CourseBuild as tasks finish.
+COURSE_EXERCISE_TYPES = ["multiple_choice", "fill_in_blank", "flashcard"]
+
+
+def start_course_build(language: str, level: str, uid):
+    """Create a CourseBuild and launch its workflow"""
+    from .models import CourseBuild
+
+    build = CourseBuild.objects.create(uid=uid, language=language, level=level)
+    build_id = str(build.pk)
+    workflow = chain(
+        generate_syllabus.s(language=language, level=level, uid=uid),
+        start_lesson_generation.s(build_id, level, uid),
+    )
+    workflow.link_error(course_build_failed.s(build_id))
+    build.task_id = workflow.apply_async().id
+    CourseBuild.objects.filter(pk=build.pk).update(task_id=build.task_id)
+    return build
+
 
-        # Wait for all lessons to complete
-        lessons = [task.get() for task in lesson_tasks]
+def _update_build(build_id, **fields):
+    from .models import CourseBuild
 
-        # Step 3: Generate exercises for each lesson
-        exercise_tasks = []
-        exercise_types = ["multiple_choice", "fill_in_blank", "flashcard"]
+    CourseBuild.objects.filter(pk=build_id).update(**fields)
 
-        for lesson in lessons:
-            exercise_task = generate_exercises.delay(
-                lesson_id=lesson["lesson_id"],
-                exercise_types=exercise_types,
+
+def _record_step(signature, build_id, counter, count=1):
+    signature.link(record_course_build_step.si(build_id, counter, count))
+    return signature
+
+
+@app.task(name="content.tasks.record_course_build_step")
+def record_course_build_step(build_id, counter, count=1):
+    from .counters import increment
+    from .models import CourseBuild
+
+    increment(CourseBuild, build_id, **{counter: count})
+
+
+@app.task(bind=True, name="content.tasks.start_lesson_generation")
+def start_lesson_generation(self, syllabus_result, build_id, level, uid):
+    lessons = [
+        _record_step(
+            generate_lesson.si(
+                syllabus_id=syllabus_result["syllabus_id"],
+                module_id=module["module_id"],
+                topic=topic,
                 level=level,
                 uid=uid,
-            )
-            exercise_tasks.append(exercise_task)
+            ),
+            build_id,
+            "completed_lessons",
+        )
+        for module in syllabus_result.get("modules", [])
+        for topic in module.get("lessons", [])
+    ]
+    _update_build(build_id, stage="lessons", total_lessons=len(lessons))
+
+    next_stage = start_exercise_generation.s(build_id, syllabus_result, level, uid)
+    if not lessons:
+        raise self.replace(next_stage.clone(args=([],)))
+    raise self.replace(chord(lessons, next_stage))
+
+
+@app.task(bind=True, name="content.tasks.start_exercise_generation")
+def start_exercise_generation(self, lessons, build_id, syllabus_result, level, uid):
+    size = max(base.AI_EXERCISE_BATCH_SIZE, 1)
+    lesson_ids = [lesson["lesson_id"] for lesson in lessons]
+    batches = [
+        _record_step(
+            generate_exercise_batch.si(
+                lesson_ids=lesson_ids[i : i + size],
+                exercise_types=COURSE_EXERCISE_TYPES,
+                level=level,
+                uid=uid,
+            ),
+            build_id,
+            "completed_exercise_sets",
+            len(lesson_ids[i : i + size]),
+        )
+        for i in range(0, len(lesson_ids), size)
+    ]
+    _update_build(build_id, stage="exercises")
 
-        # Wait for all exercises to complete
-        exercises = [task.get() for task in exercise_tasks]
+    next_stage = assemble_course.s(build_id, syllabus_result, lessons)
+    if not batches:
+        raise self.replace(next_stage.clone(args=([],)))
+    raise self.replace(chord(batches, next_stage))
 
-        return {
-            "course_id": f"course_{syllabus_result['syllabus_id']}",
-            "syllabus": syllabus_result,
-            "lessons": lessons,
-            "exercises": exercises,
-            "created_at": datetime.now,
-        }
 
-    except Exception as e:
-        logger.error(f"Error in complete course workflow: {str(e)}")
-        raise
+@app.task(name="content.tasks.assemble_course")
+def assemble_course(batches, build_id, syllabus_result, lessons):
+    course = {
+        "course_id": f"course_{syllabus_result['syllabus_id']}",
+        "syllabus": syllabus_result,
+        "lessons": lessons,
+        "exercises": [exercise_set for batch in batches for exercise_set in batch],
+        "created_at": timezone.now().isoformat(),
+    }
+    _update_build(build_id, status="succeeded", stage="done", result=course)
+    logger.info(f"Course build {build_id} completed: {course['course_id']}")
+    return course
+
+
+@app.task(name="content.tasks.course_build_failed")
+def course_build_failed(request, exc, traceback, build_id):
+    logger.error(f"Course build {build_id} failed in task {request.id}: {exc}")
+    _update_build(build_id, status="failed", error=str(exc))
+
+
+@app.task
+def create_complete_course_workflow(language: str, level: str, uid: str):
+    """Start a course build without waiting for it; returns the build id"""
+    return str(start_course_build(language, level, uid).pk)
 
 
 # Cleanup tasks
@@ -1,3 +1,1358 @@
-from django.test import TestCase
+import json
+import datetime
+import uuid
+import time
+import threading
+import jwt
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.management import call_command
+from asgiref.sync import sync_to_async
+from celery.exceptions import Ignore
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from . import ai_cache, ai_limiter, lookups, progress, representations
+from .ai_client import get_ai_client
+from .ai_engine import AIEngine
+from .async_db import compile_values
+from .async_views import async_urlpatterns
+from .authentication import AuthenticatedUser, JWTAuthentication
+from .caching import LocalTTLCache, TwoTierCache, VersionedCache
+from .fake_ai_service import FakeAIService
+from .fast_serializers import compile_serializer
+from .permissions import IsAdminUser, IsOwnerOrAdmin
+from .renderers import FastJSONParser, FastJSONRenderer
+from .roles import is_admin
+from .service_client import CircuitBreaker, CircuitOpenError, ServiceClient
+from .singleflight import SingleFlight
+from .tasks import (
+    assemble_course,
+    generate_exercise_batch,
+    generate_syllabus,
+    make_ai_request,
+    post_ai_request,
+    retry_countdown,
+    RETRY_BACKOFF,
+    start_exercise_generation,
+    start_lesson_generation,
+)
+from .urls import router
+from content_service_config.django import base
+from .models import (
+    Language,
+    Syllabus,
+    Lesson,
+    Exercise,
+    UserProgress,
+    UserProgressSummary,
+    UserLearningPath,
+    CourseBuild,
+)
+from .serializers import (
+    LanguageSerializer,
+    SyllabusSerializer,
+    LessonSerializer,
+    ExerciseSerializer,
+    UserProgressSerializer,
+    UserLearningPathSerializer,
+)
 
-# Create your tests here.
+
+UID = 123456
+
+
+class CatalogueQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.language = Language.objects.create(
+            uid=UID, name="yoruba", language_id="yo"
+        )
+        for i in range(25):
+            syllabus = Syllabus.objects.create(
+                uid=UID,
+                language=cls.language,
+                title=f"Syllabus {i}",
+                description="",
+                level="beginner",
+            )
+            for j in range(3):
+                lesson = Lesson.objects.create(
+                    uid=UID,
+                    syllabus=syllabus,
+                    topic=f"Lesson {i}.{j}",
+                    description="",
+                    order=j,
+                )
+                for k in range(2):
+                    Exercise.objects.create(
+                        uid=UID,
+                        lesson=lesson,
+                        topic=f"Exercise {i}.{j}.{k}",
+                        exercise_type="flashcard",
+                        order=k,
+                    )
+        cls.syllabus = syllabus
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedUser(uid=UID))
+
+    def get_page(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_syllabus_list_query_count_is_fixed(self):
+        response, first_page = self.get_page("/api/syllabi/")
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertEqual(response.data["results"][0]["lessons_count"], 3)
+        self.assertEqual(response.data["results"][0]["language_name"], "Yoruba")
+
+        response, second_page = self.get_page(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        # One keyset read per page, however deep
+        self.assertEqual(first_page, 1)
+        self.assertEqual(second_page, first_page)
+
+        response, _ = self.get_page(response.data["previous"])
+        self.assertEqual(
+            [row["title"] for row in response.data["results"]],
+            [f"Syllabus {i}" for i in range(20)],
+        )
+
+    def test_lesson_list_query_count_is_fixed(self):
+        response, queries = self.get_page("/api/lessons/")
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertEqual(response.data["results"][0]["exercises_count"], 2)
+        self.assertNotIn("approximate_count", response.data)
+        self.assertEqual(queries, 1)
+
+    def test_lesson_list_defaults_to_summary_shape(self):
+        response, _ = self.get_page("/api/lessons/")
+        self.assertNotIn("content", response.data["results"][0])
+
+        response, _ = self.get_page("/api/lessons/?omit=")
+        self.assertIn("content", response.data["results"][0])
+
+        response, queries = self.get_page("/api/lessons/?fields=topic,syllabus_title")
+        self.assertEqual(set(response.data["results"][0]), {"id", "topic", "syllabus_title"})
+        self.assertEqual(queries, 1)
+
+    def test_approximate_count_is_the_same_on_every_page(self):
+        response, _ = self.get_page("/api/syllabi/?count=approximate")
+        self.assertEqual(response.data["approximate_count"], 25)
+
+        response, _ = self.get_page(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(response.data["approximate_count"], 25)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get("/api/lessons/?cursor=bm90LWEtY3Vyc29y")
+        self.assertEqual(response.status_code, 404)
+
+    def test_syllabus_lessons_query_count_is_fixed(self):
+        url = f"/api/syllabi/{self.syllabus.pk}/lessons/"
+        response, queries = self.get_page(url)
+        self.assertEqual([lesson["exercises_count"] for lesson in response.data], [2, 2, 2])
+        # Syllabus lookup, the lessons' validators, and one read for the lessons
+        self.assertEqual(queries, 3)
+
+        with CaptureQueriesContext(connection) as revalidation:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        # A matching ETag skips the lessons read
+        self.assertEqual(len(revalidation), 2)
+
+    def test_syllabus_export_streams_the_tree(self):
+        url = f"/api/syllabi/{self.syllabus.pk}/export/"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            body = b"".join(response.streaming_content)
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [line["type"] for line in lines],
+            ["syllabus"] + ["lesson", "exercise", "exercise"] * 3,
+        )
+        self.assertEqual(lines[1]["data"]["syllabus_title"], self.syllabus.title)
+        # Syllabus, its lessons, and one exercise read per chunk of lessons
+        self.assertEqual(len(queries), 3)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        language = Language.objects.create(uid=UID, name="hausa", language_id="ha")
+        self.syllabi = [
+            Syllabus.objects.create(
+                uid=UID,
+                language=language,
+                title=f"Syllabus {i}",
+                description="",
+                level="beginner",
+            )
+            for i in range(2)
+        ]
+        self.lesson = Lesson.objects.create(
+            uid=UID,
+            syllabus=self.syllabi[0],
+            topic="Greetings",
+            description="",
+            duration_minutes=20,
+        )
+
+    def create_exercise(self, points=10):
+        return Exercise.objects.create(
+            uid=UID,
+            lesson=self.lesson,
+            topic="Hello",
+            exercise_type="flashcard",
+            points=points,
+        )
+
+    def assertCounters(self, obj, **expected):
+        obj.refresh_from_db()
+        self.assertEqual(
+            {name: getattr(obj, name) for name in expected}, expected
+        )
+
+    def test_exercise_writes_update_lesson_and_syllabus(self):
+        exercise = self.create_exercise(points=10)
+        self.create_exercise(points=5)
+        self.assertCounters(self.lesson, exercise_count=2, total_points=15)
+        self.assertCounters(
+            self.syllabi[0],
+            total_lessons=1,
+            total_points=15,
+            total_duration_minutes=20,
+        )
+
+        exercise.points = 25
+        exercise.save()
+        self.assertCounters(self.syllabi[0], total_points=30)
+
+        exercise.delete()
+        self.assertCounters(self.lesson, exercise_count=1, total_points=5)
+        self.assertCounters(self.syllabi[0], total_points=5)
+
+    def test_moving_a_lesson_moves_its_totals(self):
+        self.create_exercise(points=10)
+        self.lesson.refresh_from_db()
+        self.lesson.syllabus = self.syllabi[1]
+        self.lesson.save()
+
+        self.assertCounters(
+            self.syllabi[0], total_lessons=0, total_points=0, total_duration_minutes=0
+        )
+        self.assertCounters(
+            self.syllabi[1], total_lessons=1, total_points=10, total_duration_minutes=20
+        )
+
+    def test_moving_a_zero_point_exercise_keeps_points(self):
+        self.create_exercise(points=10)
+        exercise = self.create_exercise(points=0)
+        other = Lesson.objects.create(
+            uid=UID, syllabus=self.syllabi[1], topic="Numbers", description=""
+        )
+        exercise.lesson = other
+        exercise.points = 5
+        exercise.save()
+
+        self.assertCounters(self.lesson, exercise_count=1, total_points=10)
+        self.assertCounters(self.syllabi[0], total_points=10)
+        self.assertCounters(other, exercise_count=1, total_points=5)
+        self.assertCounters(self.syllabi[1], total_points=5)
+
+    def test_saving_a_stale_instance_keeps_counters(self):
+        stale = Lesson.objects.get(pk=self.lesson.pk)
+        self.create_exercise()
+        stale.topic = "Greetings and farewells"
+        stale.save()
+        self.assertCounters(self.lesson, exercise_count=1, total_points=10)
+
+    def test_reconcile_counters_fixes_drift(self):
+        self.create_exercise(points=10)
+        Lesson.objects.filter(pk=self.lesson.pk).update(exercise_count=7)
+        Syllabus.objects.filter(pk=self.syllabi[0].pk).update(total_lessons=0)
+
+        call_command("reconcile_counters", stdout=StringIO())
+
+        self.assertCounters(self.lesson, exercise_count=1, total_points=10)
+        self.assertCounters(
+            self.syllabi[0], total_lessons=1, total_points=10, total_duration_minutes=20
+        )
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        # Uncached dashboards, summaries applied synchronously
+        for name in ("DASHBOARD_CACHE_TTL", "PROGRESS_SUMMARY_FLUSH_DELAY"):
+            patcher = mock.patch.object(base, name, 0)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        language = Language.objects.create(uid=UID, name="igbo", language_id="ig")
+        self.syllabus = Syllabus.objects.create(
+            uid=UID, language=language, title="Igbo", description="", level="beginner"
+        )
+        lesson = Lesson.objects.create(
+            uid=UID, syllabus=self.syllabus, topic="Numbers", description=""
+        )
+        exercise = Exercise.objects.create(
+            uid=UID, lesson=lesson, topic="One", exercise_type="flashcard"
+        )
+        UserProgress.objects.create(
+            uid=UID, syllabus=self.syllabus, lesson=lesson, completed=True,
+            score=80, time_spent_seconds=300,
+        )
+        UserProgress.objects.create(
+            uid=UID, syllabus=self.syllabus, lesson=lesson, exercise=exercise,
+            completed=True, score=15, time_spent_seconds=60,
+        )
+        UserProgress.objects.create(
+            uid=UID + 1, syllabus=self.syllabus, completed=True, score=100
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedUser(uid=UID))
+
+    def test_dashboard_reads_one_summary_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/progress/dashboard/")
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data["completed_lessons"], 2)
+        self.assertEqual(response.data["completed_exercises"], 1)
+        self.assertEqual(response.data["total_points"], 95)
+        self.assertEqual(response.data["time_spent_seconds"], 360)
+        self.assertEqual(
+            [row["syllabus"] for row in response.data["syllabi"]],
+            [str(self.syllabus.pk)],
+        )
+
+    def test_rebuild_matches_incremental_summaries(self):
+        fields = ("uid", "syllabus", "completed_lessons", "completed_exercises",
+                  "total_points", "time_spent_seconds", "streak_days")
+        incremental = sorted(UserProgressSummary.objects.values_list(*fields))
+        UserProgressSummary.objects.update(total_points=0)
+        call_command("rebuild_progress_summaries", stdout=StringIO())
+        self.assertEqual(sorted(UserProgressSummary.objects.values_list(*fields)), incremental)
+
+    def test_deleting_progress_updates_summary(self):
+        UserProgress.objects.filter(uid=UID, exercise__isnull=False).delete()
+        summary = UserProgressSummary.objects.get(uid=UID, syllabus=self.syllabus)
+        self.assertEqual(summary.completed_exercises, 0)
+        self.assertEqual(summary.total_points, 80)
+
+    def total_points(self):
+        return UserProgressSummary.objects.get(uid=UID, syllabus=self.syllabus).total_points
+
+    def queue_progress(self, schedule=None):
+        """Progress worth 5 points whose summary event waits in the queue"""
+        progress.get_redis_connection("default").delete(
+            progress.SUMMARY_QUEUE, progress.SUMMARY_PROCESSING
+        )
+        progress.cache.delete(progress.FLUSH_SCHEDULED)
+        with mock.patch.object(base, "PROGRESS_SUMMARY_FLUSH_DELAY", 60):
+            with mock.patch(
+                "content.tasks.flush_progress_summaries.apply_async", side_effect=schedule
+            ):
+                UserProgress.objects.create(
+                    uid=UID, syllabus=self.syllabus, completed=True, score=5
+                )
+
+    def test_failed_flush_keeps_its_batch(self):
+        self.queue_progress()
+        with mock.patch("content.progress.apply_summary_events", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                progress.drain_summary_queue()
+        self.assertEqual(self.total_points(), 95)
+
+        self.assertEqual(progress.drain_summary_queue(), 1)
+        self.assertEqual(self.total_points(), 100)
+
+    def test_partly_applied_flush_is_not_applied_twice(self):
+        self.queue_progress()
+        apply = progress.apply_summary_events
+
+        def apply_then_fail(events):
+            apply(events)
+            raise RuntimeError("learning path update failed")
+
+        with mock.patch("content.progress.apply_summary_events", side_effect=apply_then_fail):
+            with self.assertRaises(RuntimeError):
+                progress.drain_summary_queue()
+        self.assertEqual(self.total_points(), 100)
+
+        self.assertEqual(progress.drain_summary_queue(), 1)
+        self.assertEqual(self.total_points(), 100)
+
+    def test_scheduling_failure_leaves_events_queued_once(self):
+        self.queue_progress(schedule=RuntimeError)
+        self.assertEqual(self.total_points(), 95)
+        self.assertIsNone(progress.cache.get(progress.FLUSH_SCHEDULED))
+
+        progress.drain_summary_queue()
+        self.assertEqual(self.total_points(), 100)
+
+    def test_rebuild_discards_queued_events(self):
+        self.queue_progress()
+        progress.rebuild_summaries(UID, syllabi={self.syllabus.pk})
+        self.assertEqual(self.total_points(), 100)
+
+        self.assertEqual(progress.drain_summary_queue(), 0)
+        self.assertEqual(self.total_points(), 100)
+
+
+class BulkProgressTests(TestCase):
+    def setUp(self):
+        for name in ("DASHBOARD_CACHE_TTL", "PROGRESS_SUMMARY_FLUSH_DELAY"):
+            patcher = mock.patch.object(base, name, 0)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        language = Language.objects.create(uid=UID, name="swahili", language_id="sw")
+        self.syllabus = Syllabus.objects.create(
+            uid=UID, language=language, title="Swahili", description="", level="beginner"
+        )
+        self.lesson = Lesson.objects.create(
+            uid=UID, syllabus=self.syllabus, topic="Greetings", description=""
+        )
+        self.existing = UserProgress.objects.create(
+            uid=UID, syllabus=self.syllabus, lesson=self.lesson, score=10
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedUser(uid=UID))
+
+    def test_bulk_upsert_reports_each_event(self):
+        syllabus, lesson = str(self.syllabus.pk), str(self.lesson.pk)
+        events = [
+            {"syllabus": syllabus, "completed": True, "score": 40},
+            {"syllabus": syllabus, "lesson": lesson, "completed": True, "score": 70},
+            {"syllabus": syllabus, "score": 150},
+            {"syllabus": str(self.lesson.pk)},
+            {"syllabus": syllabus, "completed": True, "score": 50},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/progress/bulk/", events, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["superseded", "updated", "invalid", "invalid", "created"],
+        )
+        self.assertEqual(response.data["counts"]["invalid"], 2)
+        # Reference checks and summary rebuild do not grow with the batch
+        self.assertLess(len(queries), 15)
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.score, 70)
+        summary = UserProgressSummary.objects.get(uid=UID, syllabus=self.syllabus)
+        self.assertEqual(summary.completed_lessons, 1)
+        self.assertEqual(summary.total_points, 120)
+
+    def test_bulk_defers_the_summary_rebuild_to_a_worker(self):
+        events = [{"syllabus": str(self.syllabus.pk), "completed": True, "score": 40}]
+        with mock.patch.object(base, "PROGRESS_SUMMARY_FLUSH_DELAY", 60), mock.patch(
+            "content.tasks.rebuild_progress_summaries.delay"
+        ) as rebuild, mock.patch("content.progress.rebuild_summaries") as inline:
+            response = self.client.post("/api/progress/bulk/", events, format="json")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["counts"], {"created": 1})
+        rebuild.assert_called_once_with(UID, [str(self.syllabus.pk)])
+        inline.assert_not_called()
+
+    def test_bulk_rejects_oversized_batches(self):
+        with mock.patch.object(base, "PROGRESS_BULK_MAX_EVENTS", 1):
+            response = self.client.post(
+                "/api/progress/bulk/", [{}, {}], format="json"
+            )
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.language = Language.objects.create(uid=UID, name="hausa", language_id="ha")
+        syllabus = Syllabus.objects.create(
+            uid=UID, language=self.language, title="Hausa", description="", level="beginner"
+        )
+        self.lesson = Lesson.objects.create(
+            uid=UID, syllabus=syllabus, topic="Greetings", description=""
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedUser(uid=UID))
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response
+
+    def test_language_list_is_publicly_cacheable(self):
+        def rename():
+            self.language.description = "Spoken in West Africa"
+            self.language.save()
+
+        response = self.assertRevalidates("/api/languages/", rename)
+        self.assertTrue(response["Cache-Control"].startswith("public"))
+        self.assertIn("Accept", response["Vary"])
+
+    def test_lesson_etag_follows_exercise_counters(self):
+        def add_exercise():
+            Exercise.objects.create(
+                uid=UID, lesson=self.lesson, topic="Hello", exercise_type="flashcard"
+            )
+
+        response = self.assertRevalidates(f"/api/lessons/{self.lesson.pk}/", add_exercise)
+        self.assertEqual(response.data["exercises_count"], 1)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+
+LOCAL_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class VersionedCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.cache = VersionedCache("test", ttl=60)
+
+    def test_bump_retires_the_namespace(self):
+        build = mock.Mock(side_effect=["first", "second"])
+        self.assertEqual(self.cache.get_or_build("a", "key", build), "first")
+        self.assertEqual(self.cache.get_or_build("a", "key", build), "first")
+        self.cache.bump("b")
+        self.assertEqual(self.cache.get_or_build("a", "key", build), "first")
+        self.cache.bump("a")
+        self.assertEqual(self.cache.get_or_build("a", "key", build), "second")
+
+    def test_entries_near_expiry_are_refreshed_early(self):
+        self.cache.get_or_build("a", "key", lambda: "stale")
+        cache_key = f"test:a:{self.cache.version('a')}:key"
+        entry = caches["default"].get(cache_key)
+
+        # One second left: a ten-second build is refreshed early, a
+        # millisecond one is not
+        caches["default"].set(cache_key, {**entry, "delta": 10, "expires": time.time() + 1})
+        with mock.patch("content.caching.random.random", return_value=0.5):
+            self.assertEqual(self.cache.get_or_build("a", "key", lambda: "fresh"), "fresh")
+
+        caches["default"].set(cache_key, {**entry, "delta": 0.001, "expires": time.time() + 1})
+        with mock.patch("content.caching.random.random", return_value=0.5):
+            self.assertEqual(self.cache.get_or_build("a", "key", lambda: "rebuilt"), "stale")
+
+    def test_one_caller_builds_while_others_wait(self):
+        cache_key = f"test:a:{self.cache.version('a')}:key"
+        caches["default"].add(f"{cache_key}:lock", 1)
+
+        def publish():
+            time.sleep(0.2)
+            caches["default"].set(
+                cache_key, {"value": "built", "delta": 0.0, "expires": time.time() + 60}
+            )
+
+        builder = threading.Thread(target=publish)
+        builder.start()
+        build = mock.Mock(return_value="duplicate")
+        self.assertEqual(self.cache.get_or_build("a", "key", build), "built")
+        builder.join()
+        build.assert_not_called()
+
+
+    def test_caller_that_stops_waiting_leaves_the_lock_alone(self):
+        cache = VersionedCache("test", ttl=60, wait=0.1)
+        cache_key = f"test:a:{cache.version('a')}:key"
+        caches["default"].add(f"{cache_key}:lock", "holder")
+
+        self.assertEqual(cache.get_or_build("a", "key", lambda: "built"), "built")
+        self.assertEqual(caches["default"].get(f"{cache_key}:lock"), "holder")
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ContentCacheTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        patcher = mock.patch.object(representations.content_cache, "ttl", 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        language = Language.objects.create(uid=UID, name="hausa", language_id="ha")
+        self.syllabus = Syllabus.objects.create(
+            uid=UID, language=language, title="Hausa", description="", level="beginner"
+        )
+        self.lesson = Lesson.objects.create(
+            uid=UID, syllabus=self.syllabus, topic="Greetings", description=""
+        )
+
+    def cached(self, syllabus, build):
+        return representations.cached_representation(
+            syllabus.pk, "syllabus-lessons", syllabus.pk, {}, build
+        )
+
+    def assertInvalidates(self, change):
+        build = mock.Mock(side_effect=["before", "after"])
+        self.assertEqual(self.cached(self.syllabus, build), "before")
+        self.assertEqual(self.cached(self.syllabus, build), "before")
+        change()
+        self.assertEqual(self.cached(self.syllabus, build), "after")
+
+    def test_saving_or_deleting_content_invalidates_its_syllabus(self):
+        self.assertInvalidates(self.syllabus.save)
+        self.assertInvalidates(self.lesson.save)
+        exercise = Exercise.objects.create(
+            uid=UID, lesson=self.lesson, topic="Sannu", exercise_type="flashcard"
+        )
+        self.assertInvalidates(exercise.save)
+        self.assertInvalidates(exercise.delete)
+        self.assertInvalidates(self.lesson.delete)
+
+    def test_moving_a_lesson_invalidates_both_syllabi(self):
+        other = Syllabus.objects.create(
+            uid=UID, language=self.syllabus.language, title="Hausa 2",
+            description="", level="beginner",
+        )
+
+        def move():
+            self.lesson.syllabus = other
+            self.lesson.save()
+
+        self.assertInvalidates(move)
+        build = mock.Mock(return_value="other")
+        self.cached(other, build)
+        self.lesson.syllabus = self.syllabus
+        self.lesson.save()
+        self.cached(other, build)
+        self.assertEqual(build.call_count, 2)
+
+
+class AdminClaimsTests(SimpleTestCase):
+    def user(self, **claims):
+        claims = {
+            "is_staff": True, "is_superuser": False, "is_active": True,
+            "iat": time.time(), **claims,
+        }
+        return AuthenticatedUser(uid=UID, **claims)
+
+    def setUp(self):
+        patcher = mock.patch("content.roles.validate_admin_user", return_value=True)
+        self.validate_admin_user = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fresh_claims_decide_without_user_service(self):
+        self.assertTrue(is_admin(self.user()))
+        self.assertTrue(is_admin(self.user(is_staff=False, is_superuser=True)))
+        self.assertFalse(is_admin(self.user(is_active=False)))
+        self.assertFalse(is_admin(self.user(is_staff=False)))
+        self.validate_admin_user.assert_not_called()
+
+    def test_missing_or_stale_claims_ask_user_service(self):
+        stale = time.time() - base.ADMIN_CLAIMS_MAX_AGE - 1
+        for user in [self.user(is_staff=None), self.user(iat=None), self.user(iat=stale)]:
+            self.assertTrue(is_admin(user))
+        self.assertEqual(self.validate_admin_user.call_args_list, [mock.call(UID)] * 3)
+
+    def test_permissions_resolve_admins_from_claims(self):
+        request = mock.Mock(user=self.user(), method="PATCH")
+        owned_by_other = mock.Mock(uid=UID + 1)
+        self.assertTrue(IsAdminUser().has_permission(request, None))
+        self.assertTrue(
+            IsOwnerOrAdmin().has_object_permission(request, None, owned_by_other)
+        )
+
+        request.user = self.user(is_staff=False)
+        self.assertFalse(IsAdminUser().has_permission(request, None))
+        self.assertFalse(
+            IsOwnerOrAdmin().has_object_permission(request, None, owned_by_other)
+        )
+        self.validate_admin_user.assert_not_called()
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class UserLookupCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        lookups.admin_cache.local.clear()
+        patcher = mock.patch("content.lookups._ensure_listener")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_local_entries_expire_and_evict_least_recent(self):
+        cache = LocalTTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+        cache.set("d", 4, ttl=0)
+        self.assertIsNone(cache.get("d"))
+
+    def test_misses_are_cached_negatively_in_both_tiers(self):
+        cache = TwoTierCache("test", ttl=60, negative_ttl=60, local_ttl=60, maxsize=10)
+        loader = mock.Mock(return_value=None)
+        self.assertIsNone(cache.get_or_load(UID, loader))
+        self.assertIsNone(cache.get_or_load(UID, loader))
+        loader.assert_called_once_with(UID)
+
+        # Another process, with an empty local tier, reads the shared entry
+        cache.local.clear()
+        self.assertIsNone(cache.get_or_load(UID, loader))
+        loader.assert_called_once_with(UID)
+
+    def test_shared_tier_failures_fall_back_to_the_loader(self):
+        cache = TwoTierCache("test", ttl=60, negative_ttl=60, local_ttl=60, maxsize=10)
+        with mock.patch.object(
+            caches["default"], "get", side_effect=ConnectionError("redis down")
+        ), mock.patch.object(caches["default"], "set", side_effect=ConnectionError):
+            self.assertEqual(cache.get_or_load(UID, lambda uid: {"uid": uid}), {"uid": UID})
+        self.assertEqual(cache.local.get(cache.make_key(UID)), {"uid": UID})
+
+    def test_invalidation_during_a_load_is_not_overwritten(self):
+        cache = TwoTierCache("test", ttl=60, negative_ttl=60, local_ttl=60, maxsize=10)
+
+        def revoked_while_loading(uid):
+            cache.invalidate(uid)
+            return True
+
+        self.assertTrue(cache.get_or_load(UID, revoked_while_loading))
+        self.assertFalse(cache.get_or_load(UID, lambda uid: False))
+        self.assertEqual(cache._loading, {})
+
+    def test_published_invalidation_clears_both_tiers(self):
+        with mock.patch("content.lookups._fetch_admin_status", return_value=True) as fetch:
+            self.assertTrue(lookups.validate_admin_user(UID))
+            self.assertTrue(lookups.validate_admin_user(UID))
+            self.assertEqual(fetch.call_count, 1)
+
+            lookups._handle_invalidation({"data": json.dumps({"uid": UID})})
+            fetch.return_value = False
+            self.assertFalse(lookups.validate_admin_user(UID))
+            self.assertEqual(fetch.call_count, 2)
+
+            # Malformed events are ignored
+            lookups._handle_invalidation({"data": b"not json"})
+            self.assertFalse(lookups.validate_admin_user(UID))
+            self.assertEqual(fetch.call_count, 2)
+
+
+class ServiceClientTests(SimpleTestCase):
+    def test_breaker_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_breaker_lets_one_probe_through_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_open_circuit_rejects_without_calling(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        client = ServiceClient("http://user-service", breaker=breaker)
+        self.addCleanup(client.close)
+        with mock.patch.object(client.session, "request") as send:
+            send.return_value = mock.Mock(status_code=503)
+            client.request("GET", "/health/")
+            client.request("GET", "/health/")
+            with self.assertRaises(CircuitOpenError):
+                client.request("GET", "/health/")
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(
+            {
+                key: value
+                for key, value in client.metrics.snapshot()["/health/"].items()
+                if key in ("requests", "errors", "rejected")
+            },
+            {"requests": 3, "errors": 2, "rejected": 1},
+        )
+
+    def test_failed_probe_reopens_the_circuit_whatever_it_raises(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client = ServiceClient("http://user-service", breaker=breaker)
+        self.addCleanup(client.close)
+        with mock.patch.object(client.session, "request") as send:
+            send.side_effect = requests.ConnectionError
+            with self.assertRaises(requests.ConnectionError):
+                client.request("GET", "/health/")
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+            # The half-open probe fails outside requests' exceptions
+            send.side_effect = ValueError
+            with self.assertRaises(ValueError):
+                client.request("GET", "/health/")
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+            send.side_effect = None
+            send.return_value = mock.Mock(status_code=200)
+            client.request("GET", "/health/")
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class JWTAuthenticationTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch(
+            "content.authentication.token_cache", LocalTTLCache(maxsize=10, ttl=300)
+        )
+        self.token_cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def token(self, **claims):
+        return jwt.encode(
+            {"uid": UID, "exp": int(time.time()) + 60, **claims},
+            base.JWT_KEY,
+            algorithm=base.JWT_ALGORITHM,
+        )
+
+    def authenticate(self, token):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return JWTAuthentication().authenticate(request)[0]
+
+    def test_token_is_verified_once_until_it_expires(self):
+        token = self.token(is_staff=True)
+        with mock.patch("content.authentication.jwt.decode", wraps=jwt.decode) as decode:
+            user = self.authenticate(token)
+            self.assertIs(self.authenticate(token), user)
+        decode.assert_called_once()
+        self.assertEqual((user.uid, user.is_staff), (UID, True))
+
+        # Cached no longer than the token is valid
+        (_, expires_at), = self.token_cache._data.values()
+        self.assertLessEqual(expires_at, time.monotonic() + 60)
+
+    def test_expired_and_invalid_tokens_are_not_cached(self):
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token(exp=int(time.time()) - 1))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token(uid=None))
+        self.assertEqual(len(self.token_cache), 0)
+
+    def test_principal_is_immutable(self):
+        user = self.authenticate(self.token())
+        with self.assertRaises(AttributeError):
+            user.uid = UID + 1
+        with self.assertRaises(AttributeError):
+            user.is_superuser = True
+
+
+class FastJSONTests(SimpleTestCase):
+    def test_renderer_matches_json_renderer(self):
+        now = datetime.datetime(2026, 3, 4, 5, 6, 7, 890123, tzinfo=datetime.timezone.utc)
+        for data in [
+            {"id": "66f0c0ffee", "points": 10, "score": 0.75, "tags": ["a", "\u2028"]},
+            {"created_at": now, "naive": now.replace(tzinfo=None)},
+            {"day": now.date(), "at": now.time(), "spent": datetime.timedelta(minutes=3)},
+            {"id": uuid.UUID(int=7), "price": Decimal("9.90")},
+            [0.1, -0.0, 0.0001, 123456.789, 2**70],
+            {"text": "Ẹ káàárọ̀", "nested": {"empty": [], "none": None}},
+            None,
+        ]:
+            self.assertEqual(
+                FastJSONRenderer().render(data), JSONRenderer().render(data), data
+            )
+
+    def test_parser_matches_json_parser(self):
+        for body in [
+            b'{"id": "66f0c0ffee", "score": 0.75, "tags": ["a"]}',
+            b"[1e400, 1e-05, 12345678901234567]",
+            "{\"text\": \"Ẹ káàárọ̀\"}".encode(),
+        ]:
+            self.assertEqual(
+                FastJSONParser().parse(BytesIO(body)),
+                JSONParser().parse(BytesIO(body)),
+                body,
+            )
+
+    def test_parser_rejects_what_json_parser_rejects(self):
+        for body in [b"{", b'{"score": NaN}']:
+            with self.assertRaises(ParseError):
+                JSONParser().parse(BytesIO(body))
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(BytesIO(body))
+
+
+class CompiledSerializerTests(TestCase):
+    def setUp(self):
+        language = Language.objects.create(uid=UID, name="igbo", language_id="ig")
+        syllabus = Syllabus.objects.create(
+            uid=UID, language=language, title="Igbo", description="", level="beginner"
+        )
+        lesson = Lesson.objects.create(
+            uid=UID,
+            syllabus=syllabus,
+            topic="Greetings",
+            description="",
+            content={"sections": [1]},
+        )
+        exercise = Exercise.objects.create(
+            uid=UID, lesson=lesson, topic="Hello", exercise_type="flashcard"
+        )
+        UserProgress.objects.create(uid=UID, syllabus=syllabus)
+        UserProgress.objects.create(
+            uid=UID, syllabus=syllabus, lesson=lesson, exercise=exercise, completed=True
+        )
+        UserLearningPath.objects.create(uid=UID, language=language)
+        UserLearningPath.objects.create(
+            uid=UID, language=language, current_syllabus=syllabus
+        )
+
+    def assertMatchesDRF(self, serializer_class, **fieldset):
+        queryset = serializer_class.Meta.model.objects.order_by("created_at", "id")
+        compiled = compile_serializer(serializer_class, many=True, **fieldset)
+        self.assertIsNotNone(compiled)
+        expected = serializer_class(queryset, many=True, **fieldset).data
+        self.assertEqual(compiled.serialize(compiled.rows(queryset)), expected)
+
+    def test_compiled_output_matches_drf(self):
+        for serializer_class in [
+            LanguageSerializer,
+            SyllabusSerializer,
+            LessonSerializer,
+            ExerciseSerializer,
+            UserProgressSerializer,
+            UserLearningPathSerializer,
+        ]:
+            with self.subTest(serializer_class.__name__):
+                self.assertMatchesDRF(serializer_class)
+                self.assertMatchesDRF(serializer_class, omit=[])
+
+    def test_compiled_output_matches_drf_fieldsets(self):
+        self.assertMatchesDRF(LessonSerializer, fields=["topic", "syllabus_title"])
+        self.assertMatchesDRF(UserProgressSerializer, fields=["lesson", "lesson_title"])
+        self.assertMatchesDRF(SyllabusSerializer, omit=["language_name"])
+
+    def test_uncompilable_serializer_falls_back(self):
+        class ComputedSerializer(LessonSerializer):
+            label = serializers.SerializerMethodField()
+
+            def get_label(self, lesson):
+                return str(lesson)
+
+        self.assertIsNone(compile_serializer(ComputedSerializer, many=True))
+
+    def test_list_endpoint_uses_compiled_rows(self):
+        client = APIClient()
+        client.force_authenticate(user=AuthenticatedUser(uid=UID))
+        response = client.get("/api/progress/")
+        self.assertEqual(response.status_code, 200)
+        expected = UserProgressSerializer(
+            UserProgress.objects.order_by("created_at", "id"), many=True
+        ).data
+        self.assertEqual(response.data["results"], expected)
+
+
+class AsyncDBTests(SimpleTestCase):
+    def test_compiled_queries_read_like_the_backend(self):
+        # Fails first when a django-mongodb-backend upgrade changes the
+        # compiler internals compile_values() relies on
+        updated_at = datetime.datetime(2026, 1, 2, 3, 4, 5)
+        queryset = Lesson.objects.filter(uid=UID).values("topic", "syllabus__updated_at")
+        alias, collection, pipeline, to_rows = compile_values(queryset[:5])
+
+        self.assertEqual((alias, collection), ("default", Lesson._meta.db_table))
+        self.assertIn({"$limit": 5}, pipeline)
+        [(topic, syllabus_updated_at)] = to_rows(
+            [{"topic": "Greetings", "syllabi": {"updated_at": updated_at}}]
+        )
+        self.assertEqual(topic, "Greetings")
+        self.assertEqual(
+            syllabus_updated_at, updated_at.replace(tzinfo=datetime.timezone.utc)
+        )
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        language = Language.objects.create(uid=UID, name="swahili", language_id="sw")
+        syllabus = Syllabus.objects.create(
+            uid=UID, language=language, title="Swahili", description="", level="beginner"
+        )
+        self.lesson = Lesson.objects.create(
+            uid=UID, syllabus=syllabus, topic="Greetings", description="", order=1
+        )
+        Exercise.objects.create(
+            uid=UID, lesson=self.lesson, topic="Jambo", exercise_type="flashcard"
+        )
+        token = jwt.encode(
+            {"uid": UID, "exp": int(time.time()) + 60},
+            base.JWT_KEY,
+            algorithm=base.JWT_ALGORITHM,
+        )
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.client = APIClient()
+        self.views = {
+            pattern.name: pattern.callback
+            for pattern in async_urlpatterns(router.urls)
+            if "format" not in pattern.pattern.regex.groupindex
+        }
+
+    async def assertMatchesViewset(self, name, url, **kwargs):
+        expected = await sync_to_async(self.client.get)(url, **self.headers)
+        request = RequestFactory().get(url, **self.headers)
+        response = await self.views[name](request, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        self.assertEqual(response.get("ETag"), expected.get("ETag"))
+        return response
+
+    async def test_async_reads_match_viewsets(self):
+        pk = self.lesson.pk
+        await self.assertMatchesViewset("language-list", "/api/languages/")
+        await self.assertMatchesViewset("syllabus-list", "/api/syllabi/")
+        await self.assertMatchesViewset("lesson-list", "/api/lessons/?fields=topic")
+        await self.assertMatchesViewset("exercise-list", "/api/exercises/")
+        await self.assertMatchesViewset("lesson-detail", f"/api/lessons/{pk}/", pk=pk)
+        await self.assertMatchesViewset(
+            "lesson-detail", "/api/lessons/not-a-uuid/", pk="not-a-uuid"
+        )
+        await self.assertMatchesViewset("progress-dashboard", "/api/progress/dashboard/")
+
+    async def test_async_detail_revalidates(self):
+        url = f"/api/lessons/{self.lesson.pk}/"
+        response = await self.assertMatchesViewset("lesson-detail", url, pk=self.lesson.pk)
+        request = RequestFactory().get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"], **self.headers
+        )
+        response = await self.views["lesson-detail"](request, pk=self.lesson.pk)
+        self.assertEqual(response.status_code, 304)
+
+
+class AIClientTests(TestCase):
+    def test_ai_requests_share_the_process_client(self):
+        client = get_ai_client()
+        with mock.patch.object(client.session, "request") as send:
+            send.return_value.status_code = 200
+            send.return_value.json.return_value = {"syllabus_id": "s1"}
+            make_ai_request("/api/v1/generate/syllabus", {"task": "a"})
+            make_ai_request("/api/v1/generate/syllabus", {"task": "b"})
+
+        self.assertIs(get_ai_client(), client)
+        self.assertEqual(send.call_count, 2)
+        self.assertGreaterEqual(
+            client.metrics.snapshot()["/api/v1/generate/syllabus"]["requests"], 2
+        )
+
+    def test_identical_requests_share_cached_results(self):
+        def payload(uid, timestamp):
+            parameters = {"topic": "Greetings", "uid": uid, "timestamp": timestamp}
+            return {"task": "generate_lesson", "parameters": parameters}
+
+        first, second = payload(1, "2025-01-01"), payload(2, "2025-01-02")
+        key = ai_cache.request_key("/lesson", first)
+        self.assertEqual(ai_cache.request_key("/lesson", second), key)
+        self.assertNotEqual(ai_cache.request_key("/exercises", first), key)
+        ai_cache.get_redis_connection("default").delete(key)
+
+        client = get_ai_client()
+        with mock.patch.object(client.session, "request") as send:
+            send.return_value.status_code = 200
+            send.return_value.json.return_value = {"lesson_id": "l1"}
+            make_ai_request("/lesson", first, use_cache=True)
+            cached = make_ai_request("/lesson", second, use_cache=True)
+            make_ai_request("/lesson", second, use_cache=False)
+
+        self.assertEqual(cached, {"lesson_id": "l1"})
+        self.assertEqual(send.call_count, 2)
+        self.assertGreaterEqual(ai_cache.stats()["generate_lesson"]["hits"], 1)
+
+    def test_cache_hits_extend_the_result_ttl(self):
+        redis = ai_cache.get_redis_connection("default")
+        key = ai_cache.request_key("/lesson", {"parameters": {"topic": "Numbers"}})
+        ai_cache.put(key, {"lesson_id": "l1"})
+        redis.expire(key, 5)
+
+        self.assertEqual(ai_cache.get(key, "generate_lesson"), {"lesson_id": "l1"})
+        self.assertGreater(redis.ttl(key), 5)
+        redis.delete(key)
+
+    def test_single_flight_runs_a_failing_call_once(self):
+        flights = SingleFlight("test-flight", wait_timeout=0)
+        call = mock.Mock(side_effect=ai_limiter.AIServiceOverloaded("busy"))
+        with mock.patch("content.singleflight.get_redis_connection") as connection:
+            # Another worker holds the lease and never finishes
+            connection.return_value.set.return_value = None
+            with self.assertRaises(ai_limiter.AIServiceOverloaded):
+                flights.run("held", call)
+        self.assertEqual(call.call_count, 1)
+
+    def test_leader_keeps_its_result_when_publishing_fails(self):
+        flights = SingleFlight("test-flight")
+
+        def set(key, *args, **kwargs):
+            if key.startswith("test-flight:result:"):
+                raise ConnectionError("Redis went away")
+            return True
+
+        with mock.patch("content.singleflight.get_redis_connection") as connection:
+            connection.return_value.set.side_effect = set
+            result = flights.run("unpublished", lambda: {"lesson_id": "l3"})
+        self.assertEqual(result, {"lesson_id": "l3"})
+        connection.return_value.publish.assert_called_once()
+
+    def test_async_engine_runs_calls_from_many_threads(self):
+        with FakeAIService(latency=0.2) as service:
+            engine = AIEngine(service.url, concurrency=8)
+            with mock.patch.object(base, "AI_ASYNC_ENGINE", True):
+                with mock.patch("content.tasks.get_ai_engine", return_value=engine):
+                    started = time.monotonic()
+                    with ThreadPoolExecutor(max_workers=8) as pool:
+                        results = list(
+                            pool.map(
+                                lambda i: make_ai_request(
+                                    "/api/v1/generate/syllabus", {"task": i}
+                                ),
+                                range(8),
+                            )
+                        )
+                    elapsed = time.monotonic() - started
+            engine.close()
+
+        self.assertEqual(len(service.requests), 8)
+        self.assertTrue(all(result["syllabus_id"] for result in results))
+        # Overlapping on one loop rather than one after another
+        self.assertLess(elapsed, 8 * 0.2)
+        self.assertEqual(
+            engine.metrics.snapshot()["/api/v1/generate/syllabus"]["requests"], 8
+        )
+
+    def test_concurrent_duplicates_share_one_call(self):
+        flights = SingleFlight("test-flight", lease_ttl=2, result_ttl=5)
+        key = f"concurrent-{time.time()}"
+        calls, results = [], []
+
+        def call():
+            calls.append(1)
+            time.sleep(0.5)
+            return {"lesson_id": "l1"}
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.run(key, call)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"lesson_id": "l1"}] * 4)
+
+    def test_expired_lease_is_taken_over(self):
+        flights = SingleFlight("test-flight", lease_ttl=1, result_ttl=5)
+        key = f"abandoned-{time.time()}"
+        # A lease left behind by a worker that died mid-call
+        redis = ai_cache.get_redis_connection("default")
+        redis.set(flights.keys(key)[0], "dead-worker", px=500)
+
+        started = time.monotonic()
+        result = flights.run(key, lambda: {"lesson_id": "l2"})
+
+        self.assertEqual(result, {"lesson_id": "l2"})
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNone(redis.get(flights.keys(key)[0]))
+
+    def test_generation_payloads_serialize(self):
+        with mock.patch("content.tasks.make_ai_request") as request:
+            request.return_value = {"syllabus_id": "s1"}
+            result = generate_syllabus.run(language="yoruba", level="beginner")
+
+        endpoint, payload = request.call_args.args
+        json.dumps(payload)
+        json.dumps(result)
+
+
+class AILimiterTests(TestCase):
+    def setUp(self):
+        ai_limiter.get_redis_connection("default").delete(
+            ai_limiter.STATE_KEY, ai_limiter.IN_FLIGHT_KEY
+        )
+
+    def test_success_grows_and_overload_halves_the_shared_limit(self):
+        initial = base.AI_CONCURRENCY_INITIAL
+        ai_limiter.release(ai_limiter.acquire(), ai_limiter.OK)
+        self.assertAlmostEqual(
+            ai_limiter.snapshot()["concurrency_limit"], initial + 1 / initial
+        )
+
+        for _ in range(3):
+            # One decrease for a burst of overloaded calls
+            ai_limiter.release(ai_limiter.acquire(), ai_limiter.OVERLOAD)
+        limits = ai_limiter.snapshot()
+        self.assertAlmostEqual(limits["concurrency_limit"], (initial + 1 / initial) / 2)
+        self.assertEqual(limits["in_flight"], 0)
+
+    def test_retry_after_pauses_every_caller(self):
+        ai_limiter.release(ai_limiter.acquire(), ai_limiter.OVERLOAD, retry_after=5)
+        self.assertGreater(ai_limiter.snapshot()["blocked_for"], 4)
+
+        with mock.patch.object(base, "AI_LIMITER_ACQUIRE_TIMEOUT", 0.5):
+            with self.assertRaises(ai_limiter.AIServiceOverloaded) as raised:
+                ai_limiter.acquire()
+        self.assertGreater(raised.exception.retry_after, 4)
+
+    def test_overload_response_is_retried_after_its_retry_after(self):
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "300"
+        client = get_ai_client()
+        with mock.patch.object(base, "AI_LIMITER_ENABLED", False):
+            with mock.patch.object(client.session, "request", return_value=response):
+                with self.assertRaises(ai_limiter.AIServiceOverloaded) as raised:
+                    post_ai_request("/api/v1/generate/lesson", {"task": "a"})
+
+        self.assertEqual(raised.exception.retry_after, 300)
+        self.assertGreaterEqual(retry_countdown(0, raised.exception), 300)
+        self.assertLessEqual(retry_countdown(0), RETRY_BACKOFF)
+        self.assertEqual(
+            ai_limiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0
+        )
+
+
+class CourseBuildTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=AuthenticatedUser(uid=UID))
+
+    def test_create_starts_workflow_without_waiting(self):
+        with mock.patch("content.tasks.chain") as workflow:
+            workflow.return_value.apply_async.return_value.id = "task-1"
+            response = self.client.post(
+                "/api/course-builds/",
+                {"language": "yoruba", "level": "beginner"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "running")
+        self.assertEqual(response.data["task_id"], "task-1")
+        workflow.return_value.link_error.assert_called_once()
+
+        response = self.client.get(f"/api/course-builds/{response.data['id']}/")
+        self.assertEqual(response.data["stage"], "syllabus")
+
+    def test_lessons_fan_out_into_a_chord(self):
+        build = CourseBuild.objects.create(uid=UID, language="yoruba", level="beginner")
+        syllabus = {
+            "syllabus_id": "s1",
+            "modules": [
+                {"module_id": "m1", "lessons": ["Greetings", "Numbers"]},
+                {"module_id": "m2", "lessons": ["Family"]},
+            ],
+        }
+        with mock.patch.object(
+            start_lesson_generation, "replace", side_effect=Ignore
+        ) as replace:
+            with self.assertRaises(Ignore):
+                start_lesson_generation.run(syllabus, str(build.pk), "beginner", UID)
+
+        workflow = replace.call_args.args[0]
+        self.assertEqual(len(workflow.tasks), 3)
+        self.assertEqual(workflow.body.name, "content.tasks.start_exercise_generation")
+        build.refresh_from_db()
+        self.assertEqual((build.stage, build.total_lessons), ("lessons", 3))
+
+    def test_assembling_completes_the_build(self):
+        build = CourseBuild.objects.create(uid=UID, language="yoruba", level="beginner")
+        course = assemble_course.run(
+            [[{"exercise_set_id": "e1"}], [{"exercise_set_id": "e2"}]],
+            str(build.pk),
+            {"syllabus_id": "s1"},
+            [{"lesson_id": "l1"}],
+        )
+        build.refresh_from_db()
+        self.assertEqual((build.status, build.stage), ("succeeded", "done"))
+        self.assertEqual(build.result, course)
+        self.assertEqual(len(course["exercises"]), 2)
+
+    def test_exercises_are_requested_in_batches(self):
+        build = CourseBuild.objects.create(uid=UID, language="yoruba", level="beginner")
+        lessons = [{"lesson_id": f"l{i}"} for i in range(5)]
+        with mock.patch.object(base, "AI_EXERCISE_BATCH_SIZE", 2):
+            with mock.patch.object(
+                start_exercise_generation, "replace", side_effect=Ignore
+            ) as replace:
+                with self.assertRaises(Ignore):
+                    start_exercise_generation.run(
+                        lessons, str(build.pk), {"syllabus_id": "s1"}, "beginner", UID
+                    )
+
+        workflow = replace.call_args.args[0]
+        self.assertEqual(
+            [task.kwargs["lesson_ids"] for task in workflow.tasks],
+            [["l0", "l1"], ["l2", "l3"], ["l4"]],
+        )
+        self.assertEqual(workflow.body.name, "content.tasks.assemble_course")
+
+    def test_exercise_batch_is_one_request_fanned_out_per_lesson(self):
+        with FakeAIService() as service:
+            client = ServiceClient(service.url)
+            with mock.patch("content.tasks.get_ai_client", return_value=client):
+                exercise_sets = generate_exercise_batch.run(
+                    ["l1", "l2", "l3"],
+                    ["flashcard", "translation"],
+                    "beginner",
+                    count_per_type=2,
+                    uid=UID,
+                    use_cache=False,
+                )
+            client.close()
+
+        self.assertEqual(service.paths(), ["/api/v1/generate/exercises/batch"])
+        self.assertEqual([s["lesson_id"] for s in exercise_sets], ["l1", "l2", "l3"])
+        self.assertEqual([s["total_exercises"] for s in exercise_sets], [4, 4, 4])
+
+
+    def test_exercise_batch_falls_back_without_a_batch_endpoint(self):
+        with FakeAIService(batch=False) as service:
+            client = ServiceClient(service.url)
+            with mock.patch("content.tasks.get_ai_client", return_value=client):
+                exercise_sets = generate_exercise_batch.run(
+                    ["l1", "l2"], ["flashcard"], "beginner", uid=UID, use_cache=False
+                )
+            client.close()
+
+        self.assertEqual(
+            service.paths(),
+            ["/api/v1/generate/exercises/batch"] + ["/api/v1/generate/exercises"] * 2,
+        )
+        self.assertEqual([s["lesson_id"] for s in exercise_sets], ["l1", "l2"])
+
+
+class EnsureIndexesTests(TestCase):
+    def test_missing_indexes_are_created_once(self):
+        collection = connection.get_collection(Lesson._meta.db_table)
+        collection.drop_index("lessons_uid_order_idx")
+
+        output = StringIO()
+        call_command("ensure_indexes", stdout=output)
+        self.assertIn("lessons_uid_order_idx", collection.index_information())
+        self.assertIn("Created 1 missing indexes", output.getvalue())
+
+        output = StringIO()
+        call_command("ensure_indexes", stdout=output)
+        self.assertIn("Created 0 missing indexes", output.getvalue())
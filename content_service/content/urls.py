@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from content_service_config.django import base
 from . import views
 
 # Create router and register viewsets
@@ -12,7 +13,14 @@ router.register(r"progress", views.UserProgressViewSet, basename="progress")
 router.register(
     r"learning-paths", views.UserLearningPathViewSet, basename="learningpath"
 )
+router.register(r"course-builds", views.CourseBuildViewSet, basename="coursebuild")
+
+routes = router.urls
+if base.CONTENT_ASYNC_READS:
+    from .async_views import async_urlpatterns
+
+    routes = async_urlpatterns(routes)
 
 urlpatterns = [
-    path("", include(router.urls)),
+    path("", include(routes)),
 ]
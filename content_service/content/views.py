@@ -1,8 +1,16 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from .models import Language, Syllabus, Lesson, Exercise, UserProgress, UserLearningPath
+from .models import (
+    Language,
+    Syllabus,
+    Lesson,
+    Exercise,
+    UserProgress,
+    UserLearningPath,
+    CourseBuild,
+)
 from .serializers import (
     LanguageSerializer,
     SyllabusSerializer,
@@ -10,17 +18,120 @@ from .serializers import (
     ExerciseSerializer,
     UserProgressSerializer,
     UserLearningPathSerializer,
+    CourseBuildSerializer,
 )
 from .permissions import IsAdminUser, IsOwnerOrAdmin
+from .progress import get_dashboard
+from .ingest import ingest_progress
+from .tasks import start_course_build
+from .export import iter_syllabus_ndjson
+from .pagination import KeysetPagination
+from .fast_serializers import compile_serializer
+from .conditional import ConditionalGetMixin, collection_validators
+from .representations import cached_representation, syllabus_of_exercise
+from content_service_config.django import base
 from .authentication import JWTAuthentication
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views import View
 
 
-class LanguageViewSet(viewsets.ModelViewSet):
+def requested_fieldset(request):
+    """The ?fields= / ?omit= serializer arguments of a read request"""
+    fieldset = {}
+    if request.method in permissions.SAFE_METHODS:
+        for name in ("fields", "omit"):
+            if name in request.query_params:
+                values = request.query_params[name].split(",")
+                fieldset[name] = [value.strip() for value in values if value.strip()]
+    return fieldset
+
+
+class SparseFieldsetViewMixin:
+    """?fields= / ?omit= on reads, applied to the serializer and the projection"""
+
+    def get_fieldset(self):
+        return requested_fieldset(self.request)
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, **{**self.get_fieldset(), **kwargs})
+
+    def project(self, queryset, serializer_class=None, many=False, related=()):
+        """
+        Defer the model fields the serializer will not render so MongoDB
+        does not return them, and select_related only rendered relations
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        serializer = serializer_class(many=many, **self.get_fieldset())
+        used = (serializer.child if many else serializer).source_fields()
+        if used is None:
+            return queryset.select_related(*related)
+
+        # Ordering, ownership checks and ETags read these even when not rendered
+        ordering = [
+            *queryset.model._meta.ordering,
+            *getattr(self, "keyset_ordering", KeysetPagination.ordering),
+        ]
+        used |= {"id", "uid", "updated_at", *[name.lstrip("-") for name in ordering]}
+        queryset = queryset.select_related(*[name for name in related if name in used])
+        deferred = [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if field.name not in used
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+class CompiledListMixin:
+    """
+    Lists rendered by the compiled serializer from .values() rows instead of
+    model instances, whenever the serializer's fields allow it
+    """
+
+    def get_compiled_serializer(self, serializer_class=None):
+        return compile_serializer(
+            serializer_class or self.get_serializer_class(),
+            many=True,
+            **self.get_fieldset(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        ordering = getattr(self, "keyset_ordering", KeysetPagination.ordering)
+        rows = compiled.rows(self.filter_queryset(self.get_queryset()), *ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page))
+        return Response(compiled.serialize(rows))
+
+    def serialize_many(self, queryset, serializer_class):
+        compiled = self.get_compiled_serializer(serializer_class)
+        if compiled is None:
+            return serializer_class(queryset, many=True, **self.get_fieldset()).data
+        return compiled.serialize(compiled.rows(queryset))
+
+
+class LanguageViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Language.objects.filter(is_active=True)
     serializer_class = LanguageSerializer
     authentication_classes = [JWTAuthentication]
+    # Identical for every user and rarely changed, so shared caches may keep it
+    cache_control = f"public, max-age={base.LANGUAGE_CACHE_MAX_AGE}"
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request,
+            collection_validators(queryset),
+            lambda: super(LanguageViewSet, self).list(request, *args, **kwargs),
+        )
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -33,26 +144,76 @@ class LanguageViewSet(viewsets.ModelViewSet):
         serializer.save(uid=self.request.user.id)
 
 
-class SyllabusViewSet(viewsets.ModelViewSet):
+class SyllabusViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = SyllabusSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        queryset = Syllabus.objects.all()
+        if self.action in ["list", "retrieve"]:
+            queryset = self.project(
+                queryset, many=self.action == "list", related=["language"]
+            )
+        elif self.action == "export":
+            queryset = queryset.select_related("language")
+
         # Users can see their own syllabi and public ones
         if hasattr(self.request.user, "is_staff") and self.request.user.is_staff:
-            return Syllabus.objects.all()
-        return Syllabus.objects.filter(uid=self.request.user.id)
+            return queryset
+        return queryset.filter(uid=self.request.user.id)
 
     def perform_create(self, serializer):
         serializer.save(uid=self.request.user.id)
 
+    def serialize_instance(self, instance):
+        return cached_representation(
+            instance.pk,
+            "syllabus",
+            instance.pk,
+            self.get_fieldset(),
+            lambda: super(SyllabusViewSet, self).serialize_instance(instance),
+        )
+
     @action(detail=True, methods=["get"])
     def lessons(self, request, pk=None):
         syllabus = get_object_or_404(Syllabus, pk=pk)
-        lessons = syllabus.lessons.all()
-        serializer = LessonSerializer(lessons, many=True)
-        return Response(serializer.data)
+        lessons = self.project(
+            syllabus.lessons.all(), LessonSerializer, many=True, related=["syllabus"]
+        )
+        return self.conditional_response(
+            request,
+            [syllabus.pk, syllabus.updated_at, *collection_validators(lessons)],
+            lambda: Response(
+                cached_representation(
+                    syllabus.pk,
+                    "syllabus-lessons",
+                    syllabus.pk,
+                    self.get_fieldset(),
+                    lambda: self.serialize_many(lessons, LessonSerializer),
+                )
+            ),
+        )
+
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """
+        Stream the syllabus with all of its lessons and exercises as NDJSON
+        for offline download
+        """
+        syllabus = self.get_object()
+        response = StreamingHttpResponse(
+            iter_syllabus_ndjson(syllabus), content_type="application/x-ndjson"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="syllabus-{syllabus.pk}.ndjson"'
+        )
+        return response
 
     @action(detail=True, methods=["post"])
     def generate_content(self, request, pk=None):
@@ -76,45 +237,95 @@ class SyllabusViewSet(viewsets.ModelViewSet):
         )
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
+    keyset_ordering = ("order", "id")
     serializer_class = LessonSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
-        return Lesson.objects.filter(uid=self.request.user.id)
+        queryset = Lesson.objects.filter(uid=self.request.user.id)
+        if self.action in ["list", "retrieve"]:
+            queryset = self.project(
+                queryset, many=self.action == "list", related=["syllabus"]
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(uid=self.request.user.id)
 
+    def serialize_instance(self, instance):
+        return cached_representation(
+            instance.syllabus_id,
+            "lesson",
+            instance.pk,
+            self.get_fieldset(),
+            lambda: super(LessonViewSet, self).serialize_instance(instance),
+        )
+
     @action(detail=True, methods=["get"])
     def exercises(self, request, pk=None):
         """Get all exercises for a lesson"""
         lesson = get_object_or_404(Lesson, pk=pk, uid=request.user.id)
-        exercises = lesson.exercises.all()
-        serializer = ExerciseSerializer(exercises, many=True)
-        return Response(serializer.data)
+        exercises = self.project(
+            lesson.exercises.all(), ExerciseSerializer, many=True, related=["lesson"]
+        )
+        return Response(self.serialize_many(exercises, ExerciseSerializer))
 
 
-class ExerciseViewSet(viewsets.ModelViewSet):
+class ExerciseViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
+    keyset_ordering = ("order", "id")
     serializer_class = ExerciseSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
-        return Exercise.objects.filter(uid=self.request.user.id)
+        queryset = Exercise.objects.filter(uid=self.request.user.id)
+        if self.action in ["list", "retrieve"]:
+            queryset = self.project(
+                queryset, many=self.action == "list", related=["lesson"]
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(uid=self.request.user.id)
 
+    def serialize_instance(self, instance):
+        return cached_representation(
+            syllabus_of_exercise(instance),
+            "exercise",
+            instance.pk,
+            self.get_fieldset(),
+            lambda: super(ExerciseViewSet, self).serialize_instance(instance),
+        )
 
-class UserProgressViewSet(viewsets.ModelViewSet):
+
+class UserProgressViewSet(
+    SparseFieldsetViewMixin, CompiledListMixin, viewsets.ModelViewSet
+):
     serializer_class = UserProgressSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return UserProgress.objects.filter(uid=self.request.user.id)
+        queryset = UserProgress.objects.filter(uid=self.request.user.id)
+        if self.action in ["list", "retrieve"]:
+            queryset = self.project(
+                queryset,
+                many=self.action == "list",
+                related=["syllabus", "lesson", "exercise"],
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(uid=self.request.user.id)
@@ -122,39 +333,87 @@ class UserProgressViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def dashboard(self, request):
         """Get user progress dashboard data"""
-        user_progress = self.get_queryset()
-        completed_lessons = user_progress.filter(
-            lesson__isnull=False, completed=True
-        ).count()
-        completed_exercises = user_progress.filter(
-            exercise__isnull=False, completed=True
-        ).count()
-        total_points = sum(
-            progress.score for progress in user_progress if progress.completed
-        )
+        dashboard = get_dashboard(request.user.id)
+        return Response({**dashboard, "uid": request.user.id})
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Upsert a batch of progress events, e.g. an offline session, and
+        report a status for each one
+        """
+        events = request.data
+        if isinstance(events, dict):
+            events = events.get("events")
+        if not isinstance(events, list):
+            return Response(
+                {"error": "Expected a list of progress events"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(events) > base.PROGRESS_BULK_MAX_EVENTS:
+            return Response(
+                {"error": f"At most {base.PROGRESS_BULK_MAX_EVENTS} events per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results, summaries_pending = ingest_progress(request.user.id, events)
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        # 202 while the dashboard summaries catch up on a worker
         return Response(
-            {
-                "completed_lessons": completed_lessons,
-                "completed_exercises": completed_exercises,
-                "total_points": total_points,
-                "uid": request.user.id,
-            }
+            {"counts": counts, "results": results},
+            status=status.HTTP_202_ACCEPTED if summaries_pending else status.HTTP_200_OK,
         )
 
 
-class UserLearningPathViewSet(viewsets.ModelViewSet):
+class UserLearningPathViewSet(
+    SparseFieldsetViewMixin, CompiledListMixin, viewsets.ModelViewSet
+):
     serializer_class = UserLearningPathSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return UserLearningPath.objects.filter(uid=self.request.user.id)
+        queryset = UserLearningPath.objects.filter(uid=self.request.user.id)
+        if self.action in ["list", "retrieve"]:
+            queryset = self.project(
+                queryset,
+                many=self.action == "list",
+                related=["language", "current_syllabus"],
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(uid=self.request.user.id)
 
 
+class CourseBuildViewSet(
+    SparseFieldsetViewMixin,
+    CompiledListMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Start AI course builds and poll their progress"""
+
+    serializer_class = CourseBuildSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return CourseBuild.objects.filter(uid=self.request.user.id)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        build = start_course_build(uid=request.user.id, **serializer.validated_data)
+        return Response(
+            self.get_serializer(build).data, status=status.HTTP_202_ACCEPTED
+        )
+
+
 # Health Check
 class HealthCheckView(View):
     def get(self, request):
@@ -36,8 +36,91 @@ else:
     SECRET_KEY = env("PROD_SECRET_KEY")
 
 JWT_ALGORITHM = env("JWT_ALGORITHM")
+# Decoded access tokens kept in memory per process; tokens without an exp
+# claim are re-verified after JWT_CACHE_DEFAULT_TTL seconds
+JWT_CACHE_SIZE = env.int("JWT_CACHE_SIZE", default=10000)
+JWT_CACHE_DEFAULT_TTL = env.int("JWT_CACHE_DEFAULT_TTL", default=5 * 60)
 
 USER_SERVICE_URL = env("USER_SERVICE_URL")
+USER_SERVICE_POOL_SIZE = env.int("USER_SERVICE_POOL_SIZE", default=20)
+USER_SERVICE_CONNECT_TIMEOUT = env.float("USER_SERVICE_CONNECT_TIMEOUT", default=0.5)
+USER_SERVICE_READ_TIMEOUT = env.float("USER_SERVICE_READ_TIMEOUT", default=3.0)
+USER_SERVICE_BREAKER_THRESHOLD = env.int("USER_SERVICE_BREAKER_THRESHOLD", default=5)
+USER_SERVICE_BREAKER_RESET = env.float("USER_SERVICE_BREAKER_RESET", default=30.0)
+
+# ai-agents-service, called by the generation tasks through one pooled
+# client per worker process. Prefork children run one task at a time; with
+# thread or gevent pools set AI_SERVICE_POOL_SIZE to the worker concurrency
+AI_SERVICE_URL = env("AI_SERVICE_URL", default="http://ai-agents-service:8000")
+AI_SERVICE_POOL_SIZE = env.int("AI_SERVICE_POOL_SIZE", default=4)
+AI_SERVICE_CONNECT_TIMEOUT = env.float("AI_SERVICE_CONNECT_TIMEOUT", default=3.0)
+AI_SERVICE_READ_TIMEOUT = env.float("AI_SERVICE_READ_TIMEOUT", default=300.0)
+# With AI_ASYNC_ENGINE the tasks' AI calls run on one event loop per worker
+# process (content.ai_engine), AI_ASYNC_CONCURRENCY at a time; meant for the
+# thread-pool AI worker (celery_worker/entrypoint.sh ai-worker)
+AI_ASYNC_ENGINE = env.bool("AI_ASYNC_ENGINE", default=False)
+AI_ASYNC_CONCURRENCY = env.int("AI_ASYNC_CONCURRENCY", default=64)
+# Fleet-wide limits on ai-agents-service calls, shared through Redis
+# (content.ai_limiter): a token bucket of AI_RATE_LIMIT calls per second
+# (0 disables) with bursts of AI_RATE_BURST, and an AIMD concurrency limit
+# between MIN and MAX that grows on success and halves on overload
+AI_LIMITER_ENABLED = env.bool("AI_LIMITER_ENABLED", default=True)
+AI_RATE_LIMIT = env.float("AI_RATE_LIMIT", default=20.0)
+AI_RATE_BURST = env.int("AI_RATE_BURST", default=40)
+AI_CONCURRENCY_INITIAL = env.int("AI_CONCURRENCY_INITIAL", default=32)
+AI_CONCURRENCY_MIN = env.int("AI_CONCURRENCY_MIN", default=4)
+AI_CONCURRENCY_MAX = env.int("AI_CONCURRENCY_MAX", default=256)
+AI_LIMITER_ACQUIRE_TIMEOUT = env.float("AI_LIMITER_ACQUIRE_TIMEOUT", default=60.0)
+# Generation results shared between identical requests (timestamp and uid
+# aside) for AI_RESULT_CACHE_TTL seconds after their last use, 0 disables;
+# beyond MAX_ENTRIES the least recently used results are evicted
+AI_RESULT_CACHE_TTL = env.int("AI_RESULT_CACHE_TTL", default=7 * 24 * 60 * 60)
+AI_RESULT_CACHE_MAX_ENTRIES = env.int("AI_RESULT_CACHE_MAX_ENTRIES", default=10000)
+# Concurrent identical generation requests share one in-flight call: its
+# Redis lease is renewed while the call runs and lapses LEASE_TTL seconds
+# after a worker dies; duplicates wait up to WAIT_TIMEOUT seconds for it
+AI_SINGLE_FLIGHT_LEASE_TTL = env.int("AI_SINGLE_FLIGHT_LEASE_TTL", default=30)
+AI_SINGLE_FLIGHT_WAIT_TIMEOUT = env.int("AI_SINGLE_FLIGHT_WAIT_TIMEOUT", default=600)
+# Course builds request exercises for up to this many lessons per
+# ai-agents-service call
+AI_EXERCISE_BATCH_SIZE = env.int("AI_EXERCISE_BATCH_SIZE", default=8)
+
+# Seconds the is_staff/is_superuser/is_active token claims are trusted for
+# before admin checks fall back to user_service
+ADMIN_CLAIMS_MAX_AGE = env.int("ADMIN_CLAIMS_MAX_AGE", default=15 * 60)
+
+# Cached user_service lookups, kept fresh by the invalidation events
+# user_service publishes on USER_INVALIDATION_CHANNEL
+USER_LOOKUP_CACHE_TTL = env.int("USER_LOOKUP_CACHE_TTL", default=60 * 60)
+USER_LOOKUP_NEGATIVE_TTL = env.int("USER_LOOKUP_NEGATIVE_TTL", default=60)
+USER_LOOKUP_LOCAL_TTL = env.int("USER_LOOKUP_LOCAL_TTL", default=5 * 60)
+USER_LOOKUP_LOCAL_SIZE = env.int("USER_LOOKUP_LOCAL_SIZE", default=10000)
+USER_INVALIDATION_CHANNEL = env(
+    "USER_INVALIDATION_CHANNEL", default="user_service.users.invalidate"
+)
+
+# Seconds a user's progress dashboard is cached for; 0 disables the cache
+DASHBOARD_CACHE_TTL = env.int("DASHBOARD_CACHE_TTL", default=30)
+# Seconds UserProgress changes are batched for before being folded into
+# UserProgressSummary; 0 applies them synchronously
+PROGRESS_SUMMARY_FLUSH_DELAY = env.int("PROGRESS_SUMMARY_FLUSH_DELAY", default=2)
+# Largest batch accepted by the progress/bulk/ endpoint
+PROGRESS_BULK_MAX_EVENTS = env.int("PROGRESS_BULK_MAX_EVENTS", default=5000)
+
+# Bump to invalidate every catalogue ETag, e.g. when a serializer changes
+CONTENT_CACHE_VERSION = env("CONTENT_CACHE_VERSION", default="1")
+# Seconds shared caches may serve the language catalogue without revalidating
+LANGUAGE_CACHE_MAX_AGE = env.int("LANGUAGE_CACHE_MAX_AGE", default=5 * 60)
+# Serialized syllabus/lesson/exercise representations cached in Redis; 0
+# disables the cache. BETA > 1 refreshes hot entries earlier before expiry
+CONTENT_RESPONSE_CACHE_TTL = env.int("CONTENT_RESPONSE_CACHE_TTL", default=60 * 60)
+CONTENT_RESPONSE_CACHE_BETA = env.float("CONTENT_RESPONSE_CACHE_BETA", default=1.0)
+# Serve the catalogue and dashboard GETs from async views (content.async_views);
+# enable only when running under ASGI, e.g.
+# uvicorn content_service_config.asgi:application
+CONTENT_ASYNC_READS = env.bool("CONTENT_ASYNC_READS", default=False)
+# Connections per event loop in the async views' MongoDB pool
+ASYNC_MONGO_POOL_SIZE = env.int("ASYNC_MONGO_POOL_SIZE", default=100)
 
 # Media files
 MEDIA_URL = "/media/"
@@ -80,7 +163,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "content.pagination.KeysetPagination",
+    "DEFAULT_RENDERER_CLASSES": [
+        "content.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "content.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
@@ -102,6 +194,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "content_service_config.wsgi.application"
+ASGI_APPLICATION = "content_service_config.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -6,4 +6,7 @@ python manage.py makemigrations --noinput
 echo "Applying migrations"
 python manage.py migrate --noinput
 
+echo "Ensuring content indexes"
+python manage.py ensure_indexes
+
 exec "$@"
\ No newline at end of file
@@ -11,6 +11,17 @@ CELERY_IMPORTS = [
 
 # Queue configuration
 CELERY_TASK_ROUTES = {
+    # Tasks that spend their time waiting on ai-agents-service, consumed by
+    # the thread-pool AI worker
+    "content.tasks.generate_syllabus": {"queue": "ai_queue"},
+    "content.tasks.generate_lesson": {"queue": "ai_queue"},
+    "content.tasks.generate_exercises": {"queue": "ai_queue"},
+    "content.tasks.generate_exercise_batch": {"queue": "ai_queue"},
+    "content.tasks.generate_specific_exercise": {"queue": "ai_queue"},
+    "content.tasks.generate_learning_path": {"queue": "ai_queue"},
+    "content.tasks.analyze_user_progress": {"queue": "ai_queue"},
+    "content.tasks.update_learning_progress": {"queue": "ai_queue"},
+    "content.tasks.adapt_learning_path": {"queue": "ai_queue"},
     "users.tasks.*": {"queue": "users_queue"},
     "content.tasks.*": {"queue": "content_queue"},
 }
@@ -21,6 +32,7 @@ CELERY_TASK_QUEUES = (
     Queue("default", routing_key="default"),
     Queue("users_queue", routing_key="users"),
     Queue("content_queue", routing_key="content"),
+    Queue("ai_queue", routing_key="ai"),
 )
 
 # Worker settings
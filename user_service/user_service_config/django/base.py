@@ -22,6 +22,10 @@ CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
 ALLOWED_HOSTS = ["*"]
 JWT_ALGORITHM = env("JWT_ALGORITHM")
 CONTENT_SERVICE_URL = env("CONTENT_SERVICE_URL")
+# content_service drops its cached admin/user lookups on these events
+USER_INVALIDATION_CHANNEL = env(
+    "USER_INVALIDATION_CHANNEL", default="user_service.users.invalidate"
+)
 
 # Switching JWT_KEY and SECRET_KEY based on environment
 if DJANGO_ENV == "user_service_config.django.dev":
@@ -210,6 +214,15 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "users.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "users.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # Simple JWT Settings for JWT Authentication
@@ -0,0 +1,69 @@
+import io
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional accelerator; fall back to the stdlib classes
+    orjson = None
+
+
+# content-service's content/renderers.py is a copy of this module:
+# each service's image is built from its own directory, so there is no
+# package both can import. Change them together.
+
+# DRF's encoder formats everything orjson does not handle natively
+# (Decimal, lazy strings, timedelta, querysets, ...) and, passed through,
+# datetimes, so the output matches JSONRenderer's. Only floats of 1e16 and
+# beyond or under 1e-4 are written differently (1e16 for 1e+16), and NaN
+# as null
+_drf_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer on orjson, with JSONRenderer's output and fallbacks"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type or "", renderer_context or {})
+        # orjson has no indent widths or ASCII-only output
+        if orjson is None or indent or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        try:
+            ret = orjson.dumps(
+                data, default=_drf_encoder.default, option=ORJSON_OPTIONS
+            )
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict-JavaScript escaping as JSONRenderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser on orjson for UTF-8 bodies"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8").lower().replace("_", "-")
+        if orjson is None or encoding not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # JSONParser's error, or its value for what orjson refuses
+            # (numbers overflowing a double)
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -1,9 +1,57 @@
+import json
+import logging
 from axes.signals import user_locked_out
 from rest_framework.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
+from django_redis import get_redis_connection
+from user_service_config.django import base
+from .models import User
 
 
+logger = logging.getLogger(__name__)
+
+# Fields content_service caches admin decisions on
+PRIVILEGE_FIELDS = ("is_staff", "is_superuser", "is_active")
+
 
 @receiver(user_locked_out)
 def raise_permission_denied(*args, **kwargs):
     raise PermissionDenied("Too many failed login attempts. Your account is locked.")
+
+
+def _privileges(instance):
+    # Read from __dict__ so deferred fields are not fetched
+    return tuple(instance.__dict__.get(field) for field in PRIVILEGE_FIELDS)
+
+
+def publish_user_invalidation(uid):
+    def publish():
+        try:
+            get_redis_connection("default").publish(
+                base.USER_INVALIDATION_CHANNEL, json.dumps({"uid": uid})
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation for user {uid}: {e}")
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_init, sender=User)
+def remember_privileges(sender, instance, **kwargs):
+    instance._saved_privileges = _privileges(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_changed_privileges(sender, instance, created, **kwargs):
+    privileges = _privileges(instance)
+    # New users may be cached as "not found" on the content side
+    if created or privileges != instance._saved_privileges:
+        publish_user_invalidation(instance.uid)
+    instance._saved_privileges = privileges
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    publish_user_invalidation(instance.uid)